@@ -1,21 +1,26 @@
 import json
 
-from flask import Flask, request
+from flask import Flask, request, jsonify
 from flask import send_file, abort, render_template
 
-from constant import CONFIG_DIR
-from entity.housing_predictor import HousingData, HousingPredictor
+from constant import CONFIG_DIR, DATA_VALIDATION_ARTIFACT_DIR_NAME
+from entity.housing_predictor import HousingData, HousingPredictor, HousingBatchData
+from entity.prediction_batcher import PredictionBatcher
+from housing.components.drift_engine import DriftEngine
+from housing.components.reference_profile import ReferenceProfile, get_latest_reference_profile_path
+from housing.components.report_page import render_report_page
 from housing.logger import logging
 from housing.pipeline.pipeline import Pipeline
 from housing.utilities.util import get_current_time_stamp, write_yaml_file, read_yaml_file, get_file_join, \
     make_directories, current_working_directory, check_dir_exists, get_dir, get_is_file, \
-    get_filename_from_directory_list
+    get_filename_from_directory_list, get_schema, get_base_file_name
 
 ROOT_DIR = current_working_directory()
 LOG_FOLDER_NAME = "logs"
 PIPELINE_FOLDER_NAME = "housing"
 SAVED_MODELS_DIR_NAME = "saved_models"
 MODEL_CONFIG_FILE_PATH = get_file_join(ROOT_DIR, CONFIG_DIR, "model.yaml")
+SCHEMA_FILE_PATH = get_file_join(ROOT_DIR, CONFIG_DIR, "schema.json")
 LOG_DIR = get_file_join(ROOT_DIR, LOG_FOLDER_NAME)
 PIPELINE_DIR = get_file_join(ROOT_DIR, PIPELINE_FOLDER_NAME)
 MODEL_DIR = get_file_join(ROOT_DIR, SAVED_MODELS_DIR_NAME)
@@ -26,6 +31,15 @@ from housing.logger import get_log_dataframe
 HOUSING_DATA_KEY = "housing_data"
 MEDIAN_HOUSING_VALUE_KEY = "median_house_value"
 
+APP_CONFIGURATION = Configuration()
+PREDICTION_CONFIG = APP_CONFIGURATION.get_prediction_config()
+DATA_VALIDATION_CONFIG = APP_CONFIGURATION.get_data_validation_config()
+DATA_VALIDATION_DIR = get_file_join(APP_CONFIGURATION.training_pipeline_config.artifact_dir,
+                                    DATA_VALIDATION_ARTIFACT_DIR_NAME)
+prediction_batcher = PredictionBatcher(predictor=HousingPredictor(model_dir=MODEL_DIR),
+                                       prediction_config=PREDICTION_CONFIG) \
+    if PREDICTION_CONFIG.micro_batching else None
+
 app = Flask(__name__)
 
 
@@ -44,6 +58,8 @@ def render_artifact_dir(req_path):
     # Check if path is a file and serve
     if get_is_file(abs_path):
         if ".html" in abs_path:
+            # a deferred report page not rendered yet is rendered now; one rendering elsewhere shows its placeholder
+            render_report_page(abs_path)
             with open(abs_path, "r", encoding="utf-8") as file:
                 content = ''
                 for line in file.readlines():
@@ -126,8 +142,15 @@ def predict():
                                    ocean_proximity=ocean_proximity,
                                    )
         housing_df = housing_data.get_housing_input_data_frame()
-        housing_predictor = HousingPredictor(model_dir=MODEL_DIR)
-        median_housing_value = housing_predictor.predict(X=housing_df)
+        if prediction_batcher is not None:
+            try:
+                median_housing_value = prediction_batcher.predict(housing_df)
+            except TimeoutError as e:
+                logging.info(f"Prediction request dropped: {e}")
+                return abort(503)
+        else:
+            housing_predictor = HousingPredictor(model_dir=MODEL_DIR)
+            median_housing_value = housing_predictor.predict(X=housing_df)
         context = {
             HOUSING_DATA_KEY: housing_data.get_housing_data_as_dict(),
             MEDIAN_HOUSING_VALUE_KEY: median_housing_value,
@@ -136,6 +159,63 @@ def predict():
     return render_template("predict.html", context=context)
 
 
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    housing_data = request.get_json(silent=True)
+    if housing_data is None:
+        return jsonify({"error": "Request body must be JSON."}), 400
+    try:
+        housing_df = HousingBatchData(housing_data=housing_data,
+                                      schema_file_path=SCHEMA_FILE_PATH).get_housing_input_data_frame()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    housing_predictor = HousingPredictor(model_dir=MODEL_DIR)
+    median_housing_value = housing_predictor.predict(X=housing_df)
+    return jsonify({
+        "count": len(housing_df),
+        MEDIAN_HOUSING_VALUE_KEY: median_housing_value.tolist()
+    })
+
+
+@app.route('/predict_drift', methods=['POST'])
+def predict_drift():
+    """
+    Drift report of a batch of request data (same JSON as /predict_batch) against the reference
+    profile of the latest validated dataset.
+    """
+    housing_data = request.get_json(silent=True)
+    if housing_data is None:
+        return jsonify({"error": "Request body must be JSON."}), 400
+    try:
+        housing_df = HousingBatchData(housing_data=housing_data,
+                                      schema_file_path=SCHEMA_FILE_PATH).get_housing_input_data_frame()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if DATA_VALIDATION_CONFIG.reference_profile_file_path is None:
+        return jsonify({"error": "Reference profiles are not enabled."}), 404
+    reference_profile_file_path = get_latest_reference_profile_path(
+        DATA_VALIDATION_DIR, get_base_file_name(DATA_VALIDATION_CONFIG.reference_profile_file_path))
+    if reference_profile_file_path is None:
+        return jsonify({"error": "No reference profile available, run the training pipeline first."}), 404
+
+    schema = get_schema(SCHEMA_FILE_PATH)
+    drift_engine = DriftEngine(numerical_columns=schema["numerical_columns"],
+                               categorical_columns=schema["categorical_columns"],
+                               numerical_stattest=DATA_VALIDATION_CONFIG.numerical_stattest)
+    report = ReferenceProfile.load(reference_profile_file_path).compare(housing_df, drift_engine)
+    return jsonify({"count": len(housing_df), "reference_profile_file_path": reference_profile_file_path,
+                    "metrics": report["data_drift"]["data"]["metrics"]})
+
+
+@app.route('/predict_metrics', methods=['GET'])
+def predict_metrics():
+    if prediction_batcher is None:
+        return jsonify({"micro_batching": False})
+    return jsonify({"micro_batching": True, **prediction_batcher.get_metrics()})
+
+
 @app.route('/saved_models', defaults={'req_path': 'saved_models'})
 @app.route('/saved_models/<path:req_path>')
 def saved_models_dir(req_path):
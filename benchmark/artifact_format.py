@@ -0,0 +1,37 @@
+"""
+File size and parse time of the ingested train/test artifacts per artifact_format.
+Every stage reads both files: DataValidation.get_train_and_test_df (called by the schema check, the
+drift report and the drift page), util.load_data in DataTransformation and in ModelEvaluation.
+
+python -m benchmark.artifact_format
+"""
+import os
+import tempfile
+
+from benchmark.common import make_housing_frame, time_call, SCHEMA_FILE_PATH
+from housing.utilities.util import get_file_join, write_data_frame, read_data_frame, load_data, \
+    cast_data_frame_to_schema, DATA_FRAME_FILE_EXTENSIONS
+
+def main(n_rows: int = 1_000_000):
+    housing_df = make_housing_frame(n_rows)
+    split_at = int(n_rows * 0.8)
+    with tempfile.TemporaryDirectory() as work_dir:
+        for file_format, extension in DATA_FRAME_FILE_EXTENSIONS.items():
+            file_paths = [get_file_join(work_dir, f"{name}{extension}") for name in ["train", "test"]]
+            artifact_df = housing_df if file_format == "csv" else cast_data_frame_to_schema(housing_df,
+                                                                                            SCHEMA_FILE_PATH)
+            write_data_frame(artifact_df.iloc[:split_at], file_paths[0])
+            write_data_frame(artifact_df.iloc[split_at:], file_paths[1])
+
+            size_mb = sum(os.path.getsize(file_path) for file_path in file_paths) / 2 ** 20
+            read_seconds, _ = time_call(lambda: [read_data_frame(file_path) for file_path in file_paths], repeat=3)
+            load_seconds, _ = time_call(lambda: [load_data(file_path, SCHEMA_FILE_PATH) for file_path in file_paths],
+                                        repeat=3)
+            stage_seconds = {"data_validation": 3 * read_seconds, "data_transformation": load_seconds,
+                             "model_evaluation": load_seconds}
+            print(f"{file_format}: {size_mb:.1f}MB, " +
+                  ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in stage_seconds.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Rows/sec of the batch prediction path: JSON payload -> HousingBatchData -> one predict call.
+
+python -m benchmark.batch_throughput
+"""
+from sklearn.ensemble import RandomForestRegressor
+
+from benchmark.common import build_housing_model, make_housing_frame, time_call, SCHEMA_FILE_PATH
+from entity.housing_predictor import HousingBatchData
+
+BATCH_SIZES = [1, 100, 10_000, 100_000]
+
+
+def main():
+    housing_model, _ = build_housing_model(RandomForestRegressor(n_estimators=100, min_samples_leaf=3))
+    for batch_size in BATCH_SIZES:
+        payload = make_housing_frame(batch_size, seed=batch_size, with_target=False).to_dict(orient="list")
+
+        def score():
+            housing_df = HousingBatchData(payload, SCHEMA_FILE_PATH).get_housing_input_data_frame()
+            return housing_model.predict(housing_df)
+
+        best, median = time_call(score, repeat=3 if batch_size >= 10_000 else 10)
+        print(f"batch_size={batch_size:>7}: {batch_size / best:>12,.0f} rows/sec (best {best * 1000:.2f}ms, "
+              f"median {median * 1000:.2f}ms)")
+
+
+if __name__ == "__main__":
+    main()
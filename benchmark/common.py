@@ -0,0 +1,118 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from constant import ROOT_DIR, CONFIG_DIR
+from entity.artifact_entity import DataValidationArtifact, DataIngestionArtifact
+from entity.data_transformation_entity import DataTransformationEntity
+from entity.data_validation_entity import DataValidationEntity
+from housing.components.data_transformation import DataTransformation
+from housing.components.data_validation import DataValidation
+from housing.components.model_trainer import HousingEstimatorModel
+from housing.utilities.util import get_file_join, write_data_frame
+
+SCHEMA_FILE_PATH = get_file_join(ROOT_DIR, CONFIG_DIR, "schema.json")
+OCEAN_PROXIMITY_VALUES = ["<1H OCEAN", "INLAND", "ISLAND", "NEAR BAY", "NEAR OCEAN"]
+TARGET_COLUMN = "median_house_value"
+
+
+def make_housing_frame(n_rows: int, seed: int = 42, with_target: bool = True, missing_ratio: float = 0.01):
+    """
+    Synthetic housing dataset with the same columns and rough value ranges as the real one.
+    """
+    rng = np.random.default_rng(seed)
+    households = np.round(rng.lognormal(6.0, 0.7, n_rows)) + 1
+    total_rooms = np.round(households * rng.uniform(2.0, 8.0, n_rows))
+    total_bedrooms = np.round(total_rooms * rng.uniform(0.1, 0.3, n_rows))
+    total_bedrooms[rng.random(n_rows) < missing_ratio] = np.nan
+    median_income = np.clip(rng.lognormal(1.3, 0.45, n_rows), 0.5, 15.0)
+    data = {
+        "longitude": rng.uniform(-124.3, -114.3, n_rows),
+        "latitude": rng.uniform(32.5, 42.0, n_rows),
+        "housing_median_age": np.round(rng.uniform(1, 52, n_rows)),
+        "total_rooms": total_rooms,
+        "total_bedrooms": total_bedrooms,
+        "population": np.round(households * rng.uniform(1.5, 4.0, n_rows)),
+        "households": households,
+        "median_income": median_income,
+    }
+    if with_target:
+        data[TARGET_COLUMN] = np.clip(median_income * 40000 + rng.normal(0, 30000, n_rows), 15000, 500001)
+    data["ocean_proximity"] = rng.choice(OCEAN_PROXIMITY_VALUES, n_rows, p=[0.44, 0.32, 0.01, 0.11, 0.12])
+    return pd.DataFrame(data)
+
+
+def write_train_test_files(work_dir: str, n_rows: int, seed: int = 42, file_format: str = "csv",
+                           test_seed: int = None) -> DataIngestionArtifact:
+    """
+    Writes synthetic train (80%) and test (20%) files like ingestion does. With test_seed the test
+    rows come from another draw of the same distribution.
+    """
+    n_train_rows = int(n_rows * 0.8)
+    train_df = make_housing_frame(n_train_rows, seed=seed)
+    test_df = make_housing_frame(n_rows - n_train_rows, seed=seed + 1 if test_seed is None else test_seed)
+    train_file_path = get_file_join(work_dir, "ingested_data", "train", f"housing.{file_format}")
+    test_file_path = get_file_join(work_dir, "ingested_data", "test", f"housing.{file_format}")
+    write_data_frame(train_df, train_file_path)
+    write_data_frame(test_df, test_file_path)
+    return DataIngestionArtifact(train_file_path=train_file_path, test_file_path=test_file_path,
+                                 is_ingested=True, message=None)
+
+
+def build_data_validation(work_dir: str, data_ingestion_artifact: DataIngestionArtifact,
+                          data_validation_class=DataValidation, **config):
+    """
+    config: DataValidationEntity fields to override
+    """
+    data_validation_config = DataValidationEntity(
+        schema_file_path=SCHEMA_FILE_PATH,
+        report_file_path=get_file_join(work_dir, "data_validation", "report.json"),
+        report_page_file_path=get_file_join(work_dir, "data_validation", "report.html"),
+        drift_engine="native",
+        numerical_stattest="psi",
+        reference_profile_file_path=get_file_join(work_dir, "data_validation", "reference_profile.json"),
+        drift_sample_size=None,
+        drift_n_jobs=1,
+        report_page_mode="deferred",
+        schema_report_file_path=get_file_join(work_dir, "data_validation", "schema_report.json"),
+        schema_chunk_size=100000,
+        max_failed_rows=20
+    )._replace(**config)
+    return data_validation_class(data_validation_config, data_ingestion_artifact)
+
+
+def build_preprocessing_object(add_bedroom_per_room: bool = True):
+    data_transformation = DataTransformation(
+        DataTransformationEntity(add_bedroom_per_room=add_bedroom_per_room, transformed_train_dir=None,
+                                 transformed_test_dir=None, preprocessed_object_file_path=None),
+        None,
+        DataValidationArtifact(schema_file_path=SCHEMA_FILE_PATH, report_file_path=None,
+                               report_page_file_path=None, is_validated=True, message=None)
+    )
+    return data_transformation.get_data_transformer_object()
+
+
+def build_housing_model(model, n_rows: int = 20000, seed: int = 42, add_bedroom_per_room: bool = True):
+    """
+    Fits the repo preprocessing object plus the given estimator on a synthetic frame
+    and returns (HousingEstimatorModel, input dataframe).
+    """
+    housing_df = make_housing_frame(n_rows, seed=seed)
+    input_df = housing_df.drop(columns=[TARGET_COLUMN])
+    preprocessing_obj = build_preprocessing_object(add_bedroom_per_room=add_bedroom_per_room)
+    transformed = preprocessing_obj.fit_transform(input_df)
+    model.fit(transformed, housing_df[TARGET_COLUMN].to_numpy())
+    return HousingEstimatorModel(preprocessing_object=preprocessing_obj, trained_model_object=model), input_df
+
+
+def time_call(func, repeat: int = 5):
+    """
+    Returns (best, median) wall time in seconds over `repeat` calls.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), float(np.median(timings))
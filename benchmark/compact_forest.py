@@ -0,0 +1,51 @@
+"""
+RandomForestRegressor pickled with dill vs CompactForestModel: artifact size, load time and predict time.
+
+python -m benchmark.compact_forest
+"""
+import os
+import tempfile
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from benchmark.common import build_housing_model, make_housing_frame, time_call, TARGET_COLUMN
+from housing.components.model_specialization import specialize_forest_model, CompactForestModel
+from housing.components.preprocessing_kernel import compile_preprocessing_object
+from housing.utilities.util import save_object, load_object
+
+ROW_COUNTS = [1, 100, 10_000, 100_000]
+
+
+def get_dir_size(dir_path):
+    return sum(os.path.getsize(os.path.join(dir_path, file_name)) for file_name in os.listdir(dir_path))
+
+
+def main():
+    housing_model, _ = build_housing_model(RandomForestRegressor(n_estimators=100, min_samples_leaf=3))
+    preprocessing_obj, forest = housing_model.preprocessing_object, housing_model.trained_model_object
+    compact_forest = specialize_forest_model(compile_preprocessing_object(preprocessing_obj), forest)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sklearn_path = os.path.join(tmp_dir, "sklearn", "model.pkl")
+        compact_dir = os.path.join(tmp_dir, "compact")
+        save_object(file_path=sklearn_path, obj=forest)
+        compact_forest.save(compact_dir)
+
+        print(f"size: sklearn {os.path.getsize(sklearn_path) / 2 ** 20:.1f}MB | "
+              f"compact {get_dir_size(compact_dir) / 2 ** 20:.1f}MB")
+        sklearn_load, _ = time_call(lambda: load_object(file_path=sklearn_path))
+        compact_load, _ = time_call(lambda: CompactForestModel.load(compact_dir))
+        print(f"load: sklearn {sklearn_load * 1000:.1f}ms | compact (mmap) {compact_load * 1000:.2f}ms")
+
+    for n_rows in ROW_COUNTS:
+        transformed = preprocessing_obj.transform(make_housing_frame(n_rows, seed=n_rows).drop(columns=[TARGET_COLUMN]))
+        assert np.array_equal(compact_forest.predict_transformed(transformed), forest.predict(transformed))
+        repeat = 3 if n_rows >= 10_000 else 10
+        sklearn_best, _ = time_call(lambda: forest.predict(transformed), repeat=repeat)
+        compact_best, _ = time_call(lambda: compact_forest.predict_transformed(transformed), repeat=repeat)
+        print(f"predict rows={n_rows:>7}: sklearn {sklearn_best * 1000:9.2f}ms | compact {compact_best * 1000:9.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Wall time of the data validation stage when every check reads the train/test files again
+(previous behaviour) vs reading them once and sharing the frames.
+
+python -m benchmark.data_validation_stage
+"""
+import tempfile
+
+from benchmark.common import write_train_test_files, build_data_validation, time_call
+from housing.components.data_validation import DataValidation
+from housing.utilities.util import read_data_frame
+
+
+class RereadingDataValidation(DataValidation):
+
+    def get_train_and_test_df(self):
+        return (read_data_frame(self.data_ingestion_artifact.train_file_path),
+                read_data_frame(self.data_ingestion_artifact.test_file_path))
+
+
+def main(n_rows: int = 500_000):
+    with tempfile.TemporaryDirectory() as work_dir:
+        data_ingestion_artifact = write_train_test_files(work_dir, n_rows)
+        for name, data_validation_class in [("reread", RereadingDataValidation), ("shared", DataValidation)]:
+            seconds, _ = time_call(lambda: build_data_validation(work_dir, data_ingestion_artifact,
+                                                                 data_validation_class).initiate_data_validation(),
+                                   repeat=1)
+            print(f"{name}: {seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
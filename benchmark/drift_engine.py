@@ -0,0 +1,47 @@
+"""
+Drift report time of the native DriftEngine vs evidently DataDriftProfileSection.
+Reference and current frames are two draws of the same synthetic distribution.
+
+python -m benchmark.drift_engine
+"""
+import importlib
+import json
+import time
+
+from benchmark.common import make_housing_frame, SCHEMA_FILE_PATH
+from housing.components.drift_engine import DriftEngine
+from housing.utilities.util import get_schema
+
+
+def get_evidently_report(reference_df, current_df) -> dict:
+    from evidently.model_profile import Profile
+    from evidently.model_profile.sections import DataDriftProfileSection
+
+    profile = Profile(sections=[DataDriftProfileSection()])
+    profile.calculate(reference_df, current_df)
+    return json.loads(profile.json())
+
+
+def main(row_counts=(1_000_000, 10_000_000)):
+    schema = get_schema(SCHEMA_FILE_PATH)
+    drift_engine = DriftEngine(numerical_columns=schema["numerical_columns"],
+                               categorical_columns=schema["categorical_columns"])
+    # evidently is imported up front and timed on its own, so the first comparison does not include it
+    start_time = time.perf_counter()
+    importlib.import_module("evidently.model_profile")
+    print(f"evidently import: {time.perf_counter() - start_time:.2f}s")
+
+    for n_rows in row_counts:
+        reference_df = make_housing_frame(n_rows, seed=1)
+        current_df = make_housing_frame(n_rows // 4, seed=2)
+        for name, get_report in [("native", drift_engine.get_report), ("evidently", get_evidently_report)]:
+            start_time = time.perf_counter()
+            report = get_report(reference_df, current_df)
+            seconds = time.perf_counter() - start_time
+            metrics = report["data_drift"]["data"]["metrics"]
+            drifted = [column for column in schema["columns"] if metrics[column]["drift_detected"]]
+            print(f"{n_rows} rows, {name}: {seconds:.2f}s, drifted columns: {drifted}")
+
+
+if __name__ == "__main__":
+    main()
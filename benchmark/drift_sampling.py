@@ -0,0 +1,41 @@
+"""
+Full vs sampled drift report: time, agreement of the per column decisions and full fallbacks.
+The current frame has median_income shifted by shift, so one column should drift.
+
+python -m benchmark.drift_sampling
+"""
+from benchmark.common import make_housing_frame, time_call, SCHEMA_FILE_PATH
+from housing.components.drift_engine import DriftEngine
+from housing.utilities.util import get_schema
+
+
+def get_decisions(report: dict, columns) -> dict:
+    metrics = report["data_drift"]["data"]["metrics"]
+    return {column: metrics[column]["drift_detected"] for column in columns}
+
+
+def main(row_counts=(1_000_000, 10_000_000), sample_size: int = 50_000, shift: float = 0.3):
+    schema = get_schema(SCHEMA_FILE_PATH)
+    columns = list(schema["columns"])
+    for numerical_stattest in ["psi", "ks"]:
+        drift_engine = DriftEngine(numerical_columns=schema["numerical_columns"],
+                                   categorical_columns=schema["categorical_columns"],
+                                   numerical_stattest=numerical_stattest)
+        for n_rows in row_counts:
+            reference_df = make_housing_frame(n_rows, seed=1)
+            current_df = make_housing_frame(n_rows // 4, seed=2)
+            current_df["median_income"] += shift
+
+            full_seconds, _ = time_call(lambda: drift_engine.get_report(reference_df, current_df), repeat=1)
+            sampled_seconds, _ = time_call(
+                lambda: drift_engine.get_report(reference_df, current_df, sample_size=sample_size), repeat=1)
+            full_report = drift_engine.get_report(reference_df, current_df)
+            sampled_report = drift_engine.get_report(reference_df, current_df, sample_size=sample_size)
+            agree = get_decisions(full_report, columns) == get_decisions(sampled_report, columns)
+            print(f"{numerical_stattest}, {n_rows} rows: full {full_seconds:.2f}s, sampled {sampled_seconds:.2f}s, "
+                  f"decisions agree: {agree}, "
+                  f"full fallbacks: {sampled_report['data_drift']['data']['sampling']['n_full_fallbacks']}")
+
+
+if __name__ == "__main__":
+    main()
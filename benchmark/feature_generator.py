@@ -0,0 +1,49 @@
+"""
+FeatureGenerator.transform: previous version (one temporary per ratio, then np.c_) vs the
+preallocated one, wall time and peak traced memory by row count, float64 and float32 input.
+
+python -m benchmark.feature_generator
+"""
+import tracemalloc
+
+import numpy as np
+
+from benchmark.common import make_housing_frame, time_call, TARGET_COLUMN
+from housing.components.data_transformation import FeatureGenerator
+
+ROW_COUNTS = [1_000, 100_000, 1_000_000, 5_000_000]
+
+
+def transform_with_temporaries(feature_generator: FeatureGenerator, X):
+    room_per_household = X[:, feature_generator.total_rooms_ix] / X[:, feature_generator.households_ix]
+    population_per_household = X[:, feature_generator.population_ix] / X[:, feature_generator.households_ix]
+    bedrooms_per_room = X[:, feature_generator.total_bedrooms_ix] / X[:, feature_generator.total_rooms_ix]
+    return np.c_[X, room_per_household, population_per_household, bedrooms_per_room]
+
+
+def get_peak_memory_mb(func) -> float:
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+
+def main():
+    for n_rows in ROW_COUNTS:
+        housing_df = make_housing_frame(n_rows, missing_ratio=0.0).drop(columns=[TARGET_COLUMN, "ocean_proximity"])
+        feature_generator = FeatureGenerator(columns=list(housing_df.columns))
+        for dtype in [np.float64, np.float32]:
+            X = housing_df.to_numpy(dtype=dtype)
+            assert np.allclose(feature_generator.transform(X), transform_with_temporaries(feature_generator, X))
+            repeat = 3 if n_rows >= 1_000_000 else 20
+            old_best, _ = time_call(lambda: transform_with_temporaries(feature_generator, X), repeat=repeat)
+            new_best, _ = time_call(lambda: feature_generator.transform(X), repeat=repeat)
+            old_peak = get_peak_memory_mb(lambda: transform_with_temporaries(feature_generator, X))
+            new_peak = get_peak_memory_mb(lambda: feature_generator.transform(X))
+            print(f"rows={n_rows:>9} {np.dtype(dtype).name}: temporaries {old_best * 1000:9.3f}ms "
+                  f"{old_peak:8.1f}MB | preallocated {new_best * 1000:9.3f}ms {new_peak:8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Daily refresh cost: full rebuild of the split vs incremental ingestion (incremental_dir).
+The raw feed starts with n_rows rows and every day appends new_rows_per_day rows.
+Incremental ingestion still reads and hashes the whole feed, but only splits and writes the new rows.
+
+python -m benchmark.incremental_ingestion
+"""
+import os
+import tempfile
+
+from benchmark.common import make_housing_frame, time_call, SCHEMA_FILE_PATH
+from entity.data_ingestion_entity import DataIngestionEntity
+from housing.components.data_ingestion import DataIngestion
+from housing.utilities.util import get_file_join
+
+
+def get_data_ingestion(run_dir: str, incremental_dir: str = None) -> DataIngestion:
+    data_ingestion_config = DataIngestionEntity(
+        dataset_download_url="housing.tgz", tgz_download_dir=None,
+        raw_data_dir=get_file_join(run_dir, "raw_data"),
+        ingested_train_dir=get_file_join(run_dir, "ingested_data", "train"),
+        ingested_test_dir=get_file_join(run_dir, "ingested_data", "test"),
+        dataset_cache_dir=None, dataset_sha256=None, stream_from_archive=False,
+        read_chunk_size=100000, streaming_split=True, artifact_format="csv",
+        schema_file_path=SCHEMA_FILE_PATH, shard_pattern=None, shard_n_jobs=-1,
+        incremental_dir=incremental_dir
+    )
+    return DataIngestion(data_ingestion_config)
+
+
+def main(n_rows: int = 5_000_000, new_rows_per_day: int = 50_000, n_days: int = 3):
+    with tempfile.TemporaryDirectory() as run_dir:
+        os.makedirs(get_file_join(run_dir, "raw_data"))
+        raw_file_path = get_file_join(run_dir, "raw_data", "housing.csv")
+        make_housing_frame(n_rows, seed=0).to_csv(raw_file_path, index=False)
+        incremental_dir = get_file_join(run_dir, "incremental")
+        get_data_ingestion(run_dir, incremental_dir).split_data_as_train_test_incremental()
+
+        for day in range(1, n_days + 1):
+            make_housing_frame(new_rows_per_day, seed=day).to_csv(raw_file_path, mode="a", header=False, index=False)
+            rebuild_seconds, _ = time_call(get_data_ingestion(run_dir).split_data_as_train_test_streaming, repeat=1)
+            incremental_seconds, _ = time_call(
+                get_data_ingestion(run_dir, incremental_dir).split_data_as_train_test_incremental, repeat=1)
+            print(f"day {day}: full rebuild {rebuild_seconds:.2f}s, incremental {incremental_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
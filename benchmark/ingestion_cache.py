@@ -0,0 +1,110 @@
+"""
+Cold vs warm data ingestion through the DatasetCache.
+A local http server stands in for the dataset host; it serves a synthetic housing.tgz with ETag and
+Last-Modified headers and answers conditional requests with 304.
+cold: empty cache, archive is downloaded and extracted
+warm: cache is filled, archive is revalidated (304) and hardlinked from the cache
+file: same as warm, with a file:// source instead of http
+
+python -m benchmark.ingestion_cache
+"""
+import hashlib
+import os
+import tarfile
+import tempfile
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from benchmark.common import make_housing_frame, time_call, SCHEMA_FILE_PATH
+from entity.data_ingestion_entity import DataIngestionEntity
+from housing.components.data_ingestion import DataIngestion
+from housing.utilities.util import get_file_join
+
+
+class ConditionalRequestHandler(SimpleHTTPRequestHandler):
+
+    def send_head(self):
+        file_path = self.translate_path(self.path)
+        if os.path.isfile(file_path):
+            stat = os.stat(file_path)
+            etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return None
+        return super().send_head()
+
+    def end_headers(self):
+        file_path = self.translate_path(self.path)
+        if os.path.isfile(file_path):
+            stat = os.stat(file_path)
+            self.send_header("ETag", f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"')
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_housing_tgz(dir_path: str, n_rows: int) -> str:
+    csv_file_path = get_file_join(dir_path, "housing.csv")
+    make_housing_frame(n_rows).to_csv(csv_file_path, index=False)
+    tgz_file_path = get_file_join(dir_path, "housing.tgz")
+    with tarfile.open(tgz_file_path, "w:gz") as tgz_file_obj:
+        tgz_file_obj.add(csv_file_path, arcname="housing.csv")
+    os.remove(csv_file_path)
+    return tgz_file_path
+
+
+def ingest(source: str, run_dir: str, cache_dir: str = None, dataset_sha256: str = None,
+           stream_from_archive: bool = False):
+    data_ingestion_config = DataIngestionEntity(
+        dataset_download_url=source,
+        tgz_download_dir=get_file_join(run_dir, "tgz_data"),
+        raw_data_dir=get_file_join(run_dir, "raw_data"),
+        ingested_train_dir=get_file_join(run_dir, "ingested_data", "train"),
+        ingested_test_dir=get_file_join(run_dir, "ingested_data", "test"),
+        dataset_cache_dir=cache_dir,
+        dataset_sha256=dataset_sha256,
+        stream_from_archive=stream_from_archive,
+        read_chunk_size=100000,
+        streaming_split=False,
+        artifact_format="csv",
+        schema_file_path=SCHEMA_FILE_PATH,
+        shard_pattern=None,
+        shard_n_jobs=-1,
+        incremental_dir=None
+    )
+    return DataIngestion(data_ingestion_config).initiate_data_ingestion()
+
+
+def main(n_rows: int = 2_000_000):
+    with tempfile.TemporaryDirectory() as work_dir:
+        serve_dir = get_file_join(work_dir, "serve")
+        os.makedirs(serve_dir)
+        tgz_file_path = write_housing_tgz(serve_dir, n_rows)
+        with open(tgz_file_path, "rb") as tgz_file:
+            dataset_sha256 = hashlib.sha256(tgz_file.read()).hexdigest()
+        print(f"archive: {os.path.getsize(tgz_file_path) / 2 ** 20:.1f}MB, {n_rows} rows")
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0),
+                                     lambda *args: ConditionalRequestHandler(*args, directory=serve_dir))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        http_source = f"http://127.0.0.1:{server.server_address[1]}/housing.tgz"
+        file_source = Path(tgz_file_path).as_uri()
+        cache_dir = get_file_join(work_dir, "dataset_cache")
+
+        runs = [("uncached", http_source, None), ("cold", http_source, cache_dir),
+                ("warm", http_source, cache_dir), ("file", file_source, cache_dir)]
+        try:
+            for run_number, (name, source, run_cache_dir) in enumerate(runs):
+                run_dir = get_file_join(work_dir, f"run_{run_number}")
+                seconds, _ = time_call(lambda: ingest(source, run_dir, run_cache_dir, dataset_sha256), repeat=1)
+                print(f"{name}: {seconds:.2f}s")
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
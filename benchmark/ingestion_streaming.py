@@ -0,0 +1,69 @@
+"""
+Peak disk usage and wall time of data ingestion with and without stream_from_archive.
+extract: archive member is extracted into raw_data_dir and read back
+stream: archive member is parsed in chunks while it is decompressed, nothing is extracted
+Disk usage of the run dir (unique inodes) is sampled every 20ms while the ingestion runs.
+
+python -m benchmark.ingestion_streaming
+"""
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmark.ingestion_cache import write_housing_tgz, ingest
+from housing.utilities.util import get_file_join
+
+
+def get_dir_size(dir_path: str) -> int:
+    inodes = {}
+    for dir_name, _, file_names in os.walk(dir_path):
+        for file_name in file_names:
+            try:
+                stat = os.stat(get_file_join(dir_name, file_name))
+            except FileNotFoundError:
+                continue
+            inodes[stat.st_ino] = stat.st_size
+    return sum(inodes.values())
+
+
+class PeakDiskSampler(threading.Thread):
+
+    def __init__(self, dir_path: str, interval: float = 0.02):
+        super().__init__(daemon=True)
+        self.dir_path = dir_path
+        self.interval = interval
+        self.peak_size = 0
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.is_set():
+            self.peak_size = max(self.peak_size, get_dir_size(self.dir_path))
+            time.sleep(self.interval)
+
+    def stop(self) -> int:
+        self.stop_event.set()
+        self.join()
+        self.peak_size = max(self.peak_size, get_dir_size(self.dir_path))
+        return self.peak_size
+
+
+def main(n_rows: int = 5_000_000):
+    with tempfile.TemporaryDirectory() as work_dir:
+        tgz_file_path = write_housing_tgz(work_dir, n_rows)
+        print(f"archive: {os.path.getsize(tgz_file_path) / 2 ** 20:.1f}MB, {n_rows} rows")
+        for name, stream_from_archive in [("extract", False), ("stream", True)]:
+            run_dir = get_file_join(work_dir, name)
+            os.makedirs(run_dir)
+            sampler = PeakDiskSampler(run_dir)
+            sampler.start()
+            start_time = time.perf_counter()
+            ingest(Path(tgz_file_path).as_uri(), run_dir, stream_from_archive=stream_from_archive)
+            seconds = time.perf_counter() - start_time
+            peak_size = sampler.stop()
+            print(f"{name}: {seconds:.2f}s, peak disk {peak_size / 2 ** 20:.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
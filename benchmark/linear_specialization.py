@@ -0,0 +1,34 @@
+"""
+LinearRegression served through the sklearn pipeline vs LinearHousingModel (one dot product).
+
+python -m benchmark.linear_specialization
+"""
+import numpy as np
+from sklearn.linear_model import LinearRegression
+
+from benchmark.common import build_housing_model, make_housing_frame, time_call, TARGET_COLUMN
+from housing.components.preprocessing_kernel import compile_preprocessing_object
+from housing.components.model_specialization import specialize_linear_model, verify_specialized_model
+
+ROW_COUNTS = [1, 100, 10_000, 1_000_000]
+
+
+def main():
+    housing_model, _ = build_housing_model(LinearRegression())
+    preprocessing_obj, model_object = housing_model.preprocessing_object, housing_model.trained_model_object
+    linear_model = specialize_linear_model(compile_preprocessing_object(preprocessing_obj), model_object)
+
+    for n_rows in ROW_COUNTS:
+        rows_df = make_housing_frame(n_rows, seed=n_rows).drop(columns=[TARGET_COLUMN])
+        assert verify_specialized_model(linear_model, preprocessing_obj, model_object, X=rows_df)
+        max_diff = np.max(np.abs(linear_model.predict(rows_df) - housing_model.predict(rows_df)))
+
+        repeat = 3 if n_rows >= 1_000_000 else 20
+        pipeline_best, _ = time_call(lambda: housing_model.predict(rows_df), repeat=repeat)
+        linear_best, _ = time_call(lambda: linear_model.predict(rows_df), repeat=repeat)
+        print(f"rows={n_rows:>9}: pipeline {pipeline_best * 1000:9.3f}ms | folded {linear_best * 1000:9.3f}ms "
+              f"| speedup {pipeline_best / linear_best:6.1f}x | max abs diff {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Concurrent single row requests served directly vs through PredictionBatcher.
+
+python -m benchmark.micro_batching
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sklearn.ensemble import RandomForestRegressor
+
+from benchmark.common import build_housing_model
+from entity.prediction_batcher import PredictionBatcher
+from entity.prediction_entity import PredictionEntity
+
+
+def run_clients(predict, requests, n_clients):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_clients) as executor:
+        list(executor.map(predict, requests))
+    return time.perf_counter() - start
+
+
+def main(n_requests: int = 2000, n_clients: int = 64):
+    housing_model, input_df = build_housing_model(RandomForestRegressor(n_estimators=100, min_samples_leaf=3))
+    requests = [input_df.iloc[[i % len(input_df)]] for i in range(n_requests)]
+
+    elapsed = run_clients(housing_model.predict, requests, n_clients)
+    print(f"direct : {n_requests / elapsed:,.0f} requests/sec")
+
+    for max_wait_ms in [1, 5, 10]:
+        batcher = PredictionBatcher(predictor=housing_model,
+                                    prediction_config=PredictionEntity(micro_batching=True, max_batch_size=256,
+                                                                       max_wait_ms=max_wait_ms,
+                                                                       request_timeout_ms=10000))
+        elapsed = run_clients(batcher.predict, requests, n_clients)
+        metrics = batcher.get_metrics()
+        print(f"batched max_wait={max_wait_ms}ms: {n_requests / elapsed:,.0f} requests/sec, "
+              f"mean batch {metrics['batch_size_mean']:.1f} rows, "
+              f"queue wait p99 {metrics['queue_wait_ms_p99']:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
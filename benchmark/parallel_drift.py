@@ -0,0 +1,48 @@
+"""
+Drift report on a process pool: time by column count and n_jobs, and whether the parallel
+report matches the sequential one. Wide frames are the housing columns repeated with renamed copies.
+
+python -m benchmark.parallel_drift
+"""
+import os
+
+import pandas as pd
+
+from benchmark.common import make_housing_frame, time_call, SCHEMA_FILE_PATH
+from housing.components.drift_engine import DriftEngine
+from housing.utilities.util import get_schema
+
+
+def make_wide_frame(n_rows: int, n_copies: int, seed: int):
+    housing_df = make_housing_frame(n_rows, seed=seed)
+    return pd.concat([housing_df.add_suffix(f"_{copy_number}") for copy_number in range(n_copies)], axis=1)
+
+
+def get_wide_columns(columns: list, n_copies: int) -> list:
+    return [f"{column}_{copy_number}" for copy_number in range(n_copies) for column in columns]
+
+
+def main(n_rows: int = 500_000, copy_counts=(1, 10, 30), sample_size: int = None):
+    schema = get_schema(SCHEMA_FILE_PATH)
+    n_jobs_list = sorted({1, 2, 4, os.cpu_count()})
+    for n_copies in copy_counts:
+        drift_engine = DriftEngine(numerical_columns=get_wide_columns(schema["numerical_columns"], n_copies),
+                                   categorical_columns=get_wide_columns(schema["categorical_columns"], n_copies))
+        reference_df = make_wide_frame(n_rows, n_copies, seed=1)
+        current_df = make_wide_frame(n_rows // 4, n_copies, seed=2)
+        n_columns = len(drift_engine.numerical_columns) + len(drift_engine.categorical_columns)
+        sequential_metrics = None
+        for n_jobs in n_jobs_list:
+            seconds, _ = time_call(lambda: drift_engine.get_report(reference_df, current_df,
+                                                                    sample_size=sample_size, n_jobs=n_jobs),
+                                   repeat=1)
+            report = drift_engine.get_report(reference_df, current_df, sample_size=sample_size, n_jobs=n_jobs)
+            metrics = report["data_drift"]["data"]["metrics"]
+            if sequential_metrics is None:
+                sequential_metrics = metrics
+            print(f"{n_columns} columns, n_jobs {n_jobs}: {seconds:.2f}s, "
+                  f"same as sequential: {metrics == sequential_metrics}")
+
+
+if __name__ == "__main__":
+    main()
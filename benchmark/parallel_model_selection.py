@@ -0,0 +1,43 @@
+"""
+Wall clock of model selection: sequential GridSearchCV per model vs one shared pool of 1..N cores.
+
+python -m benchmark.parallel_model_selection
+"""
+import os
+import time
+
+from benchmark.common import build_preprocessing_object, make_housing_frame, TARGET_COLUMN
+from constant import ROOT_DIR, CONFIG_DIR
+from entity.model_factory import ModelFactory
+from housing.utilities.util import get_file_join
+
+MODEL_CONFIG_FILE_PATH = get_file_join(ROOT_DIR, CONFIG_DIR, "model.yaml")
+
+
+def main(n_rows: int = 20_000):
+    housing_df = make_housing_frame(n_rows)
+    X = build_preprocessing_object().fit_transform(housing_df.drop(columns=[TARGET_COLUMN]))
+    y = housing_df[TARGET_COLUMN].to_numpy()
+
+    model_factory = ModelFactory(model_config_path=MODEL_CONFIG_FILE_PATH)
+    model_factory.grid_search_property_data["verbose"] = 0
+    initialized_model_list = model_factory.get_initialized_model_list()
+
+    start = time.perf_counter()
+    model_factory.parallel_search_enabled = False
+    sequential = model_factory.initiate_best_parameter_search_for_initialized_models(initialized_model_list, X, y)
+    print(f"sequential GridSearchCV: {time.perf_counter() - start:.2f}s")
+
+    n_cores = os.cpu_count()
+    core_counts = sorted({1, 2, 4, 8, 16, 32, n_cores} & set(range(1, n_cores + 1)))
+    for n_jobs in core_counts:
+        start = time.perf_counter()
+        parallel = model_factory.initiate_parallel_best_parameter_search(initialized_model_list, X, y, n_jobs=n_jobs)
+        elapsed = time.perf_counter() - start
+        same_result = [(m.best_parameters, round(m.best_score, 10)) for m in parallel] == \
+                      [(m.best_parameters, round(m.best_score, 10)) for m in sequential]
+        print(f"shared pool n_jobs={n_jobs:>3}: {elapsed:.2f}s, same result as sequential: {same_result}")
+
+
+if __name__ == "__main__":
+    main()
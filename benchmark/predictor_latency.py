@@ -0,0 +1,36 @@
+"""
+Cold vs warm HousingPredictor latency.
+cold: every request lists saved_models/ and unpickles the model (previous behaviour)
+warm: model is served from HousingModelCache
+
+python -m benchmark.predictor_latency
+"""
+import tempfile
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from benchmark.common import build_housing_model, time_call
+from entity.housing_predictor import HousingPredictor, HousingModelCache
+from housing.utilities.util import save_object, get_file_join
+
+
+def main(n_requests: int = 50):
+    housing_model, input_df = build_housing_model(RandomForestRegressor(n_estimators=100, min_samples_leaf=3))
+    request_df = input_df.iloc[:1]
+    with tempfile.TemporaryDirectory() as model_dir:
+        save_object(file_path=get_file_join(model_dir, "20240101000000", "model.pkl"), obj=housing_model)
+
+        HousingModelCache.clear()
+        cold_predictor = HousingPredictor(model_dir=model_dir, use_cache=False)
+        warm_predictor = HousingPredictor(model_dir=model_dir)
+        warm_predictor.predict(request_df)
+
+        for name, predictor in [("cold", cold_predictor), ("warm", warm_predictor)]:
+            timings = [time_call(lambda: predictor.predict(request_df), repeat=1)[0] for _ in range(n_requests)]
+            print(f"{name}: p50={np.percentile(timings, 50) * 1000:.2f}ms "
+                  f"p99={np.percentile(timings, 99) * 1000:.2f}ms over {n_requests} requests")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Fitted sklearn ColumnTransformer vs CompiledPreprocessor on the same rows.
+
+python -m benchmark.preprocessing_kernel
+"""
+import numpy as np
+
+from benchmark.common import build_preprocessing_object, make_housing_frame, time_call, TARGET_COLUMN
+from housing.components.preprocessing_kernel import compile_preprocessing_object
+
+ROW_COUNTS = [1, 100, 10_000, 1_000_000]
+
+
+def main():
+    input_df = make_housing_frame(20_000).drop(columns=[TARGET_COLUMN])
+    preprocessing_obj = build_preprocessing_object()
+    preprocessing_obj.fit(input_df)
+    compiled_preprocessor = compile_preprocessing_object(preprocessing_obj)
+
+    for n_rows in ROW_COUNTS:
+        rows_df = make_housing_frame(n_rows, seed=n_rows).drop(columns=[TARGET_COLUMN])
+        numerical = rows_df[compiled_preprocessor.numerical_columns].to_numpy(dtype=np.float64)
+        category_codes = compiled_preprocessor.encode_categories(rows_df[compiled_preprocessor.categorical_column])
+
+        expected = preprocessing_obj.transform(rows_df)
+        assert np.array_equal(compiled_preprocessor.transform(rows_df), expected)
+        assert np.array_equal(compiled_preprocessor.transform_arrays(numerical, category_codes), expected)
+
+        repeat = 3 if n_rows >= 1_000_000 else 20
+        sklearn_best, _ = time_call(lambda: preprocessing_obj.transform(rows_df), repeat=repeat)
+        compiled_best, _ = time_call(lambda: compiled_preprocessor.transform(rows_df), repeat=repeat)
+        kernel_best, _ = time_call(lambda: compiled_preprocessor.transform_arrays(numerical, category_codes),
+                                   repeat=repeat)
+        print(f"rows={n_rows:>9}: sklearn {sklearn_best * 1000:9.3f}ms | compiled(frame) "
+              f"{compiled_best * 1000:9.3f}ms | compiled(arrays) {kernel_best * 1000:9.3f}ms "
+              f"| speedup {sklearn_best / kernel_best:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""
+Reference profile size and batch comparison time as the reference grows, against the full
+DriftEngine report that needs the reference rows.
+
+python -m benchmark.reference_profile
+"""
+import os
+import tempfile
+
+from benchmark.common import make_housing_frame, time_call, SCHEMA_FILE_PATH
+from housing.components.drift_engine import DriftEngine
+from housing.components.reference_profile import ReferenceProfile
+from housing.utilities.util import get_schema, get_file_join
+
+
+def main(row_counts=(100_000, 1_000_000, 10_000_000), batch_rows: int = 10_000):
+    schema = get_schema(SCHEMA_FILE_PATH)
+    drift_engine = DriftEngine(numerical_columns=schema["numerical_columns"],
+                               categorical_columns=schema["categorical_columns"])
+    batch_df = make_housing_frame(batch_rows, seed=2)
+    with tempfile.TemporaryDirectory() as work_dir:
+        profile_file_path = get_file_join(work_dir, "reference_profile.json")
+        for n_rows in row_counts:
+            reference_df = make_housing_frame(n_rows, seed=1)
+            build_seconds, _ = time_call(lambda: ReferenceProfile.build(
+                reference_df, schema["numerical_columns"], schema["categorical_columns"]).save(profile_file_path),
+                                         repeat=1)
+            compare_seconds, _ = time_call(
+                lambda: ReferenceProfile.load(profile_file_path).compare(batch_df, drift_engine), repeat=5)
+            full_seconds, _ = time_call(lambda: drift_engine.get_report(reference_df, batch_df), repeat=1)
+            print(f"{n_rows} reference rows: profile {os.path.getsize(profile_file_path) / 1024:.1f}KB "
+                  f"built in {build_seconds:.2f}s, compare {batch_rows} rows {compare_seconds * 1000:.1f}ms, "
+                  f"full report {full_seconds * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
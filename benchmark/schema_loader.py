@@ -0,0 +1,50 @@
+"""
+Memory and load time of the train/test frames loaded by DataTransformation and ModelEvaluation.
+untyped: pd.read_csv as read before (schema types were not applied)
+schema: util.load_data with config/schema.json (ocean_proximity as categorical)
+float32: util.load_data with every float column configured as float32
+
+python -m benchmark.schema_loader
+"""
+import json
+import tempfile
+
+import pandas as pd
+
+from benchmark.common import make_housing_frame, time_call, SCHEMA_FILE_PATH
+from housing.utilities.util import get_file_join, load_data, get_dictionary_from_json
+
+
+def get_memory_mb(data_frames) -> float:
+    return sum(data_frame.memory_usage(deep=True).sum() for data_frame in data_frames) / 2 ** 20
+
+
+def main(n_rows: int = 1_000_000):
+    housing_df = make_housing_frame(n_rows)
+    split_at = int(n_rows * 0.8)
+    with tempfile.TemporaryDirectory() as work_dir:
+        file_paths = [get_file_join(work_dir, "train.csv"), get_file_join(work_dir, "test.csv")]
+        housing_df.iloc[:split_at].to_csv(file_paths[0], index=False)
+        housing_df.iloc[split_at:].to_csv(file_paths[1], index=False)
+
+        schema = get_dictionary_from_json(SCHEMA_FILE_PATH)
+        schema["columns"] = {column: "float32" if column_type == "float" else column_type
+                             for column, column_type in schema["columns"].items()}
+        float32_schema_file_path = get_file_join(work_dir, "schema_float32.json")
+        with open(float32_schema_file_path, "w") as schema_file:
+            json.dump(schema, schema_file)
+
+        loaders = {
+            "untyped": lambda: [pd.read_csv(file_path) for file_path in file_paths],
+            "schema": lambda: [load_data(file_path, SCHEMA_FILE_PATH) for file_path in file_paths],
+            "float32": lambda: [load_data(file_path, float32_schema_file_path) for file_path in file_paths],
+        }
+        for name, loader in loaders.items():
+            seconds, _ = time_call(loader, repeat=3)
+            memory_mb = get_memory_mb(loader())
+            # data_transformation and model_evaluation each hold both frames
+            print(f"{name}: {memory_mb:.1f}MB per stage, load {seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
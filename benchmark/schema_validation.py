@@ -0,0 +1,57 @@
+"""
+Streaming schema validation: wall time and peak traced memory by file size, next to reading the
+whole file with pandas. A few rows get a non numeric value, a negative population and an unknown
+ocean_proximity, which the report has to find.
+
+python -m benchmark.schema_validation
+"""
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmark.common import make_housing_frame, SCHEMA_FILE_PATH
+from housing.components.schema_validator import SchemaValidator
+from housing.utilities.util import get_file_join, get_schema
+
+
+def get_peak_memory(func):
+    """
+    Returns (seconds, peak traced memory in MB, result) of one call.
+    """
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak / 2 ** 20, result
+
+
+def write_faulty_csv(file_path: str, n_rows: int, n_faults: int = 100):
+    housing_df = make_housing_frame(n_rows)
+    housing_df["median_income"] = housing_df["median_income"].astype(object)
+    fault_rows = housing_df.index[::max(n_rows // n_faults, 1)][:n_faults]
+    housing_df.loc[fault_rows, "median_income"] = "n/a"
+    housing_df.loc[fault_rows, "population"] = -1.0
+    housing_df.loc[fault_rows, "ocean_proximity"] = "MOON"
+    housing_df.to_csv(file_path, index=False)
+
+
+def main(row_counts=(1_000_000, 5_000_000), chunk_size: int = 100_000):
+    schema_validator = SchemaValidator(get_schema(SCHEMA_FILE_PATH))
+    with tempfile.TemporaryDirectory() as work_dir:
+        for n_rows in row_counts:
+            file_path = get_file_join(work_dir, f"housing_{n_rows}.csv")
+            write_faulty_csv(file_path, n_rows)
+            read_seconds, read_peak, _ = get_peak_memory(lambda: pd.read_csv(file_path))
+            seconds, peak, report = get_peak_memory(lambda: schema_validator.validate_file(file_path, chunk_size))
+            failed = {f"{rule['rule']}:{rule['column']}": rule["n_failed"]
+                      for rule in report["rules"] if not rule["passed"]}
+            print(f"{n_rows} rows: streaming validation {seconds:.2f}s, peak {peak:.1f}MB | "
+                  f"full read_csv {read_seconds:.2f}s, peak {read_peak:.1f}MB | failed rules: {failed}")
+
+
+if __name__ == "__main__":
+    main()
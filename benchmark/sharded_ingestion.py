@@ -0,0 +1,52 @@
+"""
+Throughput of sharded ingestion (shard_pattern) when parsing the shards on 1..N cores.
+
+python -m benchmark.sharded_ingestion
+"""
+import os
+import tempfile
+
+from benchmark.common import make_housing_frame, time_call, SCHEMA_FILE_PATH
+from entity.data_ingestion_entity import DataIngestionEntity
+from housing.components.data_ingestion import DataIngestion
+from housing.utilities.util import get_file_join
+
+
+def get_data_ingestion(run_dir: str, shard_n_jobs: int) -> DataIngestion:
+    data_ingestion_config = DataIngestionEntity(
+        dataset_download_url="housing.tgz", tgz_download_dir=None,
+        raw_data_dir=get_file_join(run_dir, "raw_data"),
+        ingested_train_dir=get_file_join(run_dir, "ingested_data", "train"),
+        ingested_test_dir=get_file_join(run_dir, "ingested_data", "test"),
+        dataset_cache_dir=None, dataset_sha256=None, stream_from_archive=False,
+        read_chunk_size=100000, streaming_split=False, artifact_format="csv",
+        schema_file_path=SCHEMA_FILE_PATH, shard_pattern="*.csv", shard_n_jobs=shard_n_jobs,
+        incremental_dir=None
+    )
+    return DataIngestion(data_ingestion_config)
+
+
+def main(n_shards: int = 200, rows_per_shard: int = 20_000):
+    with tempfile.TemporaryDirectory() as run_dir:
+        shard_dir = get_file_join(run_dir, "raw_data", "regions")
+        os.makedirs(shard_dir)
+        for shard_number in range(n_shards):
+            make_housing_frame(rows_per_shard, seed=shard_number).to_csv(
+                get_file_join(shard_dir, f"region_{shard_number:04d}.csv"), index=False)
+        print(f"{n_shards} shards x {rows_per_shard} rows")
+
+        n_cores = os.cpu_count()
+        for shard_n_jobs in sorted({1, 2, 4, n_cores}):
+            if shard_n_jobs > n_cores:
+                continue
+            data_ingestion = get_data_ingestion(run_dir, shard_n_jobs)
+            seconds, _ = time_call(data_ingestion.read_raw_data_shards, repeat=3)
+            print(f"n_jobs={shard_n_jobs}: parse {seconds:.2f}s, "
+                  f"{n_shards * rows_per_shard / seconds / 1e6:.2f}M rows/s")
+
+        seconds, _ = time_call(get_data_ingestion(run_dir, -1).split_data_as_train_test, repeat=1)
+        print(f"parse + split + write on all cores: {seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Peak memory and wall time of the in memory vs the streaming train/test split, and how close the
+income_cat proportions of both test sets are.
+The in memory split runs on the first in_memory_rows rows only, a larger file may not fit in RAM.
+Every split runs in its own process, which reports its peak resident memory.
+
+python -m benchmark.streaming_split [n_rows]
+"""
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmark.common import make_housing_frame, SCHEMA_FILE_PATH
+from entity.data_ingestion_entity import DataIngestionEntity
+from housing.components.data_ingestion import DataIngestion, INCOME_CATEGORY_BINS
+from housing.utilities.util import get_file_join
+
+
+def write_housing_csv(file_path: str, n_rows: int, chunk_rows: int = 1_000_000):
+    for chunk_number, start in enumerate(range(0, n_rows, chunk_rows)):
+        chunk = make_housing_frame(min(chunk_rows, n_rows - start), seed=chunk_number)
+        chunk.to_csv(file_path, mode="w" if chunk_number == 0 else "a", header=chunk_number == 0, index=False)
+
+
+def run_split(run_dir: str, streaming: bool, result_queue):
+    data_ingestion_config = DataIngestionEntity(
+        dataset_download_url=None, tgz_download_dir=None,
+        raw_data_dir=get_file_join(run_dir, "raw_data"),
+        ingested_train_dir=get_file_join(run_dir, "ingested_data", "train"),
+        ingested_test_dir=get_file_join(run_dir, "ingested_data", "test"),
+        dataset_cache_dir=None, dataset_sha256=None, stream_from_archive=False,
+        read_chunk_size=100000, streaming_split=streaming, artifact_format="csv",
+        schema_file_path=SCHEMA_FILE_PATH, shard_pattern=None, shard_n_jobs=-1,
+        incremental_dir=None
+    )
+    data_ingestion = DataIngestion(data_ingestion_config)
+    start_time = time.perf_counter()
+    if streaming:
+        artifact = data_ingestion.split_data_as_train_test_streaming()
+    else:
+        artifact = data_ingestion.split_data_as_train_test()
+    seconds = time.perf_counter() - start_time
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    result_queue.put((seconds, peak_rss_mb, artifact.test_file_path))
+
+
+def get_test_proportions(test_file_path: str) -> np.ndarray:
+    counts = np.zeros(len(INCOME_CATEGORY_BINS) - 1)
+    for chunk in pd.read_csv(test_file_path, usecols=["median_income"], chunksize=1_000_000):
+        counts += pd.cut(chunk["median_income"], bins=INCOME_CATEGORY_BINS).value_counts(sort=False).to_numpy()
+    return counts / counts.sum()
+
+
+def main(n_rows: int = 50_000_000, in_memory_rows: int = 2_000_000):
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as work_dir:
+        runs = [("in_memory", min(n_rows, in_memory_rows), False), ("streaming", n_rows, True)]
+        proportions = {}
+        for name, run_rows, streaming in runs:
+            run_dir = get_file_join(work_dir, name)
+            os.makedirs(get_file_join(run_dir, "raw_data"))
+            raw_file_path = get_file_join(run_dir, "raw_data", "housing.csv")
+            write_housing_csv(raw_file_path, run_rows)
+
+            result_queue = context.Queue()
+            process = context.Process(target=run_split, args=(run_dir, streaming, result_queue))
+            process.start()
+            seconds, peak_rss_mb, test_file_path = result_queue.get()
+            process.join()
+            proportions[name] = get_test_proportions(test_file_path)
+            print(f"{name}: {run_rows} rows ({os.path.getsize(raw_file_path) / 2 ** 30:.2f}GB) "
+                  f"in {seconds:.1f}s, peak memory {peak_rss_mb:.0f}MB")
+            os.remove(raw_file_path)
+
+        for label, (in_memory, streaming) in enumerate(zip(proportions["in_memory"], proportions["streaming"]), 1):
+            print(f"income_cat {label}: in_memory {in_memory:.4f} streaming {streaming:.4f}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -24,6 +24,15 @@ DATA_INGESTION_TGZ_DOWNLOAD_DIR_KEY = "tgz_download_dir"
 DATA_INGESTION_INGESTED_DIR_NAME_KEY = "ingested_dir"
 DATA_INGESTION_TRAIN_DIR_KEY = "ingested_train_dir"
 DATA_INGESTION_TEST_DIR_KEY = "ingested_test_dir"
+DATA_INGESTION_DATASET_CACHE_DIR_KEY = "dataset_cache_dir"
+DATA_INGESTION_DATASET_SHA256_KEY = "dataset_sha256"
+DATA_INGESTION_STREAM_FROM_ARCHIVE_KEY = "stream_from_archive"
+DATA_INGESTION_READ_CHUNK_SIZE_KEY = "read_chunk_size"
+DATA_INGESTION_STREAMING_SPLIT_KEY = "streaming_split"
+DATA_INGESTION_ARTIFACT_FORMAT_KEY = "artifact_format"
+DATA_INGESTION_SHARD_PATTERN_KEY = "shard_pattern"
+DATA_INGESTION_SHARD_N_JOBS_KEY = "shard_n_jobs"
+DATA_INGESTION_INCREMENTAL_DIR_KEY = "incremental_dir"
 
 # Data Validation related variables
 DATA_VALIDATION_CONFIG_KEY = "data_validation_config"
@@ -32,6 +41,15 @@ DATA_VALIDATION_SCHEMA_DIR_KEY = "schema_dir"
 DATA_VALIDATION_ARTIFACT_DIR_NAME = "data_validation"
 DATA_VALIDATION_REPORT_FILE_NAME_KEY = "report_file_name"
 DATA_VALIDATION_REPORT_PAGE_FILE_NAME_KEY = "report_page_file_name"
+DATA_VALIDATION_DRIFT_ENGINE_KEY = "drift_engine"
+DATA_VALIDATION_NUMERICAL_STATTEST_KEY = "numerical_stattest"
+DATA_VALIDATION_REFERENCE_PROFILE_FILE_NAME_KEY = "reference_profile_file_name"
+DATA_VALIDATION_DRIFT_SAMPLE_SIZE_KEY = "drift_sample_size"
+DATA_VALIDATION_DRIFT_N_JOBS_KEY = "drift_n_jobs"
+DATA_VALIDATION_REPORT_PAGE_MODE_KEY = "report_page_mode"
+DATA_VALIDATION_SCHEMA_REPORT_FILE_NAME_KEY = "schema_report_file_name"
+DATA_VALIDATION_SCHEMA_CHUNK_SIZE_KEY = "schema_chunk_size"
+DATA_VALIDATION_MAX_FAILED_ROWS_KEY = "max_failed_rows"
 
 # Data Transformation related variables
 DATA_TRANSFORMATION_CONFIG_KEY = "data_transformation_config"
@@ -50,6 +68,8 @@ MODEL_TRAINER_TRAINED_MODEL_FILE_NAME_KEY = "model_file_name"
 MODEL_TRAINER_BASE_ACCURACY_KEY = "base_accuracy"
 MODEL_TRAINER_MODEL_CONFIG_DIR_KEY = "model_config_dir"
 MODEL_TRAINER_MODEL_CONFIG_FILE_NAME_KEY = "model_config_file_name"
+MODEL_TRAINER_FIT_CACHE_DIR_KEY = "fit_cache_dir"
+MODEL_TRAINER_FIT_CACHE_MAX_SIZE_MB_KEY = "fit_cache_max_size_mb"
 
 MODEL_EVALUATION_CONFIG_KEY = "model_evaluation_config"
 MODEL_EVALUATION_FILE_NAME_KEY = "model_evaluation_file_name"
@@ -57,9 +77,17 @@ MODEL_EVALUATION_FILE_NAME_KEY = "model_evaluation_file_name"
 MODEL_PUSHER_CONFIG_KEY = "model_pusher_config"
 MODEL_PUSHER_MODEL_EXPORT_DIR_KEY = "model_export_dir"
 
+# Prediction serving related variables
+PREDICTION_CONFIG_KEY = "prediction_config"
+PREDICTION_MICRO_BATCHING_KEY = "micro_batching"
+PREDICTION_MAX_BATCH_SIZE_KEY = "max_batch_size"
+PREDICTION_MAX_WAIT_MS_KEY = "max_wait_ms"
+PREDICTION_REQUEST_TIMEOUT_MS_KEY = "request_timeout_ms"
+
 TRAINING_PIPELINE_CONFIG = "training_pipeline_config"
 PIPELINE_NAME = "pipeline_name"
 ARTIFACT_DIR = "artifact_dir"
+STAGE_CACHE_DIR_KEY = "stage_cache_dir"
 
 
 EXPERIMENT_DIR_NAME="experiment"
@@ -5,16 +5,21 @@ DataIngestionArtifact = namedtuple("DataIngestionArtifact",
 
 DataValidationArtifact = namedtuple("DataValidationArtifact",
                                     ["schema_file_path", "report_file_path", "report_page_file_path", "is_validated",
-                                     "message"])
+                                     "message", "reference_profile_file_path", "schema_report_file_path"],
+                                    defaults=[None, None])
 
 DataTransformationArtifact = namedtuple("DataTransformationArtifact",
                                         ["is_transformed", "message", "transformed_train_file_path",
                                          "transformed_test_file_path",
-                                         "preprocessed_object_file_path"])
+                                         "preprocessed_object_file_path",
+                                         "ingested_train_file_path", "ingested_test_file_path",
+                                         "schema_file_path"],
+                                        defaults=[None, None, None])
 
 ModelTrainerArtifact = namedtuple("ModelTrainerArtifact", ["is_trained", "message", "trained_model_file_path",
                                                            "train_rmse", "test_rmse", "train_accuracy", "test_accuracy",
-                                                           "model_accuracy"])
+                                                           "model_accuracy", "fit_cache_summary"],
+                                  defaults=[None])
 
 ModelEvaluationArtifact = namedtuple("ModelEvaluationArtifact", ["is_model_accepted", "evaluated_model_path"])
 
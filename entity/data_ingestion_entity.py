@@ -5,4 +5,14 @@ DataIngestionEntity = namedtuple("DataIngestionConfig",
                                   "tgz_download_dir",
                                   "raw_data_dir",
                                   "ingested_train_dir",
-                                  "ingested_test_dir"])
+                                  "ingested_test_dir",
+                                  "dataset_cache_dir",
+                                  "dataset_sha256",
+                                  "stream_from_archive",
+                                  "read_chunk_size",
+                                  "streaming_split",
+                                  "artifact_format",
+                                  "schema_file_path",
+                                  "shard_pattern",
+                                  "shard_n_jobs",
+                                  "incremental_dir"])
@@ -1,4 +1,9 @@
 from collections import namedtuple
 
-DataValidationEntity = namedtuple("DataValidationConfig", ["schema_file_path","report_file_path","report_page_file_path"])
+DataValidationEntity = namedtuple("DataValidationConfig", ["schema_file_path","report_file_path","report_page_file_path",
+                                                           "drift_engine", "numerical_stattest",
+                                                           "reference_profile_file_path", "drift_sample_size",
+                                                           "drift_n_jobs", "report_page_mode",
+                                                           "schema_report_file_path", "schema_chunk_size",
+                                                           "max_failed_rows"])
 
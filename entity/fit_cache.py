@@ -0,0 +1,103 @@
+import os
+import sys
+
+import numpy as np
+from joblib import hash as joblib_hash
+
+from housing.exception import CustomException
+from housing.logger import logging
+from housing.utilities.util import make_directories, get_file_join, save_object, load_object, \
+    get_filename_from_directory_list, check_dir_exists
+
+FIT_CACHE_FILE_EXTENSION = ".pkl"
+# settings that change how fits run or report, not their result, are left out of cache keys
+FIT_CACHE_IGNORED_PARAMS = ["n_jobs", "verbose", "pre_dispatch", "return_train_score"]
+
+
+def get_data_fingerprint(input_feature, output_feature) -> str:
+    """
+    Content hash of the training arrays (values, shape and dtype).
+    """
+    return joblib_hash((np.ascontiguousarray(input_feature), np.ascontiguousarray(output_feature)))
+
+
+def get_result_params(params: dict) -> dict:
+    return {key: value for key, value in params.items() if key not in FIT_CACHE_IGNORED_PARAMS}
+
+
+def get_estimator_spec(estimator) -> tuple:
+    return type(estimator).__module__, type(estimator).__name__, get_result_params(estimator.get_params(deep=False))
+
+
+class FitCache:
+    """
+    On disk cache of parameter search results, one dill file per key in cache_dir.
+    Keys are hashes of everything the result depends on (data fingerprint, estimator class and
+    parameters, search/cv config). When the directory grows above max_size_mb the least recently
+    used entries are removed.
+    """
+
+    def __init__(self, cache_dir: str, max_size_mb: float = 512):
+        try:
+            self.cache_dir = cache_dir
+            self.max_size_bytes = int(max_size_mb * 2 ** 20)
+            self.hits = 0
+            self.misses = 0
+            make_directories(self.cache_dir)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def get_key(*key_parts) -> str:
+        return joblib_hash(key_parts)
+
+    def get_file_path(self, key: str) -> str:
+        return get_file_join(self.cache_dir, f"{key}{FIT_CACHE_FILE_EXTENSION}")
+
+    def get(self, key: str):
+        """
+        Returns the cached value or None.
+        """
+        file_path = self.get_file_path(key)
+        if check_dir_exists(file_path):
+            try:
+                value = load_object(file_path=file_path)
+                os.utime(file_path)
+                self.hits += 1
+                return value
+            except Exception as e:
+                logging.info(f"Dropping unreadable fit cache entry [{file_path}]: {e}")
+                os.remove(file_path)
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value):
+        try:
+            file_path = self.get_file_path(key)
+            save_object(file_path=f"{file_path}.tmp", obj=value)
+            os.replace(f"{file_path}.tmp", file_path)
+            self.evict()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_entries(self) -> list:
+        entries = []
+        for file_name in get_filename_from_directory_list(self.cache_dir):
+            if file_name.endswith(FIT_CACHE_FILE_EXTENSION):
+                stat = os.stat(get_file_join(self.cache_dir, file_name))
+                entries.append((stat.st_mtime, stat.st_size, file_name))
+        return entries
+
+    def evict(self):
+        entries = sorted(self.get_entries())
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, file_name in entries:
+            if total_size <= self.max_size_bytes:
+                break
+            os.remove(get_file_join(self.cache_dir, file_name))
+            total_size -= size
+            logging.info(f"Evicted fit cache entry [{file_name}]")
+
+    def get_summary(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses,
+                "size_mb": round(sum(size for _, size, _ in self.get_entries()) / 2 ** 20, 2)}
@@ -1,11 +1,17 @@
 import sys
+from collections import namedtuple
+from threading import Lock
 
+from housing.components.model_specialization import load_serving_model
 from housing.exception import CustomException
-from housing.utilities.util import load_object
-from housing.utilities.util import get_file_join, get_filename_from_directory_list, \
-    get_first_filename_from_directory_list
+from housing.logger import logging
+from housing.utilities.util import get_modified_time_ns, get_schema
+from housing.utilities.util import get_file_join, get_filename_from_directory_list, get_is_file
+import numpy as np
 import pandas as pd
 
+LoadedModel = namedtuple("LoadedModel", ["model_path", "model", "model_dir_modified_time"])
+
 
 class HousingData:
 
@@ -60,28 +66,186 @@ class HousingData:
             raise CustomException(e, sys)
 
 
-class HousingPredictor:
+class HousingBatchData:
+    """
+    Many houses sent in one JSON request, either as column arrays
+    {"longitude": [...], "latitude": [...], ...} or as a list of records [{"longitude": ..., ...}, ...].
+    Input is validated against schema.json and converted into one columnar dataframe.
+    """
+
+    def __init__(self, housing_data, schema_file_path: str):
+        try:
+            self.housing_data = housing_data
+            self.schema = get_schema(schema_file_path)
+            self.input_columns = [column for column in self.schema["columns"].keys()
+                                  if column != self.schema["target_column"]]
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_column_arrays(self) -> dict:
+        housing_data = self.housing_data
+        if isinstance(housing_data, dict):
+            missing_columns = [column for column in self.input_columns if column not in housing_data]
+            if missing_columns:
+                raise ValueError(f"Columns: {missing_columns} are missing in request.")
+            return {column: housing_data[column] for column in self.input_columns}
+        if isinstance(housing_data, list):
+            column_arrays = {column: [] for column in self.input_columns}
+            for row_number, record in enumerate(housing_data):
+                if not isinstance(record, dict):
+                    raise ValueError(f"Record: [{row_number}] is not an object.")
+                for column in self.input_columns:
+                    if column not in record:
+                        raise ValueError(f"Column: [{column}] is missing in record: [{row_number}].")
+                    column_arrays[column].append(record[column])
+            return column_arrays
+        raise ValueError("Request body must be an object of column arrays or a list of records.")
+
+    def get_housing_input_data_frame(self) -> pd.DataFrame:
+        """
+        Validates the request and returns one dataframe with the schema column order.
+        Missing values (null) are kept as missing for the pipeline to impute.
+        Raises ValueError describing the first problem found.
+        """
+        column_arrays = self.get_column_arrays()
+        n_rows = {len(values) if isinstance(values, list) else -1 for values in column_arrays.values()}
+        if -1 in n_rows:
+            raise ValueError("Every column must be a list of values.")
+        if len(n_rows) != 1:
+            raise ValueError("All columns must have the same number of values.")
+        if n_rows == {0}:
+            raise ValueError("Request does not contain any house.")
+
+        data = {}
+        for column in self.input_columns:
+            values = column_arrays[column]
+            if column in self.schema["numerical_columns"]:
+                try:
+                    data[column] = np.asarray(values, dtype=np.float64)
+                except (TypeError, ValueError):
+                    raise ValueError(f"Column: [{column}] must contain only numbers.")
+            else:
+                data[column] = np.asarray(values, dtype=object)
+                domain_value = self.schema["domain_value"].get(column)
+                if domain_value is not None:
+                    # missing values (null) are allowed, the trained pipeline imputes them like missing numbers
+                    invalid = ~np.isin(data[column], domain_value) & ~pd.isna(data[column])
+                    if invalid.any():
+                        # repr, so values of mixed types can be sorted and are shown with their type
+                        invalid_values = sorted({repr(value) for value in data[column][invalid]})
+                        raise ValueError(f"Column: [{column}] has values [{', '.join(invalid_values)}] "
+                                         f"outside of {domain_value}.")
+        return pd.DataFrame(data, columns=self.input_columns)
+
+
+def get_latest_model_path(model_dir: str) -> str:
+    """
+    Returns the model file inside the most recent saved_models/<time_stamp> folder.
+    Folders which are not plain time stamps (e.g. an export still being staged) are skipped, and so
+    are sub folders of the model folder (compact_forest/).
+    """
+    try:
+        folder_name = [int(name) for name in get_filename_from_directory_list(model_dir) if name.isdigit()]
+        latest_model_dir = get_file_join(model_dir, f"{max(folder_name)}")
+        file_name = sorted(name for name in get_filename_from_directory_list(latest_model_dir)
+                           if get_is_file(get_file_join(latest_model_dir, name)))[0]
+        latest_model_path = get_file_join(latest_model_dir, file_name)
+        return latest_model_path
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+class HousingModelCache:
+    """
+    Process wide cache of the latest pushed model.
+    The model is loaded once (forest nodes memory mapped) and kept in memory. On every lookup only
+    the modified time of model_dir is compared, it changes when ModelPusher renames a new time stamp folder into it.
+    Only then the folder is listed again and, if the latest model path changed, the new model is
+    loaded and swapped in as a whole so concurrent requests always see a complete model.
+    """
+    _instances = {}
+    _instances_lock = Lock()
 
     def __init__(self, model_dir: str):
         try:
             self.model_dir = model_dir
+            self.loaded_model: LoadedModel = None
+            self._lock = Lock()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @classmethod
+    def get_instance(cls, model_dir: str) -> "HousingModelCache":
+        try:
+            with cls._instances_lock:
+                if model_dir not in cls._instances:
+                    cls._instances[model_dir] = cls(model_dir=model_dir)
+                return cls._instances[model_dir]
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @classmethod
+    def clear(cls):
+        with cls._instances_lock:
+            cls._instances = {}
+
+    def is_stale(self, loaded_model: LoadedModel, model_dir_modified_time: int) -> bool:
+        return loaded_model is None or loaded_model.model_dir_modified_time != model_dir_modified_time
+
+    def get_model(self):
+        try:
+            model_dir_modified_time = get_modified_time_ns(self.model_dir)
+            loaded_model = self.loaded_model
+            if not self.is_stale(loaded_model, model_dir_modified_time):
+                return loaded_model.model
+
+            with self._lock:
+                loaded_model = self.loaded_model
+                if not self.is_stale(loaded_model, model_dir_modified_time):
+                    return loaded_model.model
+
+                model_path = get_latest_model_path(self.model_dir)
+                if loaded_model is not None and loaded_model.model_path == model_path:
+                    model = loaded_model.model
+                else:
+                    logging.info(f"Loading model into cache from: [{model_path}]")
+                    model = load_serving_model(model_path)
+
+                self.loaded_model = LoadedModel(model_path=model_path,
+                                                model=model,
+                                                model_dir_modified_time=model_dir_modified_time)
+                return model
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+
+class HousingPredictor:
+
+    def __init__(self, model_dir: str, use_cache: bool = True):
+        try:
+            self.model_dir = model_dir
+            self.use_cache = use_cache
         except Exception as e:
             raise CustomException(e, sys) from e
 
     def get_latest_model_path(self):
         try:
-            folder_name = list(map(int, get_filename_from_directory_list(self.model_dir)))
-            latest_model_dir = get_file_join(self.model_dir, f"{max(folder_name)}")
-            file_name = get_first_filename_from_directory_list(latest_model_dir)
-            latest_model_path = get_file_join(latest_model_dir, file_name)
-            return latest_model_path
+            return get_latest_model_path(self.model_dir)
         except Exception as e:
             raise CustomException(e, sys) from e
 
-    def predict(self, X):
+    def get_model(self):
         try:
+            if self.use_cache:
+                return HousingModelCache.get_instance(self.model_dir).get_model()
             model_path = self.get_latest_model_path()
-            model = load_object(file_path=model_path)
+            return load_serving_model(model_path)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def predict(self, X):
+        try:
+            model = self.get_model()
             median_house_value = model.predict(X)
             return median_house_value
         except Exception as e:
@@ -1,13 +1,19 @@
 import importlib
+import inspect
 import os
 import sys
+import time
 from collections import namedtuple
 from typing import List
 
 import numpy as np
 import yaml
-from sklearn.metrics import r2_score, mean_squared_error
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import r2_score, mean_squared_error, check_scoring
+from sklearn.model_selection import ParameterGrid, ParameterSampler, check_cv
 
+from entity.fit_cache import FitCache, get_data_fingerprint, get_estimator_spec, get_result_params
 from housing.exception import CustomException
 from housing.logger import logging
 
@@ -17,6 +23,12 @@ CLASS_KEY = 'class'
 PARAM_KEY = 'params'
 MODEL_SELECTION_KEY = 'model_selection'
 SEARCH_PARAM_GRID_KEY = "search_param_grid"
+SEARCH_BUDGET_KEY = "budget"
+SEARCH_BUDGET_MAX_FITS_KEY = "max_fits"
+SEARCH_BUDGET_MAX_SECONDS_KEY = "max_seconds"
+PARALLEL_SEARCH_KEY = "parallel_search"
+PARALLEL_SEARCH_ENABLED_KEY = "enabled"
+PARALLEL_SEARCH_N_JOBS_KEY = "n_jobs"
 
 InitializedModelDetail = namedtuple("InitializedModelDetail",
                                     ["model_serial_number", "model", "param_grid_search", "model_name"])
@@ -26,7 +38,9 @@ GridSearchedBestModel = namedtuple("GridSearchedBestModel", ["model_serial_numbe
                                                              "best_model",
                                                              "best_parameters",
                                                              "best_score",
-                                                             ])
+                                                             "n_fits",
+                                                             "fit_seconds",
+                                                             ], defaults=[None, None])
 
 BestModel = namedtuple("BestModel", ["model_serial_number",
                                      "model",
@@ -121,6 +135,64 @@ def evaluate_regression_model(model_list: list, X_train: np.ndarray, y_train: np
         raise CustomException(e, sys) from e
 
 
+def get_single_core_estimator(estimator, parameters: dict, single_core: bool = True):
+    """
+    Clone of estimator with parameters, limited to one core (n_jobs=1) when it has n_jobs and single_core
+    is set, so fits running side by side on the shared pool do not oversubscribe the cores.
+    """
+    estimator = clone(estimator).set_params(**parameters)
+    if single_core and "n_jobs" in estimator.get_params(deep=False):
+        estimator.set_params(n_jobs=1)
+    return estimator
+
+
+def fit_and_score(estimator, parameters: dict, input_feature, output_feature, train_index, test_index, scoring=None,
+                  single_core: bool = True):
+    """
+    Fits a clone of estimator with parameters on one cv fold and returns (test score, seconds spent
+    fitting and scoring), timed like the fit_time + score_time of sklearn searches.
+    A failing fit scores NaN, like GridSearchCV with error_score=np.nan, so it does not stop the search.
+    """
+    start_time = time.perf_counter()
+    try:
+        estimator = get_single_core_estimator(estimator, parameters, single_core)
+        estimator.fit(input_feature[train_index], output_feature[train_index])
+        scorer = check_scoring(estimator, scoring=scoring)
+        score = scorer(estimator, input_feature[test_index], output_feature[test_index])
+    except Exception as e:
+        logging.info(f"Fit of {type(estimator).__name__} with {parameters} failed, scored NaN: {e}")
+        score = np.nan
+    return score, time.perf_counter() - start_time
+
+
+def refit_estimator(estimator, parameters: dict, input_feature, output_feature, single_core: bool = True):
+    """
+    Refits the best candidate on all data (on one core when single_core is set), then gives it back
+    its configured n_jobs, so the saved model predicts like the one GridSearchCV would refit.
+    """
+    configured_params = clone(estimator).set_params(**parameters).get_params(deep=False)
+    best_model = get_single_core_estimator(estimator, parameters, single_core).fit(input_feature, output_feature)
+    if "n_jobs" in configured_params:
+        best_model.set_params(n_jobs=configured_params["n_jobs"])
+    return best_model
+
+
+def get_search_usage(search_cv) -> tuple:
+    """
+    Returns (number of fits, seconds spent fitting and scoring summed over the fits) of a fitted search
+    object, the same measure fit_and_score reports for the parallel search.
+    Searches without n_fits_/fit_seconds_ are measured from their cv_results_, which has one
+    row per evaluated candidate (per iteration for successive halving).
+    """
+    if hasattr(search_cv, "n_fits_"):
+        return search_cv.n_fits_, search_cv.fit_seconds_
+    cv_results = search_cv.cv_results_
+    n_splits = search_cv.n_splits_
+    n_fits = len(cv_results["params"]) * n_splits
+    fit_seconds = float(np.sum(cv_results["mean_fit_time"]) + np.sum(cv_results["mean_score_time"])) * n_splits
+    return n_fits, fit_seconds
+
+
 def get_sample_model_config_yaml_file(export_dir: str):
     try:
         model_config = {
@@ -130,9 +202,17 @@ def get_sample_model_config_yaml_file(export_dir: str):
                 PARAM_KEY: {
                     "cv": 3,
                     "verbose": 1
+                },
+                SEARCH_BUDGET_KEY: {
+                    SEARCH_BUDGET_MAX_FITS_KEY: None,
+                    SEARCH_BUDGET_MAX_SECONDS_KEY: None
                 }
 
             },
+            PARALLEL_SEARCH_KEY: {
+                PARALLEL_SEARCH_ENABLED_KEY: False,
+                PARALLEL_SEARCH_N_JOBS_KEY: -1
+            },
             MODEL_SELECTION_KEY: {
                 "module_0": {
                     MODULE_KEY: "module_of_model",
@@ -158,18 +238,26 @@ def get_sample_model_config_yaml_file(export_dir: str):
 
 
 class ModelFactory:
-    def __init__(self, model_config_path: str = None, ):
+    def __init__(self, model_config_path: str = None, fit_cache: FitCache = None):
         try:
+            self.fit_cache = fit_cache
+            self._data_fingerprint = None
             self.config: dict = ModelFactory.read_params(model_config_path)
 
             self.grid_search_cv_module: str = self.config[GRID_SEARCH_KEY][MODULE_KEY]
             self.grid_search_class_name: str = self.config[GRID_SEARCH_KEY][CLASS_KEY]
             self.grid_search_property_data: dict = dict(self.config[GRID_SEARCH_KEY][PARAM_KEY])
+            self.grid_search_budget: dict = dict(self.config[GRID_SEARCH_KEY].get(SEARCH_BUDGET_KEY) or {})
 
             self.models_initialization_config: dict = dict(self.config[MODEL_SELECTION_KEY])
 
+            parallel_search_config: dict = dict(self.config.get(PARALLEL_SEARCH_KEY) or {})
+            self.parallel_search_enabled: bool = parallel_search_config.get(PARALLEL_SEARCH_ENABLED_KEY, False)
+            self.parallel_search_n_jobs: int = parallel_search_config.get(PARALLEL_SEARCH_N_JOBS_KEY, -1)
+
             self.initialized_model_list = None
             self.grid_searched_best_model_list = None
+            self.check_search_config()
 
         except Exception as e:
             raise CustomException(e, sys) from e
@@ -199,6 +287,9 @@ class ModelFactory:
     @staticmethod
     def class_for_name(module_name: str, class_name: str):
         try:
+            if class_name.startswith("Halving") and module_name == "sklearn.model_selection":
+                # successive halving searches are experimental in sklearn and have to be enabled first
+                importlib.import_module("sklearn.experimental.enable_halving_search_cv")
             # load the module, will raise ImportError if module cannot be loaded
             module = importlib.import_module(module_name)
             # get the class, will raise AttributeError if class cannot be found
@@ -208,6 +299,72 @@ class ModelFactory:
         except Exception as e:
             raise CustomException(e, sys) from e
 
+    def check_search_config(self):
+        """
+        Fails on model config load for a grid_search class that parallel search can not run
+        (adaptive searches, with a halving factor, can not be split into independent fits) and for
+        a budget the grid_search class can not honor: max_seconds needs a search with its own
+        max_seconds (HyperbandSearchCV), max_fits one with max_fits, n_iter or n_candidates.
+        """
+        search_parameters = self.get_search_parameters()
+        if self.grid_search_budget.get(SEARCH_BUDGET_MAX_SECONDS_KEY) is not None and \
+                "max_seconds" not in search_parameters:
+            raise ValueError(f"{GRID_SEARCH_KEY}.{SEARCH_BUDGET_KEY}.{SEARCH_BUDGET_MAX_SECONDS_KEY} can not be "
+                             f"honored by {self.grid_search_class_name}, use entity.search_strategy.HyperbandSearchCV "
+                             f"or a {SEARCH_BUDGET_MAX_FITS_KEY} budget.")
+        if self.grid_search_budget.get(SEARCH_BUDGET_MAX_FITS_KEY) is not None and \
+                not any(key in search_parameters for key in ["max_fits", "n_iter", "n_candidates"]):
+            raise ValueError(f"{GRID_SEARCH_KEY}.{SEARCH_BUDGET_KEY}.{SEARCH_BUDGET_MAX_FITS_KEY} can not be "
+                             f"honored by the exhaustive {self.grid_search_class_name}, use a randomized, halving "
+                             f"or hyperband search.")
+        if self.parallel_search_enabled and "factor" in search_parameters:
+            raise ValueError(f"{self.grid_search_class_name} is an adaptive search and can not run with "
+                             f"{PARALLEL_SEARCH_KEY}.{PARALLEL_SEARCH_ENABLED_KEY}, use GridSearchCV or "
+                             f"RandomizedSearchCV or disable parallel search.")
+
+    def get_search_parameters(self):
+        search_cv_ref = ModelFactory.class_for_name(module_name=self.grid_search_cv_module,
+                                                    class_name=self.grid_search_class_name)
+        return inspect.signature(search_cv_ref).parameters
+
+    @staticmethod
+    def can_search_fold_by_fold(search_parameters) -> bool:
+        """
+        Exhaustive and randomized searches evaluate a candidate list fixed up front, so their fits
+        can be run (and cached) one (candidate, fold) at a time; adaptive searches can not.
+        """
+        return ("param_grid" in search_parameters or "n_iter" in search_parameters) and \
+            "factor" not in search_parameters
+
+    def get_parallel_search_candidates(self, initialized_model: InitializedModelDetail, search_parameters,
+                                       search_property_data: dict) -> list:
+        """
+        Parameter candidates the configured search would evaluate: the full grid for exhaustive
+        searches, n_iter samples of param_distributions for randomized ones. Adaptive searches
+        (successive halving, hyperband) pick candidates from earlier scores, check_search_config
+        rejects them.
+        """
+        if "param_grid" in search_parameters and "factor" not in search_parameters:
+            return list(ParameterGrid(initialized_model.param_grid_search))
+        if "n_iter" in search_parameters:
+            return list(ParameterSampler(initialized_model.param_grid_search,
+                                         n_iter=search_property_data.get("n_iter", search_parameters["n_iter"].default),
+                                         random_state=search_property_data.get("random_state")))
+        raise ValueError(f"{self.grid_search_class_name} is not supported with parallel search.")
+
+    def get_data_fingerprint(self, input_feature, output_feature) -> str:
+        """
+        Fingerprint of the training arrays, computed once per pair of arrays.
+        """
+        if self._data_fingerprint is None or self._data_fingerprint[0] is not input_feature \
+                or self._data_fingerprint[1] is not output_feature:
+            self._data_fingerprint = (input_feature, output_feature,
+                                      get_data_fingerprint(input_feature, output_feature))
+        return self._data_fingerprint[2]
+
+    def get_fit_cache_summary(self) -> dict:
+        return self.fit_cache.get_summary() if self.fit_cache is not None else None
+
     def execute_grid_search_operation(self, initialized_model: InitializedModelDetail, input_feature,
                                       output_feature) -> GridSearchedBestModel:
         """
@@ -227,26 +384,92 @@ class ModelFactory:
                                                              class_name=self.grid_search_class_name
                                                              )
 
-            grid_search_cv = grid_search_cv_ref(estimator=initialized_model.model,
-                                                param_grid=initialized_model.param_grid_search)
-            grid_search_cv = ModelFactory.update_property_of_class(grid_search_cv,
-                                                                   self.grid_search_property_data)
+            # exhaustive searches take param_grid, randomized/halving/hyperband ones param_distributions
+            search_parameters = inspect.signature(grid_search_cv_ref).parameters
+            search_space_key = "param_grid" if "param_grid" in search_parameters else "param_distributions"
+            search_property_data = self.get_budgeted_search_property_data(search_parameters)
+
+            if self.fit_cache is not None and ModelFactory.can_search_fold_by_fold(search_parameters):
+                # cached per (estimator, candidate, cv, fold) like the parallel search, so a changed grid
+                # only fits the new candidates; fits run on the n_jobs of the search as GridSearchCV would
+                return self.search_fold_by_fold([initialized_model], input_feature, output_feature,
+                                                n_jobs=search_property_data.get("n_jobs"), single_core=False)[0]
+
+            cache_key = None
+            if self.fit_cache is not None:
+                # adaptive searches pick candidates from earlier scores and are cached as a whole
+                cache_key = FitCache.get_key("search", self.get_data_fingerprint(input_feature, output_feature),
+                                             self.grid_search_cv_module, self.grid_search_class_name,
+                                             get_result_params(search_property_data),
+                                             initialized_model.param_grid_search,
+                                             get_estimator_spec(initialized_model.model))
+                search_result = self.fit_cache.get(cache_key)
+                if search_result is not None:
+                    logging.info(f"Parameter search of {type(initialized_model.model).__name__} found in fit cache.")
+                    return GridSearchedBestModel(model_serial_number=initialized_model.model_serial_number,
+                                                 model=initialized_model.model,
+                                                 best_model=search_result["best_model"],
+                                                 best_parameters=search_result["best_parameters"],
+                                                 best_score=search_result["best_score"],
+                                                 n_fits=0,
+                                                 fit_seconds=0.0
+                                                 )
+
+            grid_search_cv = grid_search_cv_ref(**{"estimator": initialized_model.model,
+                                                   search_space_key: initialized_model.param_grid_search})
+            grid_search_cv = ModelFactory.update_property_of_class(grid_search_cv, search_property_data)
 
             message = f'{">>" * 30} f"Training {type(initialized_model.model).__name__} Started." {"<<" * 30}'
             logging.info(message)
             grid_search_cv.fit(input_feature, output_feature)
             message = f'{">>" * 30} f"Training {type(initialized_model.model).__name__}" completed {"<<" * 30}'
+            n_fits, fit_seconds = get_search_usage(grid_search_cv)
+            logging.info(f"{type(initialized_model.model).__name__} search used [{n_fits}] fits "
+                         f"and [{fit_seconds:.2f}] fit seconds.")
             grid_searched_best_model = GridSearchedBestModel(model_serial_number=initialized_model.model_serial_number,
                                                              model=initialized_model.model,
                                                              best_model=grid_search_cv.best_estimator_,
                                                              best_parameters=grid_search_cv.best_params_,
-                                                             best_score=grid_search_cv.best_score_
+                                                             best_score=grid_search_cv.best_score_,
+                                                             n_fits=n_fits,
+                                                             fit_seconds=fit_seconds
                                                              )
+            if cache_key is not None:
+                self.fit_cache.set(cache_key, {"best_model": grid_search_cv.best_estimator_,
+                                               "best_parameters": grid_search_cv.best_params_,
+                                               "best_score": grid_search_cv.best_score_,
+                                               "cv_results": grid_search_cv.cv_results_})
 
             return grid_searched_best_model
         except Exception as e:
             raise CustomException(e, sys) from e
 
+    def get_budgeted_search_property_data(self, search_parameters) -> dict:
+        """
+        Adds the grid_search budget of model config to the search properties:
+        searches with their own max_fits/max_seconds get them as is, randomized searches get n_iter
+        and successive halving random searches n_candidates so that roughly max_fits fits are used.
+        Budgets a search can not honor are rejected by check_search_config.
+        """
+        try:
+            property_data = dict(self.grid_search_property_data)
+            max_fits = self.grid_search_budget.get(SEARCH_BUDGET_MAX_FITS_KEY)
+            max_seconds = self.grid_search_budget.get(SEARCH_BUDGET_MAX_SECONDS_KEY)
+            cv = property_data.get("cv", 5)
+            n_splits = cv if isinstance(cv, int) else 5
+
+            if "max_fits" in search_parameters or "max_seconds" in search_parameters:
+                property_data.update({"max_fits": max_fits, "max_seconds": max_seconds})
+            elif max_fits is not None and "n_iter" in search_parameters:
+                property_data["n_iter"] = max(1, max_fits // n_splits)
+            elif max_fits is not None and "n_candidates" in search_parameters:
+                # halving uses n_candidates * n_splits * (1 + 1/factor + 1/factor^2 ...) fits
+                factor = property_data.get("factor", 3)
+                property_data["n_candidates"] = max(1, int(max_fits * (factor - 1) / (factor * n_splits)))
+            return property_data
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
     def get_initialized_model_list(self) -> List[InitializedModelDetail]:
         """
         This function will return a list of model details.
@@ -309,6 +532,14 @@ class ModelFactory:
                                                               output_feature) -> List[GridSearchedBestModel]:
 
         try:
+            if self.parallel_search_enabled:
+                self.grid_searched_best_model_list = self.initiate_parallel_best_parameter_search(
+                    initialized_model_list=initialized_model_list,
+                    input_feature=input_feature,
+                    output_feature=output_feature
+                )
+                return self.grid_searched_best_model_list
+
             self.grid_searched_best_model_list = []
             for initialized_model_list in initialized_model_list:
                 grid_searched_best_model = self.initiate_best_parameter_search_for_initialized_model(
@@ -321,6 +552,134 @@ class ModelFactory:
         except Exception as e:
             raise CustomException(e, sys) from e
 
+    def initiate_parallel_best_parameter_search(self, initialized_model_list: List[InitializedModelDetail],
+                                                input_feature,
+                                                output_feature,
+                                                n_jobs: int = None) -> List[GridSearchedBestModel]:
+        """
+        Same search as running GridSearchCV for every model one after another, but every
+        (model, parameter, fold) fit of all models is scheduled on one shared worker pool
+        limited to n_jobs cores (parallel_search.n_jobs from model config by default).
+        Candidates come from the configured grid_search class (see get_parallel_search_candidates);
+        of its params only cv, scoring, n_iter and random_state are used.
+        ================================================================================
+        return: List of GridSearchedBestModel in the order of initialized_model_list
+        """
+        try:
+            n_jobs = self.parallel_search_n_jobs if n_jobs is None else n_jobs
+            return self.search_fold_by_fold(initialized_model_list, input_feature, output_feature, n_jobs=n_jobs)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def search_fold_by_fold(self, initialized_model_list: List[InitializedModelDetail], input_feature, output_feature,
+                            n_jobs: int = None, single_core: bool = True) -> List[GridSearchedBestModel]:
+        """
+        Runs every (model, candidate, fold) fit of the configured search on one joblib pool of n_jobs
+        and picks the best candidate per model like GridSearchCV. With a fit cache, each fold score is
+        cached by (data, estimator class and params, candidate, cv, fold, scoring) and each refit by
+        (data, estimator, candidate), so only fits not done before run.
+        single_core: fits run with n_jobs=1, for pools running many fits side by side
+        """
+        try:
+            input_feature, output_feature = np.asarray(input_feature), np.asarray(output_feature)
+            search_parameters = self.get_search_parameters()
+            search_property_data = self.get_budgeted_search_property_data(search_parameters)
+            cv = check_cv(search_property_data.get("cv", 5), output_feature, classifier=False)
+            folds = list(cv.split(input_feature, output_feature))
+            scoring = search_property_data.get("scoring")
+
+            candidates = [(initialized_model, parameters) for initialized_model in initialized_model_list
+                          for parameters in self.get_parallel_search_candidates(initialized_model, search_parameters,
+                                                                                search_property_data)]
+            logging.info(f"Parameter search: [{len(candidates)}] candidates x [{len(folds)}] folds "
+                         f"on n_jobs: [{n_jobs}]")
+
+            fit_tasks = [(initialized_model, parameters, fold_number, train_index, test_index)
+                         for initialized_model, parameters in candidates
+                         for fold_number, (train_index, test_index) in enumerate(folds)]
+            cache_keys, results = [None] * len(fit_tasks), [None] * len(fit_tasks)
+            if self.fit_cache is not None:
+                data_fingerprint = self.get_data_fingerprint(input_feature, output_feature)
+                for task_number, (initialized_model, parameters, fold_number, *_) in enumerate(fit_tasks):
+                    cache_keys[task_number] = FitCache.get_key("fold", data_fingerprint,
+                                                               get_estimator_spec(initialized_model.model),
+                                                               get_result_params(parameters), repr(cv),
+                                                               fold_number, scoring)
+                    results[task_number] = self.fit_cache.get(cache_keys[task_number])
+            missing_tasks = [task_number for task_number, result in enumerate(results) if result is None]
+            logging.info(f"Parameter search: [{len(missing_tasks)}] of [{len(fit_tasks)}] fits to run.")
+
+            with Parallel(n_jobs=n_jobs) as parallel:
+                fitted_results = parallel(delayed(fit_and_score)(fit_tasks[task_number][0].model,
+                                                                 fit_tasks[task_number][1], input_feature,
+                                                                 output_feature, fit_tasks[task_number][3],
+                                                                 fit_tasks[task_number][4], scoring, single_core)
+                                          for task_number in missing_tasks)
+                for task_number, result in zip(missing_tasks, fitted_results):
+                    results[task_number] = result
+                    # failed fits are not cached, they are tried again on the next run
+                    if self.fit_cache is not None and not np.isnan(result[0]):
+                        self.fit_cache.set(cache_keys[task_number], result)
+                scores = np.asarray([score for score, _ in results], dtype=float).reshape(len(candidates), len(folds))
+                # only fits run now count towards the usage, cached ones are free
+                is_fitted_now = np.zeros(len(fit_tasks), dtype=bool)
+                is_fitted_now[missing_tasks] = True
+                is_fitted_now = is_fitted_now.reshape(len(candidates), len(folds))
+                fit_seconds = np.asarray([seconds for _, seconds in results]).reshape(len(candidates), len(folds))
+                fit_seconds = np.where(is_fitted_now, fit_seconds, 0.0)
+                mean_scores = scores.mean(axis=1)
+
+                best_candidates = []
+                for initialized_model in initialized_model_list:
+                    candidate_index = [index for index, (model, _) in enumerate(candidates)
+                                       if model is initialized_model]
+                    # failed (NaN) scores rank last and the first best candidate wins ties, same as GridSearchCV
+                    candidate_scores = np.where(np.isnan(mean_scores[candidate_index]), -np.inf,
+                                                mean_scores[candidate_index])
+                    best_index = candidate_index[int(np.argmax(candidate_scores))]
+                    best_candidates.append((initialized_model, candidates[best_index][1], mean_scores[best_index],
+                                            int(is_fitted_now[candidate_index].sum()),
+                                            float(fit_seconds[candidate_index].sum())))
+
+                best_models, refit_keys = [None] * len(best_candidates), [None] * len(best_candidates)
+                if self.fit_cache is not None:
+                    for candidate_number, (initialized_model, parameters, *_) in enumerate(best_candidates):
+                        refit_keys[candidate_number] = FitCache.get_key("refit", data_fingerprint,
+                                                                        get_estimator_spec(initialized_model.model),
+                                                                        get_result_params(parameters))
+                        best_model = self.fit_cache.get(refit_keys[candidate_number])
+                        configured_params = clone(initialized_model.model).set_params(**parameters).get_params(
+                            deep=False)
+                        if best_model is not None and "n_jobs" in configured_params:
+                            # n_jobs is not part of the key, the cached model gets the configured one
+                            best_model.set_params(n_jobs=configured_params["n_jobs"])
+                        best_models[candidate_number] = best_model
+                missing_refits = [number for number, best_model in enumerate(best_models) if best_model is None]
+                refitted_models = parallel(delayed(refit_estimator)(best_candidates[number][0].model,
+                                                                    best_candidates[number][1], input_feature,
+                                                                    output_feature, single_core)
+                                           for number in missing_refits)
+                for number, best_model in zip(missing_refits, refitted_models):
+                    best_models[number] = best_model
+                    if self.fit_cache is not None:
+                        self.fit_cache.set(refit_keys[number], best_model)
+
+            grid_searched_best_model_list = []
+            for (initialized_model, parameters, score, n_fits, seconds), best_model in zip(best_candidates,
+                                                                                           best_models):
+                grid_searched_best_model_list.append(
+                    GridSearchedBestModel(model_serial_number=initialized_model.model_serial_number,
+                                          model=initialized_model.model,
+                                          best_model=best_model,
+                                          best_parameters=parameters,
+                                          best_score=score,
+                                          n_fits=n_fits,
+                                          fit_seconds=seconds
+                                          ))
+            return grid_searched_best_model_list
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
     @staticmethod
     def get_model_detail(model_details: List[InitializedModelDetail],
                          model_serial_number: str) -> InitializedModelDetail:
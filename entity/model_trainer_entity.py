@@ -1,3 +1,5 @@
 from collections import namedtuple
 
-ModelTrainerEntity = namedtuple("ModelTrainerConfig", ["trained_model_file_path","base_accuracy","model_config_file_path"])
+ModelTrainerEntity = namedtuple("ModelTrainerConfig", ["trained_model_file_path", "base_accuracy",
+                                                       "model_config_file_path", "fit_cache_dir",
+                                                       "fit_cache_max_size_mb"])
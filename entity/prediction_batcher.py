@@ -0,0 +1,152 @@
+import sys
+import time
+from collections import deque
+from threading import Thread, Lock, Condition, Event
+
+import numpy as np
+import pandas as pd
+
+from entity.prediction_entity import PredictionEntity
+from housing.exception import CustomException
+from housing.logger import logging
+
+
+class PendingPrediction:
+
+    def __init__(self, housing_df: pd.DataFrame):
+        self.housing_df = housing_df
+        self.enqueue_time = time.perf_counter()
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class PredictionBatcher:
+    """
+    Coalesces concurrent prediction requests into one vectorized predict call.
+    A batch is closed when it holds max_batch_size rows or when the oldest request in it
+    has waited max_wait_ms, so queueing never adds more than max_wait_ms to a request.
+    """
+
+    def __init__(self, predictor, prediction_config: PredictionEntity, metrics_window: int = 1000):
+        try:
+            self.predictor = predictor
+            self.max_batch_size = int(prediction_config.max_batch_size)
+            self.max_wait = prediction_config.max_wait_ms / 1000
+            self.request_timeout = prediction_config.request_timeout_ms / 1000
+
+            self._queue = deque()
+            self._condition = Condition()
+            self._metrics_lock = Lock()
+            self.batch_sizes = deque(maxlen=metrics_window)
+            self.queue_waits = deque(maxlen=metrics_window)
+            self.total_batches = 0
+            self.total_rows = 0
+
+            self._worker = Thread(target=self._run, daemon=True, name="prediction_batcher")
+            self._worker.start()
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def predict(self, housing_df: pd.DataFrame):
+        """
+        Queues the rows of housing_df and blocks until the batch containing them is scored.
+        A request that times out while still queued is taken off the queue, so it is never scored.
+        """
+        pending_prediction = PendingPrediction(housing_df)
+        with self._condition:
+            self._queue.append(pending_prediction)
+            self._condition.notify()
+        if not pending_prediction.done.wait(self.request_timeout):
+            with self._condition:
+                if pending_prediction in self._queue:
+                    self._queue.remove(pending_prediction)
+            raise TimeoutError(f"Prediction not completed within {self.request_timeout * 1000:.0f}ms")
+        if pending_prediction.error is not None:
+            raise pending_prediction.error
+        return pending_prediction.result
+
+    def _next_batch(self):
+        with self._condition:
+            while True:
+                # the head request may time out and leave the queue, so the deadline is taken
+                # from the current head on every wake up, and an emptied queue is waited on again
+                while not self._queue:
+                    self._condition.wait()
+                deadline = self._queue[0].enqueue_time + self.max_wait
+                n_rows = sum(len(pending.housing_df) for pending in self._queue)
+                remaining = deadline - time.perf_counter()
+                if n_rows >= self.max_batch_size or remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch, n_rows = [], 0
+            while self._queue and (not batch or n_rows + len(self._queue[0].housing_df) <= self.max_batch_size):
+                pending_prediction = self._queue.popleft()
+                n_rows += len(pending_prediction.housing_df)
+                batch.append(pending_prediction)
+            return batch
+
+    def _predict_batch(self, batch):
+        housing_df = pd.concat([pending.housing_df for pending in batch], ignore_index=True)
+        prediction = self.predictor.predict(housing_df)
+        offset = 0
+        for pending in batch:
+            n_rows = len(pending.housing_df)
+            pending.result = prediction[offset:offset + n_rows]
+            offset += n_rows
+
+    def _score_batch(self, batch):
+        """
+        Scores the batch with one predict call. When it fails, the requests are scored one by one,
+        so a malformed request only fails itself and not the requests batched with it.
+        """
+        start_time = time.perf_counter()
+        try:
+            self._predict_batch(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                logging.exception(e)
+                batch[0].error = e
+            else:
+                logging.info(f"Batch of [{len(batch)}] requests failed ({e}), scoring the requests one by one.")
+                for pending in batch:
+                    try:
+                        self._predict_batch([pending])
+                    except Exception as request_error:
+                        logging.exception(request_error)
+                        pending.error = request_error
+        finally:
+            batch_rows = sum(len(pending.housing_df) for pending in batch)
+            with self._metrics_lock:
+                self.total_batches += 1
+                self.total_rows += batch_rows
+                self.batch_sizes.append(batch_rows)
+                self.queue_waits.extend(start_time - pending.enqueue_time for pending in batch)
+            for pending in batch:
+                pending.done.set()
+
+    def _run(self):
+        while True:
+            self._score_batch(self._next_batch())
+
+    def get_metrics(self) -> dict:
+        with self._metrics_lock:
+            batch_sizes = np.array(self.batch_sizes, dtype=float)
+            queue_waits = np.array(self.queue_waits, dtype=float) * 1000
+            total_batches, total_rows = self.total_batches, self.total_rows
+
+        def percentile(values, q):
+            return float(np.percentile(values, q)) if len(values) else None
+
+        return {
+            "total_batches": total_batches,
+            "total_rows": total_rows,
+            "queued_requests": len(self._queue),
+            "batch_size_mean": float(batch_sizes.mean()) if len(batch_sizes) else None,
+            "batch_size_p50": percentile(batch_sizes, 50),
+            "batch_size_max": percentile(batch_sizes, 100),
+            "queue_wait_ms_p50": percentile(queue_waits, 50),
+            "queue_wait_ms_p99": percentile(queue_waits, 99),
+            "queue_wait_ms_max": percentile(queue_waits, 100),
+        }
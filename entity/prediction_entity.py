@@ -0,0 +1,4 @@
+from collections import namedtuple
+
+PredictionEntity = namedtuple("PredictionConfig", ["micro_batching", "max_batch_size", "max_wait_ms",
+                                                   "request_timeout_ms"])
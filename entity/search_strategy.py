@@ -0,0 +1,107 @@
+import math
+import sys
+import time
+
+import numpy as np
+from sklearn.base import BaseEstimator, clone
+from sklearn.model_selection import ParameterSampler, check_cv, cross_validate
+from sklearn.utils import check_random_state
+
+from housing.exception import CustomException
+from housing.logger import logging
+
+
+class HyperbandSearchCV(BaseEstimator):
+    """
+    Hyperband parameter search (Li et al.), usable from the grid_search block of model.yaml:
+        grid_search:
+          module: entity.search_strategy
+          class: HyperbandSearchCV
+          params: {cv: 5, factor: 3, min_resources: 500}
+          budget: {max_fits: 200, max_seconds: 600}
+    Every bracket samples configurations from param_distributions and runs successive halving on
+    row subsamples growing by factor up to all rows, so poor configurations are dropped after being
+    trained on a fraction of the data. The search stops once max_fits or max_seconds is used up.
+    After fit: best_estimator_, best_params_, best_score_, cv_results_, n_fits_, fit_seconds_
+    """
+
+    def __init__(self, estimator, param_distributions, cv=5, scoring=None, factor=3, min_resources=None,
+                 max_fits=None, max_seconds=None, random_state=None, n_jobs=None, verbose=0):
+        self.estimator = estimator
+        self.param_distributions = param_distributions
+        self.cv = cv
+        self.scoring = scoring
+        self.factor = factor
+        self.min_resources = min_resources
+        self.max_fits = max_fits
+        self.max_seconds = max_seconds
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.verbose = verbose
+
+    def is_budget_left(self, n_splits: int) -> bool:
+        if self.max_fits is not None and self.n_fits_ + n_splits > self.max_fits:
+            return False
+        if self.max_seconds is not None and time.perf_counter() - self._start_time > self.max_seconds:
+            return False
+        return True
+
+    def evaluate(self, parameters: dict, X, y, row_index, cv, n_resources: int) -> float:
+        estimator = clone(self.estimator).set_params(**parameters)
+        result = cross_validate(estimator, X[row_index], y[row_index], cv=cv, scoring=self.scoring, n_jobs=self.n_jobs)
+        self.n_fits_ += len(result["test_score"])
+        self.fit_seconds_ += float(np.sum(result["fit_time"]) + np.sum(result["score_time"]))
+        score = float(np.mean(result["test_score"]))
+        self.cv_results_["params"].append(parameters)
+        self.cv_results_["mean_test_score"].append(score)
+        self.cv_results_["n_resources"].append(n_resources)
+        if self.verbose:
+            logging.info(f"Hyperband: {parameters} on [{n_resources}] rows scored [{score}]")
+        return score
+
+    def fit(self, X, y):
+        try:
+            X, y = np.asarray(X), np.asarray(y)
+            self._start_time = time.perf_counter()
+            self.n_fits_, self.fit_seconds_ = 0, 0.0
+            self.cv_results_ = {"params": [], "mean_test_score": [], "n_resources": []}
+            random_state = check_random_state(self.random_state)
+            cv = check_cv(self.cv, y, classifier=False)
+            n_splits = cv.get_n_splits(X, y)
+
+            max_resources = X.shape[0]
+            min_resources = self.min_resources or max(n_splits * 2, max_resources // self.factor ** 4)
+            s_max = max(0, int(math.floor(math.log(max_resources / min_resources, self.factor))))
+            row_order = random_state.permutation(max_resources)
+
+            best = (-np.inf, None, -1)
+            for s in range(s_max, -1, -1):
+                n_candidates = int(math.ceil((s_max + 1) / (s + 1) * self.factor ** s))
+                candidates = list(ParameterSampler(self.param_distributions, n_iter=n_candidates,
+                                                   random_state=random_state))
+                for rung in range(s + 1):
+                    n_resources = max_resources if rung == s else \
+                        int(max_resources * self.factor ** (rung - s))
+                    row_index = np.sort(row_order[:n_resources])
+                    scores = []
+                    for parameters in candidates:
+                        if not self.is_budget_left(n_splits):
+                            break
+                        scores.append(self.evaluate(parameters, X, y, row_index, cv, n_resources))
+                        if (n_resources, scores[-1]) > (best[2], best[0]):
+                            best = (scores[-1], parameters, n_resources)
+                    if len(scores) < len(candidates):
+                        break
+                    n_keep = max(1, len(candidates) // self.factor)
+                    candidates = [candidates[i] for i in np.argsort(scores)[::-1][:n_keep]]
+                if not self.is_budget_left(n_splits):
+                    logging.info(f"Hyperband budget used up after [{self.n_fits_}] fits.")
+                    break
+
+            if best[1] is None:
+                raise Exception("Budget too small to evaluate any parameter of the search.")
+            self.best_score_, self.best_params_, _ = best
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+            return self
+        except Exception as e:
+            raise CustomException(e, sys) from e
@@ -1,3 +1,3 @@
 from collections import namedtuple
 
-TrainingPipelineEntity = namedtuple("TrainingPipelineConfig", ["artifact_dir"])
+TrainingPipelineEntity = namedtuple("TrainingPipelineConfig", ["artifact_dir", "stage_cache_dir"])
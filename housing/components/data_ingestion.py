@@ -2,15 +2,118 @@ import logging
 
 from entity.artifact_entity import DataIngestionArtifact
 from entity.data_ingestion_entity import DataIngestionEntity
+from housing.components.dataset_cache import DatasetCache, link_or_copy_file, get_local_source_path, \
+    get_file_sha256
 from housing.exception import CustomException
 import sys
 from housing.utilities.util import make_directories, get_base_file_name, get_file_join, check_dir_remove_make, \
-    get_first_filename_from_directory_list
+    get_first_filename_from_directory_list, get_file_path_with_format, cast_data_frame_to_schema, write_data_frame, \
+    DataFrameFileWriter, get_schema, check_dir_exists, get_dir
 from six.moves import urllib
 import tarfile
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import StratifiedShuffleSplit
+import glob
+import os
+from joblib import Parallel, delayed
+
+
+INCOME_CATEGORY_BINS = [0.0, 1.5, 3.0, 4.5, 6.0, np.inf]
+INCOME_CATEGORY_LABELS = [1, 2, 3, 4, 5]
+INCREMENTAL_STATE_FILE_NAME = "state.npz"
+
+
+def iter_csv_chunks_from_tgz(tgz_file_path: str, chunk_size: int = None):
+    """
+    Parses the first csv member of the archive in chunks while it is decompressed,
+    without writing the member to disk. Yields (member file name, dataframe chunk).
+    Without chunk_size the member is parsed by one read_csv call and yielded as a single chunk.
+    """
+    with tarfile.open(tgz_file_path, mode="r|*") as tgz_file_obj:
+        for member in tgz_file_obj:
+            if member.isfile() and member.name.endswith(".csv"):
+                with tgz_file_obj.extractfile(member) as csv_file_obj:
+                    if chunk_size is None:
+                        yield get_base_file_name(member.name), pd.read_csv(csv_file_obj)
+                        return
+                    for chunk in pd.read_csv(csv_file_obj, chunksize=chunk_size):
+                        yield get_base_file_name(member.name), chunk
+                return
+    raise Exception(f"No csv file found in archive: [{tgz_file_path}]")
+
+
+def check_shard_columns(shard_file_path: str, data_frame: pd.DataFrame, schema_columns: list) -> pd.DataFrame:
+    """
+    Raises when the shard columns differ from the schema columns, returns the shard in schema column order.
+    """
+    missing_columns = [column for column in schema_columns if column not in data_frame.columns]
+    extra_columns = [column for column in data_frame.columns if column not in schema_columns]
+    if missing_columns or extra_columns:
+        raise Exception(f"Shard [{shard_file_path}] does not match the schema, "
+                        f"missing columns: {missing_columns}, extra columns: {extra_columns}")
+    return data_frame[schema_columns]
+
+
+def read_shard(shard_file_path: str, schema_columns: list) -> pd.DataFrame:
+    return check_shard_columns(shard_file_path, pd.read_csv(shard_file_path), schema_columns)
+
+
+def get_row_keys(data_frame: pd.DataFrame) -> np.ndarray:
+    """
+    uint64 hash of every row's content. Pass frames cast to the schema types, so a value gets the
+    same key whether its chunk was parsed as int or float.
+    """
+    return pd.util.hash_pandas_object(data_frame, index=False).to_numpy()
+
+
+def get_stratum_codes(data_frame: pd.DataFrame) -> np.ndarray:
+    """
+    income_cat stratum number of every row, rows without median_income get the extra stratum
+    len(INCOME_CATEGORY_LABELS).
+    """
+    income_cat = pd.cut(data_frame["median_income"], bins=INCOME_CATEGORY_BINS, labels=False).to_numpy()
+    return np.where(np.isnan(income_cat), len(INCOME_CATEGORY_LABELS), income_cat).astype(np.intp)
+
+
+def get_stratum_offsets(random_state: int = 42) -> np.ndarray:
+    return np.random.default_rng(random_state).random(len(INCOME_CATEGORY_LABELS) + 1)
+
+
+def get_stratified_test_mask(stratum_codes: np.ndarray, stratum_seen: np.ndarray, stratum_offsets: np.ndarray,
+                             test_size: float) -> np.ndarray:
+    """
+    Per stratum counter split: the k-th row of a stratum (counted over all chunks) goes to test when
+    floor((k + 1) * test_size + offset) > floor(k * test_size + offset), offset being a random start
+    per stratum. After n rows of a stratum its test rows are within one of n * test_size, whatever
+    the chunk size. stratum_seen (rows per stratum so far) is updated in place.
+    """
+    is_test = np.zeros(len(stratum_codes), dtype=bool)
+    for stratum in np.unique(stratum_codes):
+        row_ix = np.flatnonzero(stratum_codes == stratum)
+        row_number = stratum_seen[stratum] + np.arange(len(row_ix), dtype=np.float64)
+        offset = stratum_offsets[stratum]
+        is_test[row_ix] = np.floor((row_number + 1) * test_size + offset) > np.floor(row_number * test_size + offset)
+        stratum_seen[stratum] += len(row_ix)
+    return is_test
+
+
+def is_in_sorted_keys(row_keys: np.ndarray, sorted_keys: np.ndarray) -> np.ndarray:
+    """
+    Membership of row_keys in the already sorted sorted_keys by binary search, O(len(row_keys) * log n)
+    without sorting sorted_keys again like np.isin would.
+    """
+    if len(sorted_keys) == 0:
+        return np.zeros(len(row_keys), dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_keys, row_keys), len(sorted_keys) - 1)
+    return sorted_keys[positions] == row_keys
+
+
+def add_stratum_counts(stratum_counts: np.ndarray, stratum_codes: np.ndarray, is_test: np.ndarray):
+    """
+    Adds the train (column 0) and test (column 1) rows per stratum of the chunk.
+    """
+    np.add.at(stratum_counts, (stratum_codes, is_test.astype(np.intp)), 1)
 
 
 class DataIngestion:
@@ -18,6 +121,31 @@ class DataIngestion:
         try:
             logging.info(f"{'>>' * 20} Data Ingestion log started.{'<<' * 20}")
             self.data_ingestion_config = data_ingestion_config
+            self.dataset_cache = None
+            if data_ingestion_config.dataset_cache_dir is not None:
+                self.dataset_cache = DatasetCache(cache_dir=data_ingestion_config.dataset_cache_dir)
+            self.dataset_sha256 = None
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_dataset_version(self):
+        """
+        Identifies the content of the dataset source, so the stage cache notices new upstream data.
+        With the dataset cache this is the (conditional, so cheap) fetch and its blob sha256, which
+        download_housing_data then reuses. Without it: sha256 of a local file, or ETag/Last-Modified
+        of a HEAD request to a remote source.
+        """
+        try:
+            download_url = self.data_ingestion_config.dataset_download_url
+            if self.dataset_cache is not None:
+                self.dataset_sha256 = self.dataset_cache.fetch(download_url,
+                                                               expected_sha256=self.data_ingestion_config.dataset_sha256)
+                return self.dataset_sha256
+            local_file_path = get_local_source_path(download_url)
+            if local_file_path is not None:
+                return get_file_sha256(local_file_path)
+            with urllib.request.urlopen(urllib.request.Request(download_url, method="HEAD")) as response:
+                return [response.headers.get("ETag"), response.headers.get("Last-Modified")]
         except Exception as e:
             raise CustomException(e, sys) from e
 
@@ -31,7 +159,13 @@ class DataIngestion:
             file_name = get_base_file_name(download_url)
             tgz_file_path = get_file_join(tgz_download_dir, file_name)
             logging.info(f"Downloading file from :[{download_url}] into :[{tgz_file_path}]")
-            urllib.request.urlretrieve(download_url, tgz_file_path)
+            if self.dataset_cache is not None:
+                if self.dataset_sha256 is None:
+                    self.dataset_sha256 = self.dataset_cache.fetch(
+                        download_url, expected_sha256=self.data_ingestion_config.dataset_sha256)
+                link_or_copy_file(self.dataset_cache.get_blob_path(self.dataset_sha256), tgz_file_path)
+            else:
+                urllib.request.urlretrieve(download_url, tgz_file_path)
             logging.info(f"File :[{tgz_file_path}] has been downloaded successfully.")
             return tgz_file_path
 
@@ -43,25 +177,264 @@ class DataIngestion:
             raw_data_dir = self.data_ingestion_config.raw_data_dir
             check_dir_remove_make(raw_data_dir)
             logging.info(f"Extracting tgz file: [{tgz_file_path}] into dir: [{raw_data_dir}]")
-            with tarfile.open(tgz_file_path) as tgz_file_obj:
-                tgz_file_obj.extractall(path=raw_data_dir)
+            if self.dataset_cache is not None and self.dataset_sha256 is not None:
+                self.dataset_cache.link_extracted_files(self.dataset_sha256, raw_data_dir)
+            else:
+                with tarfile.open(tgz_file_path) as tgz_file_obj:
+                    tgz_file_obj.extractall(path=raw_data_dir)
             logging.info(f"Extraction completed")
 
         except Exception as e:
             raise CustomException(e, sys) from e
 
-    def split_data_as_train_test(self) -> DataIngestionArtifact:
+    def get_shard_file_paths(self) -> list:
+        """
+        Sorted raw files matching shard_pattern, searched recursively under raw_data_dir.
+        """
+        raw_data_dir = self.data_ingestion_config.raw_data_dir
+        shard_file_paths = sorted(glob.glob(get_file_join(raw_data_dir, "**", self.data_ingestion_config.shard_pattern),
+                                            recursive=True))
+        if len(shard_file_paths) == 0:
+            raise Exception(f"No file matching [{self.data_ingestion_config.shard_pattern}] in [{raw_data_dir}]")
+        return shard_file_paths
+
+    def get_sharded_file_name(self) -> str:
+        """
+        Name of the ingested files in sharded mode, taken from the dataset (housing.tgz -> housing.csv).
+        """
+        dataset_name = os.path.splitext(get_base_file_name(self.data_ingestion_config.dataset_download_url))[0]
+        return f"{dataset_name}.csv"
+
+    def read_raw_data_shards(self):
+        """
+        Parses every shard on a pool of shard_n_jobs processes, checks its columns against the schema
+        and returns (file name, dataframe of all shards in file name order).
+        """
+        shard_file_paths = self.get_shard_file_paths()
+        schema_columns = list(get_schema(self.data_ingestion_config.schema_file_path)["columns"])
+        logging.info(f"Reading [{len(shard_file_paths)}] shards on n_jobs: [{self.data_ingestion_config.shard_n_jobs}]")
+        with Parallel(n_jobs=self.data_ingestion_config.shard_n_jobs) as parallel:
+            shards = parallel(delayed(read_shard)(shard_file_path, schema_columns)
+                              for shard_file_path in shard_file_paths)
+        return self.get_sharded_file_name(), pd.concat(shards, ignore_index=True)
+
+    def iter_raw_data_chunks(self, tgz_file_path: str):
+        """
+        Yields (raw file name, dataframe chunk), read from the archive when stream_from_archive is set,
+        from every shard in sharded mode, otherwise from the file extracted into raw_data_dir.
+        """
+        chunk_size = self.data_ingestion_config.read_chunk_size
+        if self.data_ingestion_config.shard_pattern:
+            schema_columns = list(get_schema(self.data_ingestion_config.schema_file_path)["columns"])
+            for shard_file_path in self.get_shard_file_paths():
+                logging.info(f"Reading shard: [{shard_file_path}]")
+                for chunk in pd.read_csv(shard_file_path, chunksize=chunk_size):
+                    yield self.get_sharded_file_name(), check_shard_columns(shard_file_path, chunk, schema_columns)
+            return
+        if self.data_ingestion_config.stream_from_archive:
+            logging.info(f"Streaming csv file out of archive: [{tgz_file_path}]")
+            yield from iter_csv_chunks_from_tgz(tgz_file_path, chunk_size)
+            return
+        raw_data_dir = self.data_ingestion_config.raw_data_dir
+        file_name = get_first_filename_from_directory_list(raw_data_dir)
+        file_path = get_file_join(raw_data_dir, file_name)
+        logging.info(f"Reading csv file: [{file_path}]")
+        for chunk in pd.read_csv(file_path, chunksize=chunk_size):
+            yield file_name, chunk
+
+    def read_raw_data(self, tgz_file_path: str = None):
+        """
+        Returns (raw file name, dataframe) with all rows of the csv file extracted into raw_data_dir,
+        streamed out of the archive when stream_from_archive is set, or of all shards in sharded mode.
+        The csv is parsed by one read_csv call either way, so column types are inferred on the whole file.
+        """
+        if self.data_ingestion_config.shard_pattern:
+            return self.read_raw_data_shards()
+        if self.data_ingestion_config.stream_from_archive:
+            logging.info(f"Streaming csv file out of archive: [{tgz_file_path}]")
+            [(file_name, data_frame)] = iter_csv_chunks_from_tgz(tgz_file_path)
+            return file_name, data_frame
+        raw_data_dir = self.data_ingestion_config.raw_data_dir
+        file_name = get_first_filename_from_directory_list(raw_data_dir)
+        file_path = get_file_join(raw_data_dir, file_name)
+        logging.info(f"Reading csv file: [{file_path}]")
+        return file_name, pd.read_csv(file_path)
+
+    def get_ingested_file_path(self, ingested_dir: str, file_name: str) -> str:
+        return get_file_path_with_format(get_file_join(ingested_dir, file_name),
+                                         self.data_ingestion_config.artifact_format)
+
+    def to_artifact_data_frame(self, data_frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Columnar artifacts get the column types of schema.json, csv artifacts are written as read.
+        """
+        if self.data_ingestion_config.artifact_format == "csv":
+            return data_frame
+        return cast_data_frame_to_schema(data_frame, self.data_ingestion_config.schema_file_path)
+
+    def split_data_as_train_test_streaming(self, tgz_file_path: str = None,
+                                           test_size: float = 0.2, random_state: int = 42) -> DataIngestionArtifact:
+        """
+        Out of core version of split_data_as_train_test: rows are read in chunks and appended to the
+        train/test files as they come, so memory use only depends on read_chunk_size.
+        Rows are assigned per income_cat stratum by get_stratified_test_mask, so every stratum has
+        exactly test_size of its rows in test (up to one row), and a row always lands in the same file,
+        whatever the chunk size.
+        """
         try:
-            raw_data_dir = self.data_ingestion_config.raw_data_dir
-            file_name = get_first_filename_from_directory_list(raw_data_dir)
-            file_path = get_file_join(raw_data_dir, file_name)
-            logging.info(f"Reading csv file: [{file_path}]")
-            housing_data_frame = pd.read_csv(file_path)
+            train_file_path, test_file_path = None, None
+            train_writer, test_writer = None, None
+            stratum_counts = np.zeros((len(INCOME_CATEGORY_LABELS) + 1, 2), dtype=np.int64)
+            stratum_seen = np.zeros(len(INCOME_CATEGORY_LABELS) + 1, dtype=np.int64)
+            stratum_offsets = get_stratum_offsets(random_state)
+            try:
+                for file_name, chunk in self.iter_raw_data_chunks(tgz_file_path):
+                    if train_writer is None:
+                        train_file_path = self.get_ingested_file_path(self.data_ingestion_config.ingested_train_dir,
+                                                                      file_name)
+                        test_file_path = self.get_ingested_file_path(self.data_ingestion_config.ingested_test_dir,
+                                                                     file_name)
+                        logging.info(f"Streaming train/test split into: [{train_file_path}], [{test_file_path}]")
+                        train_writer = DataFrameFileWriter(train_file_path)
+                        test_writer = DataFrameFileWriter(test_file_path)
+
+                    stratum_codes = get_stratum_codes(chunk)
+                    is_test = get_stratified_test_mask(stratum_codes, stratum_seen, stratum_offsets, test_size)
+                    add_stratum_counts(stratum_counts, stratum_codes, is_test)
+
+                    chunk = self.to_artifact_data_frame(chunk)
+                    train_writer.write(chunk[~is_test])
+                    test_writer.write(chunk[is_test])
+            finally:
+                for writer in [train_writer, test_writer]:
+                    if writer is not None:
+                        writer.close()
+
+            if train_writer is None:
+                raise Exception("Raw data file has no rows to split.")
+            for label, (n_train, n_test) in zip(INCOME_CATEGORY_LABELS, stratum_counts):
+                logging.info(f"income_cat [{label}]: [{n_train}] train rows, [{n_test}] test rows")
+
+            data_ingestion_artifact = DataIngestionArtifact(train_file_path=train_file_path,
+                                                            test_file_path=test_file_path,
+                                                            is_ingested=True,
+                                                            message=f"Data ingestion completed successfully."
+                                                            )
+            logging.info(f"Data Ingestion artifact:[{data_ingestion_artifact}]")
+            return data_ingestion_artifact
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def split_data_as_train_test_incremental(self, tgz_file_path: str = None,
+                                             test_size: float = 0.2, random_state: int = 42) -> DataIngestionArtifact:
+        """
+        Appends only the rows not ingested by an earlier run to the train/test files kept in incremental_dir.
+        Rows are recognised by their content hash (row key). New rows go to train or test by the per
+        stratum counters of split_data_as_train_test_streaming, continued from the earlier runs, so rows
+        already ingested never move, every stratum stays at test_size and splitting/writing costs
+        O(new rows); the raw feed itself is still read and hashed in chunks.
+        state.npz holds the sorted row keys, the rows seen per stratum and the committed size of both files. It is replaced atomically
+        after the append, and a crashed append is truncated away on the next run.
+        """
+        try:
+            if self.data_ingestion_config.artifact_format != "csv":
+                raise Exception("Incremental ingestion appends to csv artifacts, set artifact_format to csv.")
+            incremental_dir = self.data_ingestion_config.incremental_dir
+            state_file_path = get_file_join(incremental_dir, INCREMENTAL_STATE_FILE_NAME)
+            known_keys = np.empty(0, dtype=np.uint64)
+            committed_sizes = [0, 0]
+            stratum_seen = np.zeros(len(INCOME_CATEGORY_LABELS) + 1, dtype=np.int64)
+            if check_dir_exists(state_file_path):
+                with np.load(state_file_path) as state:
+                    known_keys, committed_sizes = state["row_keys"], list(state["file_sizes"])
+                    if "stratum_seen" in state:
+                        stratum_seen = state["stratum_seen"].copy()
+            stratum_offsets = get_stratum_offsets(random_state)
+
+            schema_columns = list(get_schema(self.data_ingestion_config.schema_file_path)["columns"])
+            train_file_path, test_file_path = None, None
+            file_objs = []
+            new_keys = []
+            new_key_set = set()
+            stratum_counts = np.zeros((len(INCOME_CATEGORY_LABELS) + 1, 2), dtype=np.int64)
+            try:
+                for file_name, chunk in self.iter_raw_data_chunks(tgz_file_path):
+                    if not file_objs:
+                        train_file_path = get_file_join(incremental_dir, "train", file_name)
+                        test_file_path = get_file_join(incremental_dir, "test", file_name)
+                        for file_path, committed_size in zip([train_file_path, test_file_path], committed_sizes):
+                            make_directories(get_dir(file_path))
+                            if check_dir_exists(file_path):
+                                # drops rows appended by a run that crashed before saving its state
+                                os.truncate(file_path, committed_size)
+                            elif committed_size > 0:
+                                raise Exception(f"Ingested file [{file_path}] of an earlier run is missing.")
+                            file_objs.append(open(file_path, "a", newline=""))
+                        logging.info(f"Incremental ingestion into: [{train_file_path}], [{test_file_path}] "
+                                     f"with [{len(known_keys)}] rows already ingested")
+
+                    chunk = check_shard_columns(file_name, chunk, schema_columns)
+                    row_keys = get_row_keys(cast_data_frame_to_schema(chunk, self.data_ingestion_config.schema_file_path))
+                    _, first_ix = np.unique(row_keys, return_index=True)
+                    is_new = np.zeros(len(row_keys), dtype=bool)
+                    is_new[first_ix] = True
+                    is_new &= ~is_in_sorted_keys(row_keys, known_keys)
+                    if new_key_set:
+                        # only rows not known yet are looked up among the keys new in this run
+                        candidate_ix = np.flatnonzero(is_new)
+                        is_new[candidate_ix] = np.fromiter((row_key not in new_key_set
+                                                            for row_key in row_keys[candidate_ix].tolist()),
+                                                           dtype=bool, count=len(candidate_ix))
+                    if not is_new.any():
+                        continue
+
+                    chunk, row_keys = chunk[is_new], row_keys[is_new]
+                    new_keys.append(row_keys)
+                    new_key_set.update(row_keys.tolist())
+                    stratum_codes = get_stratum_codes(chunk)
+                    is_test = get_stratified_test_mask(stratum_codes, stratum_seen, stratum_offsets, test_size)
+                    add_stratum_counts(stratum_counts, stratum_codes, is_test)
+                    for file_obj, rows in zip(file_objs, [chunk[~is_test], chunk[is_test]]):
+                        rows.to_csv(file_obj, header=file_obj.tell() == 0, index=False)
+
+            finally:
+                for file_obj in file_objs:
+                    file_obj.close()
+
+            if not file_objs:
+                raise Exception("Raw data file has no rows to ingest.")
+            file_sizes = [os.path.getsize(train_file_path), os.path.getsize(test_file_path)]
+            # new keys are sorted and merged into the sorted known ones once, not per chunk
+            new_sorted_keys = np.sort(np.concatenate(new_keys)) if new_keys else np.empty(0, dtype=np.uint64)
+            all_keys = np.insert(known_keys, np.searchsorted(known_keys, new_sorted_keys), new_sorted_keys)
+            with open(f"{state_file_path}.tmp", "wb") as state_file:
+                np.savez(state_file, row_keys=all_keys, file_sizes=np.array(file_sizes, dtype=np.int64),
+                         stratum_seen=stratum_seen)
+            os.replace(f"{state_file_path}.tmp", state_file_path)
+
+            n_new_rows = int(stratum_counts.sum())
+            logging.info(f"Incremental ingestion appended [{n_new_rows}] new rows, [{len(all_keys)}] rows in total.")
+            for label, (n_train, n_test) in zip(INCOME_CATEGORY_LABELS, stratum_counts):
+                logging.info(f"income_cat [{label}]: [{n_train}] new train rows, [{n_test}] new test rows")
+
+            data_ingestion_artifact = DataIngestionArtifact(train_file_path=train_file_path,
+                                                            test_file_path=test_file_path,
+                                                            is_ingested=True,
+                                                            message=f"Data ingestion appended {n_new_rows} new rows."
+                                                            )
+            logging.info(f"Data Ingestion artifact:[{data_ingestion_artifact}]")
+            return data_ingestion_artifact
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def split_data_as_train_test(self, tgz_file_path: str = None) -> DataIngestionArtifact:
+        try:
+            file_name, housing_data_frame = self.read_raw_data(tgz_file_path)
 
             housing_data_frame["income_cat"] = pd.cut(
                 housing_data_frame["median_income"],
-                bins=[0.0, 1.5, 3.0, 4.5, 6.0, np.inf],
-                labels=[1, 2, 3, 4, 5]
+                bins=INCOME_CATEGORY_BINS,
+                labels=INCOME_CATEGORY_LABELS
             )
 
             logging.info(f"Splitting data into train and test")
@@ -74,21 +447,19 @@ class DataIngestion:
                 strat_train_set = housing_data_frame.loc[train_index].drop(["income_cat"], axis=1)
                 strat_test_set = housing_data_frame.loc[test_index].drop(["income_cat"], axis=1)
 
-            train_file_path = get_file_join(self.data_ingestion_config.ingested_train_dir,
-                                            file_name)
+            train_file_path = self.get_ingested_file_path(self.data_ingestion_config.ingested_train_dir,
+                                                          file_name)
 
-            test_file_path = get_file_join(self.data_ingestion_config.ingested_test_dir,
-                                           file_name)
+            test_file_path = self.get_ingested_file_path(self.data_ingestion_config.ingested_test_dir,
+                                                         file_name)
 
             if strat_train_set is not None:
-                make_directories(self.data_ingestion_config.ingested_train_dir)
                 logging.info(f"Exporting training datset to file: [{train_file_path}]")
-                strat_train_set.to_csv(train_file_path, index=False)
+                write_data_frame(self.to_artifact_data_frame(strat_train_set), train_file_path)
 
             if strat_test_set is not None:
-                make_directories(self.data_ingestion_config.ingested_test_dir)
                 logging.info(f"Exporting test dataset to file: [{test_file_path}]")
-                strat_test_set.to_csv(test_file_path, index=False)
+                write_data_frame(self.to_artifact_data_frame(strat_test_set), test_file_path)
 
             data_ingestion_artifact = DataIngestionArtifact(train_file_path=train_file_path,
                                                             test_file_path=test_file_path,
@@ -103,7 +474,13 @@ class DataIngestion:
     def initiate_data_ingestion(self) -> DataIngestionArtifact:
         try:
             tgz_file_path = self.download_housing_data()
-            self.extract_tgz_file(tgz_file_path)
-            return self.split_data_as_train_test()
+            # shards are read from raw_data_dir, so sharded mode always extracts the archive
+            if not self.data_ingestion_config.stream_from_archive or self.data_ingestion_config.shard_pattern:
+                self.extract_tgz_file(tgz_file_path)
+            if self.data_ingestion_config.incremental_dir is not None:
+                return self.split_data_as_train_test_incremental(tgz_file_path)
+            if self.data_ingestion_config.streaming_split:
+                return self.split_data_as_train_test_streaming(tgz_file_path)
+            return self.split_data_as_train_test(tgz_file_path)
         except Exception as e:
             raise CustomException(e, sys) from e
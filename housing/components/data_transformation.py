@@ -12,7 +12,7 @@ from entity.data_transformation_entity import DataTransformationEntity
 from housing.exception import CustomException
 from housing.logger import logging
 from housing.utilities.util import get_dictionary_from_json, load_data, get_base_file_replace_filename_with_npz, \
-    get_file_join, save_numpy_array_data, save_object
+    get_file_join, save_numpy_array_data, save_object, get_schema
 
 
 #   longitude: float
@@ -27,6 +27,18 @@ from housing.utilities.util import get_dictionary_from_json, load_data, get_base
 #   ocean_proximity: category
 #   income_cat: float
 
+ZERO_DENOMINATOR_RATIO = 0.0
+
+
+def divide_ratio(numerator: np.ndarray, denominator: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    numerator / denominator written into out. Rows with a zero denominator (no households or
+    rooms) get ZERO_DENOMINATOR_RATIO instead of inf/NaN, which the scaler could not handle.
+    """
+    out[...] = ZERO_DENOMINATOR_RATIO
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
 
 class FeatureGenerator(BaseEstimator, TransformerMixin):
 
@@ -62,21 +74,31 @@ class FeatureGenerator(BaseEstimator, TransformerMixin):
     def fit(self, X, y=None):
         return self
 
+    def get_ratio_column_pairs(self) -> list:
+        """
+        (numerator index, denominator index) of each generated column, in output order:
+        rooms per household, population per household and, optionally, bedrooms per room.
+        """
+        ratio_column_pairs = [(self.total_rooms_ix, self.households_ix), (self.population_ix, self.households_ix)]
+        if self.add_bedrooms_per_room:
+            ratio_column_pairs.append((self.total_bedrooms_ix, self.total_rooms_ix))
+        return ratio_column_pairs
+
     def transform(self, X, y=None):
+        """
+        Input columns followed by the ratio columns, written into one preallocated array
+        (float32 input stays float32, anything else becomes float64).
+        """
         try:
-            room_per_household = X[:, self.total_rooms_ix] / \
-                                 X[:, self.households_ix]
-            population_per_household = X[:, self.population_ix] / \
-                                       X[:, self.households_ix]
-            if self.add_bedrooms_per_room:
-                bedrooms_per_room = X[:, self.total_bedrooms_ix] / \
-                                    X[:, self.total_rooms_ix]
-                generated_feature = np.c_[
-                    X, room_per_household, population_per_household, bedrooms_per_room]
-            else:
-                generated_feature = np.c_[
-                    X, room_per_household, population_per_household]
-
+            X = np.asarray(X)
+            dtype = X.dtype if X.dtype in (np.float32, np.float64) else np.float64
+            ratio_column_pairs = self.get_ratio_column_pairs()
+            n_columns = X.shape[1]
+            generated_feature = np.empty((X.shape[0], n_columns + len(ratio_column_pairs)), dtype=dtype)
+            generated_feature[:, :n_columns] = X
+            for ratio_number, (numerator_ix, denominator_ix) in enumerate(ratio_column_pairs):
+                divide_ratio(generated_feature[:, numerator_ix], generated_feature[:, denominator_ix],
+                             out=generated_feature[:, n_columns + ratio_number])
             return generated_feature
         except Exception as e:
             raise CustomException(e, sys) from e
@@ -153,7 +175,7 @@ class DataTransformation:
 
             test_df = load_data(file_path=test_file_path, schema_file_path=schema_file_path)
 
-            schema = get_dictionary_from_json(schema_file_path)
+            schema = get_schema(schema_file_path)
 
             target_column_name = schema["target_column"]
 
@@ -195,7 +217,10 @@ class DataTransformation:
                                                                       message="Data transformation successfull.",
                                                                       transformed_train_file_path=transformed_train_file_path,
                                                                       transformed_test_file_path=transformed_test_file_path,
-                                                                      preprocessed_object_file_path=preprocessing_obj_file_path
+                                                                      preprocessed_object_file_path=preprocessing_obj_file_path,
+                                                                      ingested_train_file_path=train_file_path,
+                                                                      ingested_test_file_path=test_file_path,
+                                                                      schema_file_path=schema_file_path
 
                                                                       )
             logging.info(f"Data transformationa artifact: {data_transformation_artifact}")
@@ -2,17 +2,17 @@ import json
 import sys
 
 import pandas as pd
-import numpy as np
 
 from entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
 from entity.data_validation_entity import DataValidationEntity
 from housing.exception import CustomException
 from housing.logger import logging
-from housing.utilities.util import check_dir_exists, make_directories, get_dir, get_dictionary_from_json
-from evidently.model_profile import Profile
-from evidently.model_profile.sections import DataDriftProfileSection
-from evidently.dashboard import Dashboard
-from evidently.dashboard.tabs import DataDriftTab
+from housing.utilities.util import check_dir_exists, make_directories, get_dir, read_data_frame, \
+    get_schema
+from housing.components.drift_engine import DriftEngine
+from housing.components.reference_profile import ReferenceProfile
+from housing.components.schema_validator import SchemaValidator
+from housing.components.report_page import save_data_drift_report_page, create_report_page_job
 
 
 class DataValidation:
@@ -23,17 +23,30 @@ class DataValidation:
             logging.info(f"{'>> ' * 30}Data Valdaition log started.{'<< ' * 30} \n\n")
             self.data_validation_config = data_validation_config
             self.data_ingestion_artifact = data_ingestion_artifact
+            self.train_df = None
+            self.test_df = None
         except Exception as e:
             raise CustomException(e, sys) from e
 
     def get_train_and_test_df(self):
+        """
+        Train and test frames, read on first use and shared by every check until release_train_and_test_df.
+        """
         try:
-            train_df = pd.read_csv(self.data_ingestion_artifact.train_file_path)
-            test_df = pd.read_csv(self.data_ingestion_artifact.test_file_path)
-            return train_df, test_df
+            if self.train_df is None or self.test_df is None:
+                self.train_df = read_data_frame(self.data_ingestion_artifact.train_file_path)
+                self.test_df = read_data_frame(self.data_ingestion_artifact.test_file_path)
+            return self.train_df, self.test_df
         except Exception as e:
             raise CustomException(e, sys) from e
 
+    def release_train_and_test_df(self):
+        self.train_df = None
+        self.test_df = None
+
+    def get_schema(self) -> dict:
+        return get_schema(self.data_validation_config.schema_file_path)
+
     def is_train_test_file_exists(self) -> bool:
 
         try:
@@ -63,46 +76,87 @@ class DataValidation:
             raise CustomException(e, sys) from e
 
     def validate_dataset_schema(self) -> bool:
-
+        """
+        Streams the train and test files through SchemaValidator (column presence, dtype, null ratio,
+        range and domain rules) and saves both reports to schema_report_file_path.
+        """
         try:
-            schema_file_path = self.data_validation_config.schema_file_path
-            schema_json = get_dictionary_from_json(schema_file_path)
-            train_df, test_df = self.get_train_and_test_df()
-            print(type(np.array(train_df.columns)), train_df.columns)
-            columns_from_df = np.array(train_df.columns)
-            is_size_same = len(columns_from_df) == len(schema_json["columns"].keys())
-            all_column_name_present = True
-            for i in columns_from_df:
-                if i in schema_json["columns"]:
-                    print(i, "True")
-                else:
-                    all_column_name_present = False
-                    print(i, "False")
-            print(type(train_df.dtypes), train_df.dtypes)
-
-            numCols = list(set(train_df.select_dtypes("number").columns))
-            catCols = list(set(train_df.select_dtypes("object").columns))
-            is_numeric_column_size = len(numCols) == len(schema_json["numerical_columns"])
-            is_categorical_column_size = len(catCols) == len(schema_json["categorical_columns"])
-            print(f"numerical is {is_numeric_column_size} and categorical {is_categorical_column_size}")
-            is_categorical_value_equal = len(np.array(train_df["ocean_proximity"].unique())) == len(
-                schema_json["domain_value"]["ocean_proximity"])
-            print(is_categorical_value_equal)
-
-            validation_status = is_size_same and all_column_name_present and is_numeric_column_size and is_categorical_column_size and is_categorical_value_equal
-            return validation_status
+            schema_validator = SchemaValidator(self.get_schema(),
+                                               max_failed_rows=self.data_validation_config.max_failed_rows)
+            schema_report = {
+                "train": schema_validator.validate_file(self.data_ingestion_artifact.train_file_path,
+                                                        self.data_validation_config.schema_chunk_size),
+                "test": schema_validator.validate_file(self.data_ingestion_artifact.test_file_path,
+                                                       self.data_validation_config.schema_chunk_size),
+            }
+            schema_report["is_valid"] = schema_report["train"]["is_valid"] and schema_report["test"]["is_valid"]
+
+            schema_report_file_path = self.data_validation_config.schema_report_file_path
+            make_directories(get_dir(schema_report_file_path))
+            with open(schema_report_file_path, "w") as schema_report_file:
+                json.dump(schema_report, schema_report_file, indent=4)
+            logging.info(f"Schema valid: [{schema_report['is_valid']}], report: [{schema_report_file_path}]")
+            return schema_report["is_valid"]
         except Exception as e:
             raise CustomException(e, sys) from e
 
-    def get_and_save_data_drift_report(self):
-        try:
-            profile = Profile(sections=[DataDriftProfileSection()])
+    def get_evidently_data_drift_report(self) -> dict:
+        # evidently is heavy to import, so it is only imported when drift_engine is evidently
+        from evidently.model_profile import Profile
+        from evidently.model_profile.sections import DataDriftProfileSection
+
+        profile = Profile(sections=[DataDriftProfileSection()])
+
+        train_df, test_df = self.get_train_and_test_df()
+
+        profile.calculate(train_df, test_df)
+
+        return json.loads(profile.json())
+
+    def get_drift_engine(self) -> DriftEngine:
+        schema_json = self.get_schema()
+        return DriftEngine(numerical_columns=schema_json["numerical_columns"],
+                           categorical_columns=schema_json["categorical_columns"],
+                           numerical_stattest=self.data_validation_config.numerical_stattest)
+
+    def get_native_data_drift_report(self) -> dict:
+        train_df, test_df = self.get_train_and_test_df()
+        return self.get_drift_engine().get_report(train_df, test_df,
+                                                  sample_size=self.data_validation_config.drift_sample_size,
+                                                  n_jobs=self.data_validation_config.drift_n_jobs)
 
-            train_df, test_df = self.get_train_and_test_df()
+    def save_reference_profile(self):
+        """
+        Profiles the accepted train data, so later batches are compared without reloading it.
+        """
+        try:
+            reference_profile_file_path = self.data_validation_config.reference_profile_file_path
+            if reference_profile_file_path is None:
+                return None
+            schema_json = self.get_schema()
+            train_df, _ = self.get_train_and_test_df()
+            ReferenceProfile.build(train_df, schema_json["numerical_columns"],
+                                   schema_json["categorical_columns"]).save(reference_profile_file_path)
+            logging.info(f"Reference profile saved: [{reference_profile_file_path}]")
+            return reference_profile_file_path
+        except Exception as e:
+            raise CustomException(e, sys) from e
 
-            profile.calculate(train_df, test_df)
+    def get_data_drift_report_against_profile(self, current_df: pd.DataFrame, reference_profile_file_path: str) -> dict:
+        """
+        Drift report of a new batch against a saved reference profile.
+        """
+        try:
+            return ReferenceProfile.load(reference_profile_file_path).compare(current_df, self.get_drift_engine())
+        except Exception as e:
+            raise CustomException(e, sys) from e
 
-            report = json.loads(profile.json())
+    def get_and_save_data_drift_report(self):
+        try:
+            if self.data_validation_config.drift_engine == "native":
+                report = self.get_native_data_drift_report()
+            else:
+                report = self.get_evidently_data_drift_report()
 
             report_file_path = self.data_validation_config.report_file_path
             report_dir = get_dir(report_file_path)
@@ -115,16 +169,18 @@ class DataValidation:
             raise CustomException(e, sys) from e
 
     def save_data_drift_report_page(self):
+        """
+        report_page_mode "inline" renders the page here; "deferred" and "lazy" only create a page job
+        (rendered by the pipeline in a separate process, or when the page is first opened).
+        """
         try:
-            dashboard = Dashboard(tabs=[DataDriftTab()])
-            train_df, test_df = self.get_train_and_test_df()
-            dashboard.calculate(train_df, test_df)
-
             report_page_file_path = self.data_validation_config.report_page_file_path
-            report_page_dir = get_dir(report_page_file_path)
-            make_directories(report_page_dir)
-
-            dashboard.save(report_page_file_path)
+            if self.data_validation_config.report_page_mode == "inline":
+                train_df, test_df = self.get_train_and_test_df()
+                save_data_drift_report_page(report_page_file_path, train_df, test_df)
+            else:
+                create_report_page_job(report_page_file_path, self.data_ingestion_artifact.train_file_path,
+                                       self.data_ingestion_artifact.test_file_path)
         except Exception as e:
             raise CustomException(e, sys) from e
 
@@ -132,8 +188,7 @@ class DataValidation:
 
         try:
             report = self.get_and_save_data_drift_report()
-            schema_file_path = self.data_validation_config.schema_file_path
-            schema_json = get_dictionary_from_json(schema_file_path)
+            schema_json = self.get_schema()
             is_data_drift = True
             for feature in schema_json["columns"].keys():
                 data_drift_feature = report["data_drift"]["data"]["metrics"][feature]["drift_detected"]
@@ -151,12 +206,15 @@ class DataValidation:
         try:
 
             if self.is_train_test_file_exists() and self.validate_dataset_schema() and self.is_data_drift_found():
+                reference_profile_file_path = self.save_reference_profile()
                 data_validation_artifact = DataValidationArtifact(
                     schema_file_path=self.data_validation_config.schema_file_path,
                     report_file_path=self.data_validation_config.report_file_path,
                     report_page_file_path=self.data_validation_config.report_page_file_path,
                     is_validated=True,
-                    message="Data Validation performed successfully."
+                    message="Data Validation performed successfully.",
+                    reference_profile_file_path=reference_profile_file_path,
+                    schema_report_file_path=self.data_validation_config.schema_report_file_path
                 )
                 logging.info(f"Data validation artifact: {data_validation_artifact}")
                 return data_validation_artifact
@@ -166,6 +224,8 @@ class DataValidation:
                 raise Exception(message)
         except Exception as e:
             raise CustomException(e, sys) from e
+        finally:
+            self.release_train_and_test_df()
 
     def __del__(self):
         logging.info(f"{'>> ' * 30}Data Validation log completed.{'<< ' * 30} \n\n")
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tarfile
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlparse
+from urllib.request import Request, urlopen, url2pathname
+
+from housing.exception import CustomException
+from housing.logger import logging
+from housing.utilities.util import make_directories, get_file_join, check_dir_exists
+
+DATASET_CACHE_INDEX_FILE_NAME = "index.json"
+DATASET_CACHE_BLOB_DIR_NAME = "blobs"
+DATASET_CACHE_EXTRACTED_DIR_NAME = "extracted"
+
+
+def get_file_sha256(file_path: str) -> str:
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as file_obj:
+        for block in iter(lambda: file_obj.read(2 ** 20), b""):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def check_sha256(source: str, sha256: str, expected_sha256: str = None):
+    if expected_sha256 is not None and sha256 != expected_sha256.lower():
+        raise Exception(f"Checksum of dataset [{source}] is [{sha256}], expected [{expected_sha256}].")
+
+
+def link_or_copy_file(src: str, dst: str):
+    """
+    Hardlinks src to dst, copies it when a hardlink is not possible (e.g. other file system).
+    """
+    make_directories(os.path.dirname(dst))
+    if check_dir_exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def get_local_source_path(source: str):
+    """
+    Returns the file path for file:// urls and plain local paths, None for remote urls.
+    """
+    parsed_source = urlparse(source)
+    if parsed_source.scheme == "file":
+        return url2pathname(parsed_source.path)
+    if parsed_source.scheme == "" or os.path.exists(source):
+        return source
+    return None
+
+
+class DatasetCache:
+    """
+    Content addressed cache of downloaded datasets.
+    blobs/<sha256>: downloaded archives, named by their content hash
+    extracted/<sha256>/: archive content, extracted once per blob
+    index.json: source -> sha256, ETag and Last-Modified of the last fetch
+    Remote sources are fetched with If-None-Match/If-Modified-Since, so an unchanged dataset
+    is not downloaded again, and the cached blob is used when the source can not be reached.
+    """
+
+    def __init__(self, cache_dir: str):
+        try:
+            self.cache_dir = cache_dir
+            self.blob_dir = get_file_join(cache_dir, DATASET_CACHE_BLOB_DIR_NAME)
+            self.extracted_dir = get_file_join(cache_dir, DATASET_CACHE_EXTRACTED_DIR_NAME)
+            self.index_file_path = get_file_join(cache_dir, DATASET_CACHE_INDEX_FILE_NAME)
+            make_directories(self.blob_dir)
+            make_directories(self.extracted_dir)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def read_index(self) -> dict:
+        if not check_dir_exists(self.index_file_path):
+            return {}
+        with open(self.index_file_path) as index_file:
+            return json.load(index_file)
+
+    def update_index(self, source: str, entry: dict):
+        index = self.read_index()
+        index[source] = entry
+        with open(f"{self.index_file_path}.tmp", "w") as index_file:
+            json.dump(index, index_file, indent=4)
+        os.replace(f"{self.index_file_path}.tmp", self.index_file_path)
+
+    def get_blob_path(self, sha256: str) -> str:
+        return get_file_join(self.blob_dir, sha256)
+
+    def get_cached_blob(self, index_entry: dict):
+        if index_entry is None:
+            return None
+        blob_path = self.get_blob_path(index_entry["sha256"])
+        return blob_path if check_dir_exists(blob_path) else None
+
+    def store_local_file(self, file_path: str, expected_sha256: str = None) -> str:
+        sha256 = get_file_sha256(file_path)
+        check_sha256(file_path, sha256, expected_sha256)
+        blob_path = self.get_blob_path(sha256)
+        if not check_dir_exists(blob_path):
+            # copied, not linked: a source changed in place must not change the cached blob
+            shutil.copy2(file_path, f"{blob_path}.tmp")
+            os.replace(f"{blob_path}.tmp", blob_path)
+        return sha256
+
+    def fetch_local(self, source: str, file_path: str, expected_sha256: str = None) -> str:
+        stat = os.stat(file_path)
+        index_entry = self.read_index().get(source)
+        # unchanged local file (same size and modified time) is not hashed again
+        if self.get_cached_blob(index_entry) is not None and \
+                index_entry.get("size") == stat.st_size and index_entry.get("mtime_ns") == stat.st_mtime_ns:
+            check_sha256(source, index_entry["sha256"], expected_sha256)
+            return index_entry["sha256"]
+        sha256 = self.store_local_file(file_path, expected_sha256)
+        self.update_index(source, {"sha256": sha256, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+        return sha256
+
+    def fetch_remote(self, source: str, expected_sha256: str = None) -> str:
+        index_entry = self.read_index().get(source)
+        cached_blob = self.get_cached_blob(index_entry)
+        request = Request(source)
+        if cached_blob is not None:
+            if index_entry.get("etag"):
+                request.add_header("If-None-Match", index_entry["etag"])
+            if index_entry.get("last_modified"):
+                request.add_header("If-Modified-Since", index_entry["last_modified"])
+        try:
+            response = urlopen(request)
+        except HTTPError as e:
+            if e.code == 304 and cached_blob is not None:
+                logging.info(f"Dataset [{source}] not modified, using cached blob.")
+                check_sha256(source, index_entry["sha256"], expected_sha256)
+                return index_entry["sha256"]
+            raise
+        except URLError as e:
+            if cached_blob is not None:
+                logging.info(f"Dataset source [{source}] not reachable ({e}), using cached blob.")
+                check_sha256(source, index_entry["sha256"], expected_sha256)
+                return index_entry["sha256"]
+            raise
+
+        tmp_file_path = get_file_join(self.blob_dir, f"download_{os.getpid()}.tmp")
+        file_hash = hashlib.sha256()
+        try:
+            with response, open(tmp_file_path, "wb") as tmp_file:
+                for block in iter(lambda: response.read(2 ** 20), b""):
+                    file_hash.update(block)
+                    tmp_file.write(block)
+            sha256 = file_hash.hexdigest()
+            # checked before the blob and the index are touched, so a bad download leaves the cache as it was
+            check_sha256(source, sha256, expected_sha256)
+        except Exception:
+            if check_dir_exists(tmp_file_path):
+                os.remove(tmp_file_path)
+            raise
+        os.replace(tmp_file_path, self.get_blob_path(sha256))
+        self.update_index(source, {"sha256": sha256, "etag": response.headers.get("ETag"),
+                                   "last_modified": response.headers.get("Last-Modified")})
+        logging.info(f"Dataset [{source}] downloaded into cache blob [{sha256}].")
+        return sha256
+
+    def fetch(self, source: str, expected_sha256: str = None) -> str:
+        """
+        Makes sure the dataset behind source is in the cache and returns its sha256.
+        source: http(s) url, file:// url or local file path
+        expected_sha256: optional checksum the dataset has to match, checked before anything is cached
+        """
+        try:
+            local_file_path = get_local_source_path(source)
+            if local_file_path is not None:
+                return self.fetch_local(source, local_file_path, expected_sha256)
+            return self.fetch_remote(source, expected_sha256)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_extracted_dir(self, sha256: str) -> str:
+        """
+        Extracts blob sha256 once and returns the dir with its content.
+        """
+        try:
+            extracted_dir = get_file_join(self.extracted_dir, sha256)
+            if not check_dir_exists(extracted_dir):
+                tmp_dir = f"{extracted_dir}.{os.getpid()}.tmp"
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                with tarfile.open(self.get_blob_path(sha256)) as tgz_file_obj:
+                    tgz_file_obj.extractall(path=tmp_dir)
+                os.replace(tmp_dir, extracted_dir)
+            return extracted_dir
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def link_extracted_files(self, sha256: str, dst_dir: str):
+        """
+        Hardlinks every extracted file of blob sha256 into dst_dir, keeping relative paths.
+        """
+        try:
+            extracted_dir = self.get_extracted_dir(sha256)
+            for dir_path, _, file_names in os.walk(extracted_dir):
+                for file_name in file_names:
+                    src = get_file_join(dir_path, file_name)
+                    link_or_copy_file(src, get_file_join(dst_dir, os.path.relpath(src, extracted_dir)))
+        except Exception as e:
+            raise CustomException(e, sys) from e
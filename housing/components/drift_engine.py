@@ -0,0 +1,473 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+from scipy.special import kolmogorov, kolmogi
+from scipy.stats import chi2
+
+from housing.exception import CustomException
+from housing.logger import logging
+
+KS_P_VALUE_THRESHOLD = 0.05
+PSI_THRESHOLD = 0.1
+CHI_SQUARE_P_VALUE_THRESHOLD = 0.05
+PSI_BIN_COUNT = 10
+SMALL_HIST_BIN_COUNT = 10
+DATASET_DRIFT_SHARE = 0.5
+MIN_PROPORTION = 1e-4
+BOOTSTRAP_COUNT = 200
+CONFIDENCE_LEVEL = 0.95
+
+
+def get_sorted_values(values) -> np.ndarray:
+    """
+    Sorted float64 array of the non missing values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    return np.sort(values[~np.isnan(values)])
+
+
+def get_ks_statistic(reference_sorted: np.ndarray, current_sorted: np.ndarray):
+    """
+    Two sample Kolmogorov-Smirnov statistic and asymptotic p value on sorted arrays.
+    Both empirical CDFs are evaluated at every distinct value with searchsorted.
+    """
+    n_reference, n_current = len(reference_sorted), len(current_sorted)
+    values = np.concatenate([reference_sorted, current_sorted])
+    reference_cdf = np.searchsorted(reference_sorted, values, side="right") / n_reference
+    current_cdf = np.searchsorted(current_sorted, values, side="right") / n_current
+    statistic = float(np.max(np.abs(reference_cdf - current_cdf)))
+    effective_n = np.sqrt(n_reference * n_current / (n_reference + n_current))
+    return statistic, float(kolmogorov(statistic * effective_n))
+
+
+def get_quantile_bin_edges(reference_sorted: np.ndarray, n_bins: int = PSI_BIN_COUNT) -> np.ndarray:
+    """
+    Inner edges of n_bins reference quantile bins, duplicates removed.
+    """
+    return np.unique(np.quantile(reference_sorted, np.linspace(0, 1, n_bins + 1)[1:-1]))
+
+
+def get_bin_proportions(values_sorted: np.ndarray, inner_edges: np.ndarray) -> np.ndarray:
+    """
+    Share of the sorted values in each bin (-inf, e1], (e1, e2], ..., (ek, inf).
+    """
+    cumulative = np.searchsorted(values_sorted, inner_edges, side="right")
+    counts = np.diff(np.concatenate([[0], cumulative, [len(values_sorted)]]))
+    return counts / max(len(values_sorted), 1)
+
+
+def get_psi(reference_proportions: np.ndarray, current_proportions: np.ndarray) -> float:
+    """
+    Population stability index of two binned distributions.
+    """
+    reference_proportions = np.clip(reference_proportions, MIN_PROPORTION, None)
+    current_proportions = np.clip(current_proportions, MIN_PROPORTION, None)
+    return float(np.sum((current_proportions - reference_proportions) *
+                        np.log(current_proportions / reference_proportions)))
+
+
+def get_chi_square(reference_counts: np.ndarray, current_counts: np.ndarray):
+    """
+    Chi-square goodness of fit of the current category counts against the reference proportions.
+    """
+    reference_proportions = np.clip(reference_counts / max(reference_counts.sum(), 1), MIN_PROPORTION, None)
+    reference_proportions = reference_proportions / reference_proportions.sum()
+    expected = reference_proportions * current_counts.sum()
+    statistic = float(np.sum((current_counts - expected) ** 2 / expected))
+    return statistic, float(chi2.sf(statistic, max(len(current_counts) - 1, 1)))
+
+
+def get_category_counts(reference_values, current_values):
+    """
+    Counts of every category seen in either frame (missing values excluded), in the same order.
+    """
+    reference_counts = pd.Series(reference_values).value_counts()
+    current_counts = pd.Series(current_values).value_counts()
+    categories = sorted(set(reference_counts.index) | set(current_counts.index), key=str)
+    return (categories, reference_counts.reindex(categories, fill_value=0).to_numpy(dtype=np.float64),
+            current_counts.reindex(categories, fill_value=0).to_numpy(dtype=np.float64))
+
+
+def get_psi_rows(reference_proportions: np.ndarray, current_proportions: np.ndarray) -> np.ndarray:
+    """
+    get_psi of every row of two (n_draws, n_bins) proportion arrays.
+    """
+    reference_proportions = np.clip(reference_proportions, MIN_PROPORTION, None)
+    current_proportions = np.clip(current_proportions, MIN_PROPORTION, None)
+    return np.sum((current_proportions - reference_proportions) *
+                  np.log(current_proportions / reference_proportions), axis=-1)
+
+
+def get_chi_square_effect_rows(reference_counts: np.ndarray, current_counts: np.ndarray) -> np.ndarray:
+    """
+    Chi-square statistic per current row, sum((p_current - p_reference)^2 / p_reference), of every
+    row of two (n_draws, n_categories) count arrays. The full data statistic is this times the row count.
+    """
+    reference_proportions = np.clip(reference_counts / np.maximum(reference_counts.sum(axis=-1, keepdims=True), 1),
+                                    MIN_PROPORTION, None)
+    reference_proportions = reference_proportions / reference_proportions.sum(axis=-1, keepdims=True)
+    current_proportions = current_counts / np.maximum(current_counts.sum(axis=-1, keepdims=True), 1)
+    return np.sum((current_proportions - reference_proportions) ** 2 / reference_proportions, axis=-1)
+
+
+def get_sample(values, sample_size: int, random_state: np.random.Generator) -> np.ndarray:
+    values = np.asarray(values)
+    if len(values) <= sample_size:
+        return values
+    return values[random_state.choice(len(values), sample_size, replace=False)]
+
+
+def get_bootstrap_interval(estimates: np.ndarray) -> list:
+    alpha = 1 - CONFIDENCE_LEVEL
+    return np.quantile(estimates, [alpha / 2, 1 - alpha / 2]).tolist()
+
+
+def get_interval_decision(interval: list, threshold: float):
+    """
+    True/False when the whole interval is on one side of the threshold, None when it is borderline.
+    """
+    if interval[0] >= threshold:
+        return True
+    if interval[1] < threshold:
+        return False
+    return None
+
+
+def put_shared_array(array: np.ndarray):
+    """
+    Copies array into a new shared memory block. Returns (shared memory, spec to attach it with).
+    """
+    array = np.ascontiguousarray(array)
+    shared_memory = SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=shared_memory.buf)[...] = array
+    return shared_memory, (shared_memory.name, array.shape, array.dtype.str)
+
+
+def get_shared_column_metrics(drift_engine: "DriftEngine", column: str, array_specs: list, categories: list,
+                              sample_size: int, seed: list) -> dict:
+    """
+    Pool worker: attaches the reference/current column arrays from shared memory and computes the
+    column metrics. Categorical columns arrive as factorized codes (-1 for missing) plus categories.
+    """
+    shared_memories = [SharedMemory(name=name) for name, _, _ in array_specs]
+    try:
+        arrays = [np.ndarray(shape, dtype=np.dtype(dtype), buffer=shared_memory.buf)
+                  for (_, shape, dtype), shared_memory in zip(array_specs, shared_memories)]
+        if categories is not None:
+            category_values = np.array(list(categories) + [np.nan], dtype=object)
+            arrays = [category_values[codes] for codes in arrays]
+        column_metrics = drift_engine.compute_column_metrics(column, arrays[0], arrays[1], sample_size, seed)
+        del arrays
+        return column_metrics
+    finally:
+        for shared_memory in shared_memories:
+            shared_memory.close()
+
+
+def get_small_hist(values_sorted: np.ndarray, bin_edges: np.ndarray) -> list:
+    hist, _ = np.histogram(values_sorted, bins=bin_edges, density=True)
+    return [hist.tolist(), bin_edges.tolist()]
+
+
+class DriftEngine:
+    """
+    Per column drift statistics on numpy arrays, reported in the structure of the evidently
+    DataDriftProfileSection json (report["data_drift"]["data"]["metrics"][column]["drift_detected"]).
+    numerical columns: KS statistic/p value and PSI on reference quantile bins, drift decided by
+    numerical_stattest ("psi": psi >= psi_threshold, "ks": p value < ks_threshold)
+    categorical columns: chi-square of current counts against reference proportions, drift when
+    p value < chi_square_threshold
+    Each column is sorted once; KS, PSI bins and histograms all work on the sorted arrays.
+    """
+
+    def __init__(self, numerical_columns: list, categorical_columns: list, numerical_stattest: str = "psi",
+                 ks_threshold: float = KS_P_VALUE_THRESHOLD, psi_threshold: float = PSI_THRESHOLD,
+                 chi_square_threshold: float = CHI_SQUARE_P_VALUE_THRESHOLD):
+        if numerical_stattest not in ("psi", "ks"):
+            raise ValueError(f"Unsupported numerical_stattest: [{numerical_stattest}], expected psi or ks")
+        self.numerical_columns = list(numerical_columns)
+        self.categorical_columns = list(categorical_columns)
+        self.numerical_stattest = numerical_stattest
+        self.ks_threshold = ks_threshold
+        self.psi_threshold = psi_threshold
+        self.chi_square_threshold = chi_square_threshold
+
+    def get_numerical_decision(self, ks_p_value: float, psi: float):
+        """
+        Returns (stattest name, drift score, drift detected) for numerical_stattest.
+        """
+        if self.numerical_stattest == "psi":
+            return "PSI", psi, bool(psi >= self.psi_threshold)
+        return "K-S p_value", ks_p_value, bool(ks_p_value < self.ks_threshold)
+
+    def get_categorical_decision(self, chi_square_p_value: float):
+        return "chi-square p_value", chi_square_p_value, bool(chi_square_p_value < self.chi_square_threshold)
+
+    def get_numerical_metrics(self, reference_values, current_values) -> dict:
+        reference_sorted = get_sorted_values(reference_values)
+        current_sorted = get_sorted_values(current_values)
+        if len(reference_sorted) == 0 or len(current_sorted) == 0:
+            raise ValueError("Drift can not be computed on a column without values.")
+        ks_statistic, ks_p_value = get_ks_statistic(reference_sorted, current_sorted)
+        inner_edges = get_quantile_bin_edges(reference_sorted)
+        psi = get_psi(get_bin_proportions(reference_sorted, inner_edges),
+                      get_bin_proportions(current_sorted, inner_edges))
+        stattest_name, drift_score, drift_detected = self.get_numerical_decision(ks_p_value, psi)
+        small_hist_edges = np.histogram_bin_edges(np.concatenate([reference_sorted[[0, -1]],
+                                                                  current_sorted[[0, -1]]]),
+                                                  bins=SMALL_HIST_BIN_COUNT)
+        return {
+            "feature_type": "num",
+            "stattest_name": stattest_name,
+            "drift_score": drift_score,
+            "drift_detected": bool(drift_detected),
+            "ks_statistic": ks_statistic,
+            "ks_p_value": ks_p_value,
+            "psi": psi,
+            "ref_small_hist": get_small_hist(reference_sorted, small_hist_edges),
+            "current_small_hist": get_small_hist(current_sorted, small_hist_edges),
+        }
+
+    def get_categorical_metrics(self, reference_values, current_values) -> dict:
+        categories, reference_counts, current_counts = get_category_counts(reference_values, current_values)
+        chi_square_statistic, chi_square_p_value = get_chi_square(reference_counts, current_counts)
+        stattest_name, drift_score, drift_detected = self.get_categorical_decision(chi_square_p_value)
+        return {
+            "feature_type": "cat",
+            "stattest_name": stattest_name,
+            "drift_score": drift_score,
+            "drift_detected": drift_detected,
+            "chi_square_statistic": chi_square_statistic,
+            "psi": get_psi(reference_counts / max(reference_counts.sum(), 1),
+                           current_counts / max(current_counts.sum(), 1)),
+            "categories": [str(category) for category in categories],
+            "ref_counts": reference_counts.tolist(),
+            "current_counts": current_counts.tolist(),
+        }
+
+    def get_sampled_numerical_metrics(self, reference_values, current_values, sample_size: int,
+                                      random_state: np.random.Generator):
+        """
+        Drift decision from samples of sample_size rows, None when the confidence interval of the
+        decision statistic contains the threshold.
+        psi: bootstrap interval of PSI (multinomial draws of the sample bin counts)
+        ks: DKW interval of the KS statistic, against the critical statistic at the full row counts
+        """
+        reference_values = np.asarray(reference_values, dtype=np.float64)
+        current_values = np.asarray(current_values, dtype=np.float64)
+        n_reference = int(np.count_nonzero(~np.isnan(reference_values)))
+        n_current = int(np.count_nonzero(~np.isnan(current_values)))
+        reference_sorted = get_sorted_values(get_sample(reference_values, sample_size, random_state))
+        current_sorted = get_sorted_values(get_sample(current_values, sample_size, random_state))
+        if len(reference_sorted) == 0 or len(current_sorted) == 0:
+            raise ValueError("Drift can not be computed on a column without values.")
+
+        if self.numerical_stattest == "psi":
+            inner_edges = get_quantile_bin_edges(reference_sorted)
+            reference_proportions = get_bin_proportions(reference_sorted, inner_edges)
+            current_proportions = get_bin_proportions(current_sorted, inner_edges)
+            estimate = get_psi(reference_proportions, current_proportions)
+            interval = get_bootstrap_interval(get_psi_rows(
+                random_state.multinomial(len(reference_sorted), reference_proportions, size=BOOTSTRAP_COUNT) /
+                len(reference_sorted),
+                random_state.multinomial(len(current_sorted), current_proportions, size=BOOTSTRAP_COUNT) /
+                len(current_sorted)))
+            threshold = self.psi_threshold
+            stattest_name, drift_score = "PSI", estimate
+        else:
+            estimate, _ = get_ks_statistic(reference_sorted, current_sorted)
+            alpha = 1 - CONFIDENCE_LEVEL
+            half_width = sum(np.sqrt(np.log(4 / alpha) / (2 * len(values_sorted)))
+                             for values_sorted in [reference_sorted, current_sorted])
+            interval = [max(estimate - half_width, 0.0), min(estimate + half_width, 1.0)]
+            effective_n = np.sqrt(n_reference * n_current / (n_reference + n_current))
+            threshold = float(kolmogi(self.ks_threshold) / effective_n)
+            stattest_name, drift_score = "K-S p_value", float(kolmogorov(estimate * effective_n))
+
+        drift_detected = get_interval_decision(interval, threshold)
+        sampling = {"sample_size": [len(reference_sorted), len(current_sorted)], "estimate": estimate,
+                    "interval": interval, "threshold": threshold}
+        if drift_detected is None:
+            return None, sampling
+        return {
+            "feature_type": "num",
+            "stattest_name": stattest_name,
+            "drift_score": drift_score,
+            "drift_detected": drift_detected,
+        }, sampling
+
+    def get_sampled_categorical_metrics(self, reference_values, current_values, sample_size: int,
+                                        random_state: np.random.Generator):
+        """
+        Chi-square decision from samples: bootstrap interval of the per row chi-square statistic,
+        against the critical value divided by the full current row count.
+        """
+        n_current = int(pd.Series(current_values).notna().sum())
+        if n_current == 0 or int(pd.Series(reference_values).notna().sum()) == 0:
+            raise ValueError("Drift can not be computed on a column without values.")
+        categories, reference_counts, current_counts = get_category_counts(
+            get_sample(reference_values, sample_size, random_state), get_sample(current_values, sample_size, random_state))
+        degrees_of_freedom = max(len(categories) - 1, 1)
+        estimate = float(get_chi_square_effect_rows(reference_counts, current_counts))
+        interval = get_bootstrap_interval(get_chi_square_effect_rows(
+            random_state.multinomial(reference_counts.sum(), reference_counts / reference_counts.sum(),
+                                     size=BOOTSTRAP_COUNT).astype(np.float64),
+            random_state.multinomial(current_counts.sum(), current_counts / current_counts.sum(),
+                                     size=BOOTSTRAP_COUNT).astype(np.float64)))
+        threshold = float(chi2.isf(self.chi_square_threshold, degrees_of_freedom) / n_current)
+
+        drift_detected = get_interval_decision(interval, threshold)
+        sampling = {"sample_size": [int(reference_counts.sum()), int(current_counts.sum())], "estimate": estimate,
+                    "interval": interval, "threshold": threshold}
+        if drift_detected is None:
+            return None, sampling
+        return {
+            "feature_type": "cat",
+            "stattest_name": "chi-square p_value",
+            "drift_score": float(chi2.sf(estimate * n_current, degrees_of_freedom)),
+            "drift_detected": drift_detected,
+        }, sampling
+
+    def get_sampled_column_metrics(self, column: str, reference_values, current_values, sample_size: int,
+                                   random_state: np.random.Generator) -> dict:
+        """
+        Column metrics decided on samples, recomputed on all rows when the sample decision is borderline.
+        The "sampling" entry records sample sizes, estimate, interval, threshold, decision and seconds.
+        """
+        start_time = time.perf_counter()
+        if column in self.categorical_columns:
+            column_metrics, sampling = self.get_sampled_categorical_metrics(reference_values, current_values,
+                                                                            sample_size, random_state)
+        else:
+            column_metrics, sampling = self.get_sampled_numerical_metrics(reference_values, current_values,
+                                                                          sample_size, random_state)
+        sampling["decision"] = "sample"
+        if column_metrics is None:
+            logging.info(f"Drift of [{column}] is borderline on samples, computing it on all rows.")
+            column_metrics = self.get_column_metrics(column, reference_values, current_values)
+            sampling["decision"] = "full"
+        sampling["seconds"] = time.perf_counter() - start_time
+        column_metrics["sampling"] = sampling
+        return column_metrics
+
+    def get_column_metrics(self, column: str, reference_values, current_values) -> dict:
+        if column in self.categorical_columns:
+            return self.get_categorical_metrics(reference_values, current_values)
+        return self.get_numerical_metrics(reference_values, current_values)
+
+    def compute_column_metrics(self, column: str, reference_values, current_values, sample_size: int,
+                               seed: list) -> dict:
+        """
+        Full or sampled column metrics. seed is per column, so results do not depend on which
+        process computes which column.
+        """
+        try:
+            if sample_size is None:
+                return self.get_column_metrics(column, reference_values, current_values)
+            return self.get_sampled_column_metrics(column, reference_values, current_values, sample_size,
+                                                   np.random.default_rng(seed))
+        except ValueError as e:
+            raise ValueError(f"Column [{column}]: {e}") from e
+
+    def get_parallel_column_metrics(self, reference_df: pd.DataFrame, current_df: pd.DataFrame, columns: list,
+                                    sample_size: int, seeds: list, n_jobs: int) -> dict:
+        """
+        Computes the columns on a pool of n_jobs processes. Column arrays are handed over in shared
+        memory instead of pickling the frames; categorical columns as factorized int codes.
+        """
+        shared_memories = []
+        try:
+            tasks = []
+            for column, seed in zip(columns, seeds):
+                categories = None
+                if column in self.categorical_columns:
+                    codes, categories = pd.factorize(pd.concat([reference_df[column], current_df[column]],
+                                                               ignore_index=True))
+                    arrays = [codes[:len(reference_df)], codes[len(reference_df):]]
+                    categories = list(categories)
+                else:
+                    arrays = [np.asarray(reference_df[column], dtype=np.float64),
+                              np.asarray(current_df[column], dtype=np.float64)]
+                array_specs = []
+                for array in arrays:
+                    shared_memory, array_spec = put_shared_array(array)
+                    shared_memories.append(shared_memory)
+                    array_specs.append(array_spec)
+                tasks.append((column, array_specs, categories, seed))
+
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                futures = [executor.submit(get_shared_column_metrics, self, column, array_specs, categories,
+                                           sample_size, seed)
+                           for column, array_specs, categories, seed in tasks]
+                return {column: future.result() for (column, _, _, _), future in zip(tasks, futures)}
+        finally:
+            for shared_memory in shared_memories:
+                shared_memory.close()
+                shared_memory.unlink()
+
+    def get_report(self, reference_df: pd.DataFrame, current_df: pd.DataFrame, sample_size: int = None,
+                   random_state: int = 42, n_jobs: int = 1) -> dict:
+        """
+        sample_size: when set, each column is decided on samples of at most sample_size rows per frame
+        (see get_sampled_column_metrics) and report["data_drift"]["data"]["sampling"] sums it up
+        n_jobs: number of processes the columns are split across (-1: all cores)
+        """
+        try:
+            start_time = time.perf_counter()
+            columns = self.numerical_columns + self.categorical_columns
+            seeds = [[random_state, column_number] for column_number in range(len(columns))]
+            n_jobs = os.cpu_count() if n_jobs == -1 else min(n_jobs, len(columns))
+            if n_jobs > 1:
+                logging.info(f"Computing drift of [{len(columns)}] columns on [{n_jobs}] processes.")
+                metrics = self.get_parallel_column_metrics(reference_df, current_df, columns, sample_size, seeds,
+                                                           n_jobs)
+            else:
+                metrics = {column: self.compute_column_metrics(column, reference_df[column].to_numpy(),
+                                                               current_df[column].to_numpy(), sample_size, seed)
+                           for column, seed in zip(columns, seeds)}
+            sampling = None
+            if sample_size is not None:
+                sampling = {
+                    "sample_size": sample_size,
+                    "confidence_level": CONFIDENCE_LEVEL,
+                    "n_full_fallbacks": sum(column_metrics["sampling"]["decision"] == "full"
+                                            for column_metrics in metrics.values()),
+                    "seconds": time.perf_counter() - start_time,
+                }
+            return self.get_report_from_metrics(metrics, sampling=sampling)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_report_from_metrics(self, metrics: dict, sampling: dict = None) -> dict:
+        n_features = len(metrics)
+        n_drifted_features = sum(column_metrics["drift_detected"] for column_metrics in metrics.values())
+        metrics.update({
+            "n_features": n_features,
+            "n_drifted_features": n_drifted_features,
+            "share_drifted_features": n_drifted_features / n_features if n_features else 0.0,
+            "dataset_drift": n_features > 0 and n_drifted_features / n_features >= DATASET_DRIFT_SHARE,
+        })
+        logging.info(f"Drift engine: [{n_drifted_features}] of [{n_features}] columns drifted.")
+        now = datetime.now()
+        report = {
+            "data_drift": {
+                "name": "data_drift",
+                "datetime": str(now),
+                "data": {
+                    "utility_columns": {},
+                    "cat_feature_names": self.categorical_columns,
+                    "num_feature_names": self.numerical_columns,
+                    "metrics": metrics,
+                },
+            },
+            "timestamp": str(now),
+        }
+        if sampling is not None:
+            report["data_drift"]["data"]["sampling"] = sampling
+        return report
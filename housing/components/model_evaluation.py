@@ -8,8 +8,8 @@ from entity.model_evaluation_entity import ModelEvaluationEntity
 from entity.model_factory import evaluate_regression_model
 from housing.exception import CustomException
 from housing.logger import logging
-from housing.utilities.util import load_data, read_yaml_file, write_yaml_file, load_object, get_dictionary_from_json, \
-    check_dir_exists
+from housing.utilities.util import load_data, read_yaml_file, write_yaml_file, load_object, \
+    check_dir_exists, get_schema
 
 
 class ModelEvaluation:
@@ -96,7 +96,7 @@ class ModelEvaluation:
             test_dataframe = load_data(file_path=test_file_path,
                                        schema_file_path=schema_file_path,
                                        )
-            schema_content = get_dictionary_from_json(schema_file_path)
+            schema_content = get_schema(schema_file_path)
             target_column_name = schema_content["target_column"]
 
             # target_column
@@ -1,11 +1,15 @@
+import os
 import shutil
 import sys
+import tempfile
 
 from entity.artifact_entity import ModelEvaluationArtifact, ModelPusherArtifact
 from entity.model_pusher_entity import ModelPusherEntity
+from housing.components.model_specialization import save_serving_model
 from housing.exception import CustomException
 from housing.logger import logging
-from housing.utilities.util import get_base_file_name, get_file_join, make_directories
+from housing.utilities.util import get_base_file_name, get_file_join, make_directories, load_object, get_dir, \
+    check_dir_exists
 
 
 class ModelPusher:
@@ -21,19 +25,47 @@ class ModelPusher:
         except Exception as e:
             raise CustomException(e, sys) from e
 
+    @staticmethod
+    def move_into_export_dir(staging_dir: str, export_dir: str) -> str:
+        """
+        Renames staging_dir to export_dir and returns the dir it ended up as. When a model was already
+        pushed into export_dir (same second), the next free time stamp is used.
+        """
+        while True:
+            try:
+                os.rename(staging_dir, export_dir)
+                return export_dir
+            except OSError:
+                time_stamp = get_base_file_name(export_dir)
+                if not check_dir_exists(export_dir) or not time_stamp.isdigit():
+                    raise
+                export_dir = get_file_join(get_dir(export_dir), f"{int(time_stamp) + 1}")
+
     def export_model(self) -> ModelPusherArtifact:
         try:
             evaluated_model_file_path = self.model_evaluation_artifact.evaluated_model_path
             export_dir = self.model_pusher_config.export_dir_path
             model_file_name = get_base_file_name(evaluated_model_file_path)
-            export_model_file_path = get_file_join(export_dir, model_file_name)
-            logging.info(f"Exporting model file: [{export_model_file_path}]")
-            make_directories(export_dir)
+            logging.info(f"Exporting model file: [{get_file_join(export_dir, model_file_name)}]")
 
-            shutil.copy(src=evaluated_model_file_path, dst=export_model_file_path)
+            # model is written into a staging dir first and then renamed into place, so a serving
+            # process watching the export root never sees a half written model; the staging dir
+            # name is unique and not a time stamp, so the serving process skips it
+            make_directories(get_dir(export_dir))
+            staging_dir = tempfile.mkdtemp(prefix=".staging_", dir=get_dir(export_dir))
+            # mkdtemp creates the dir readable by the owner only
+            os.chmod(staging_dir, 0o755)
+            try:
+                serving_model = load_object(file_path=evaluated_model_file_path).get_serving_model()
+                save_serving_model(serving_model, get_file_join(staging_dir, model_file_name))
+                export_dir = self.move_into_export_dir(staging_dir, export_dir)
+            except Exception:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                raise
+            export_model_file_path = get_file_join(export_dir, model_file_name)
             # we can call a function to save model to Azure blob storage/ google cloud strorage / s3 bucket
             logging.info(
-                f"Trained model: {evaluated_model_file_path} is copied in export dir:[{export_model_file_path}]")
+                f"Serving model of: {evaluated_model_file_path} is exported to: [{export_model_file_path}]")
 
             model_pusher_artifact = ModelPusherArtifact(is_model_pusher=True,
                                                         export_model_file_path=export_model_file_path
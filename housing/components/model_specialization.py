@@ -0,0 +1,248 @@
+import copy
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor, ExtraTreesRegressor
+
+from housing.components.preprocessing_kernel import CompiledPreprocessor, get_probe_frame
+from housing.exception import CustomException
+from housing.logger import logging
+from housing.utilities.util import save_object, load_object
+
+
+class LinearHousingModel:
+    """
+    Linear model with the preprocessing scaling folded into its coefficients.
+    prediction = generated_features @ weights + category_bias[category]
+    where generated_features are the imputed numerical columns plus the FeatureGenerator ratios.
+    """
+
+    def __init__(self, compiled_preprocessor: CompiledPreprocessor, weights: np.ndarray, category_bias: np.ndarray):
+        self.compiled_preprocessor = compiled_preprocessor
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.category_bias = np.asarray(category_bias, dtype=np.float64)
+
+    def predict_arrays(self, numerical: np.ndarray, category_codes: np.ndarray) -> np.ndarray:
+        features = self.compiled_preprocessor.generate_features(numerical)
+        return features @ self.weights + self.category_bias[category_codes]
+
+    def predict(self, X) -> np.ndarray:
+        """
+        X: dataframe or dict of columns with the raw input features
+        """
+        compiled_preprocessor = self.compiled_preprocessor
+        return self.predict_arrays(compiled_preprocessor.get_numerical_array(X),
+                                   compiled_preprocessor.encode_categories(X[compiled_preprocessor.categorical_column]))
+
+
+def is_linear_model(model_object) -> bool:
+    return type(model_object).__module__.startswith("sklearn.linear_model") and \
+           hasattr(model_object, "coef_") and np.ndim(model_object.coef_) == 1
+
+
+def specialize_linear_model(compiled_preprocessor: CompiledPreprocessor, model_object) -> LinearHousingModel:
+    """
+    Folds StandardScaler mean/scale of the numerical columns and the scaled one hot table of the
+    categorical column into the coefficients and intercept of a fitted linear model.
+    """
+    try:
+        n_numerical_output = compiled_preprocessor.n_numerical_output
+        coef = np.asarray(model_object.coef_, dtype=np.float64)
+        if coef.shape[0] != compiled_preprocessor.n_output:
+            raise ValueError(f"Model has {coef.shape[0]} coefficients, "
+                             f"preprocessing produces {compiled_preprocessor.n_output} features.")
+        numerical_coef, categorical_coef = coef[:n_numerical_output], coef[n_numerical_output:]
+
+        weights = numerical_coef / compiled_preprocessor.scale
+        intercept = float(model_object.intercept_) - float(compiled_preprocessor.mean @ weights)
+        category_bias = intercept + compiled_preprocessor.category_table @ categorical_coef
+        return LinearHousingModel(compiled_preprocessor=compiled_preprocessor, weights=weights,
+                                  category_bias=category_bias)
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+def verify_specialized_model(specialized_model, preprocessing_obj, model_object, X=None,
+                             rtol: float = 1e-6) -> bool:
+    """
+    Compares specialized_model against preprocessing_obj + model_object on X
+    (a probe input covering every category and missing values when X is None).
+    """
+    try:
+        if X is None:
+            X = pd.DataFrame(get_probe_frame(specialized_model.compiled_preprocessor))
+        expected = model_object.predict(preprocessing_obj.transform(X))
+        actual = specialized_model.predict(X)
+        atol = rtol * max(1.0, float(np.max(np.abs(expected))))
+        is_close = np.allclose(actual, expected, rtol=rtol, atol=atol)
+        logging.info(f"Specialized model max abs diff: [{np.max(np.abs(actual - expected))}], accepted: [{is_close}]")
+        return is_close
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+FOREST_NODE_DTYPE = np.dtype([("feature", np.int32), ("threshold", np.float32), ("left", np.int32),
+                              ("right", np.int32), ("value", np.float64)])
+FOREST_NODES_FILE_NAME = "forest_nodes.npy"
+FOREST_ROOTS_FILE_NAME = "forest_roots.npy"
+COMPACT_FOREST_DIR_NAME = "compact_forest"
+
+
+class CompactForestModel:
+    """
+    Averaging tree ensemble (RandomForestRegressor/ExtraTreesRegressor) flattened into one node array.
+    nodes: structured array (feature, threshold, left, right, value) of every tree one after another,
+    leaves point to themselves so all trees can be walked max_depth steps without branching.
+    roots: index of the first node of each tree
+    Thresholds are float32 and rounded down, inputs are compared as float32 like sklearn does,
+    so the split decisions are the same as the original trees.
+    """
+
+    def __init__(self, nodes: np.ndarray, roots: np.ndarray, max_depth: int,
+                 compiled_preprocessor: CompiledPreprocessor = None, chunk_size: int = 8192):
+        self.nodes = nodes
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.max_depth = int(max_depth)
+        self.compiled_preprocessor = compiled_preprocessor
+        self.chunk_size = chunk_size
+
+    def predict_transformed(self, X: np.ndarray) -> np.ndarray:
+        """
+        X: preprocessed feature array, same input as the original forest predict
+        """
+        X = np.asarray(X, dtype=np.float32)
+        feature, threshold = self.nodes["feature"], self.nodes["threshold"]
+        left, right, value = self.nodes["left"], self.nodes["right"], self.nodes["value"]
+        n_trees = len(self.roots)
+        prediction = np.zeros(X.shape[0], dtype=np.float64)
+
+        for start in range(0, X.shape[0], self.chunk_size):
+            X_chunk = X[start:start + self.chunk_size]
+            rows = np.arange(X_chunk.shape[0])[:, np.newaxis]
+            node = np.repeat(self.roots[np.newaxis, :], X_chunk.shape[0], axis=0)
+            for _ in range(self.max_depth):
+                go_left = X_chunk[rows, feature[node]] <= threshold[node]
+                node = np.where(go_left, left[node], right[node])
+
+            # trees are summed one by one in the same order as sklearn to get the same rounding
+            chunk_prediction = prediction[start:start + self.chunk_size]
+            leaf_value = value[node]
+            for tree_number in range(n_trees):
+                chunk_prediction += leaf_value[:, tree_number]
+        prediction /= n_trees
+        return prediction
+
+    def predict(self, X) -> np.ndarray:
+        """
+        X: dataframe or dict of columns with the raw input features
+        """
+        return self.predict_transformed(self.compiled_preprocessor.transform(X))
+
+    def save(self, dir_path: str):
+        """
+        Saves nodes and roots as .npy files so they can be loaded memory mapped.
+        """
+        try:
+            os.makedirs(dir_path, exist_ok=True)
+            np.save(os.path.join(dir_path, FOREST_NODES_FILE_NAME), self.nodes)
+            np.save(os.path.join(dir_path, FOREST_ROOTS_FILE_NAME), self.roots)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def load(dir_path: str, compiled_preprocessor: CompiledPreprocessor = None,
+             mmap_mode: str = "r") -> "CompactForestModel":
+        try:
+            nodes = np.load(os.path.join(dir_path, FOREST_NODES_FILE_NAME), mmap_mode=mmap_mode)
+            roots = np.load(os.path.join(dir_path, FOREST_ROOTS_FILE_NAME))
+            return CompactForestModel(nodes=nodes, roots=roots, max_depth=get_forest_max_depth(nodes, roots),
+                                      compiled_preprocessor=compiled_preprocessor)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+
+def get_forest_max_depth(nodes: np.ndarray, roots: np.ndarray) -> int:
+    depth = np.full(len(nodes), -1, dtype=np.int64)
+    depth[roots] = 0
+    frontier = np.asarray(roots, dtype=np.int64)
+    max_depth = 0
+    while len(frontier):
+        is_split = nodes["left"][frontier] != frontier
+        frontier = frontier[is_split]
+        if not len(frontier):
+            break
+        max_depth += 1
+        frontier = np.concatenate([nodes["left"][frontier], nodes["right"][frontier]]).astype(np.int64)
+    return max_depth
+
+
+def is_forest_model(model_object) -> bool:
+    return isinstance(model_object, (RandomForestRegressor, ExtraTreesRegressor)) and model_object.n_outputs_ == 1
+
+
+def specialize_forest_model(compiled_preprocessor: CompiledPreprocessor, model_object) -> CompactForestModel:
+    """
+    Flattens every tree of a fitted single output forest regressor into one CompactForestModel.
+    """
+    try:
+        trees = [estimator.tree_ for estimator in model_object.estimators_]
+        n_nodes = [tree.node_count for tree in trees]
+        roots = np.concatenate([[0], np.cumsum(n_nodes)[:-1]]).astype(np.int32)
+        nodes = np.empty(sum(n_nodes), dtype=FOREST_NODE_DTYPE)
+
+        for root, tree in zip(roots, trees):
+            tree_nodes = nodes[root:root + tree.node_count]
+            node_ix = np.arange(tree.node_count, dtype=np.int32) + root
+            is_leaf = tree.children_left < 0
+
+            threshold = tree.threshold.astype(np.float32)
+            rounded_up = threshold.astype(np.float64) > tree.threshold
+            threshold[rounded_up] = np.nextafter(threshold[rounded_up], np.float32(-np.inf))
+
+            tree_nodes["feature"] = np.where(is_leaf, 0, tree.feature)
+            tree_nodes["threshold"] = np.where(is_leaf, np.float32(0), threshold)
+            tree_nodes["left"] = np.where(is_leaf, node_ix, tree.children_left + root)
+            tree_nodes["right"] = np.where(is_leaf, node_ix, tree.children_right + root)
+            tree_nodes["value"] = tree.value[:, 0, 0]
+
+        max_depth = max(tree.max_depth for tree in trees)
+        logging.info(f"Flattened {len(trees)} trees into {len(nodes)} nodes, max depth: [{max_depth}]")
+        return CompactForestModel(nodes=nodes, roots=roots, max_depth=max_depth,
+                                  compiled_preprocessor=compiled_preprocessor)
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+def save_serving_model(serving_model, model_file_path: str):
+    """
+    Pickles the serving model into model_file_path. A CompactForestModel is saved next to it
+    (compact_forest/*.npy) and left out of the pickle, which then only holds the preprocessing.
+    """
+    try:
+        specialized_model_object = getattr(serving_model, "specialized_model_object", None)
+        if isinstance(specialized_model_object, CompactForestModel):
+            specialized_model_object.save(os.path.join(os.path.dirname(model_file_path), COMPACT_FOREST_DIR_NAME))
+            serving_model = copy.copy(serving_model)
+            serving_model.specialized_model_object = None
+            serving_model.compact_forest_dir_name = COMPACT_FOREST_DIR_NAME
+        save_object(file_path=model_file_path, obj=serving_model)
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+def load_serving_model(model_file_path: str, mmap_mode: str = "r"):
+    """
+    Loads a model saved by save_serving_model; the forest nodes are memory mapped, not read.
+    """
+    try:
+        serving_model = load_object(file_path=model_file_path)
+        compact_forest_dir_name = getattr(serving_model, "compact_forest_dir_name", None)
+        if compact_forest_dir_name is not None:
+            serving_model.specialized_model_object = CompactForestModel.load(
+                os.path.join(os.path.dirname(model_file_path), compact_forest_dir_name),
+                compiled_preprocessor=serving_model.compiled_preprocessing_object, mmap_mode=mmap_mode)
+        return serving_model
+    except Exception as e:
+        raise CustomException(e, sys) from e
@@ -1,22 +1,42 @@
 from entity.artifact_entity import DataTransformationArtifact, ModelTrainerArtifact
 from entity.model_factory import ModelFactory, GridSearchedBestModel, evaluate_regression_model, MetricInfoArtifact
+from entity.fit_cache import FitCache
 from housing.exception import CustomException
 import sys
 from housing.logger import logging
 from typing import List
 from entity.model_trainer_entity import ModelTrainerEntity
-from housing.utilities.util import load_numpy_array_data, load_object, save_object
+import pandas as pd
+from housing.utilities.util import load_numpy_array_data, load_object, save_object, load_data, get_schema
+from housing.components.preprocessing_kernel import compile_preprocessing_object, get_probe_frame
+from housing.components.model_specialization import is_linear_model, specialize_linear_model, \
+    verify_specialized_model, is_forest_model, specialize_forest_model
+
+SPECIALIZATION_SAMPLE_SIZE = 10000
 
 
 class HousingEstimatorModel:
-    def __init__(self, preprocessing_object, trained_model_object):
+    def __init__(self, preprocessing_object, trained_model_object, compiled_preprocessing_object=None,
+                 specialized_model_object=None):
         """
         TrainedModel constructor
         preprocessing_object: preprocessing_object
         trained_model_object: trained_model_object
+        compiled_preprocessing_object: optional CompiledPreprocessor giving the same output as preprocessing_object
+        specialized_model_object: optional model predicting straight from raw inputs, verified against
+        preprocessing_object + trained_model_object
         """
         self.preprocessing_object = preprocessing_object
         self.trained_model_object = trained_model_object
+        self.compiled_preprocessing_object = compiled_preprocessing_object
+        self.specialized_model_object = specialized_model_object
+        self.model_name = type(trained_model_object).__name__
+
+    def transform(self, X):
+        compiled_preprocessing_object = getattr(self, "compiled_preprocessing_object", None)
+        if compiled_preprocessing_object is not None:
+            return compiled_preprocessing_object.transform(X)
+        return self.preprocessing_object.transform(X)
 
     def predict(self, X):
         """
@@ -24,14 +44,31 @@ class HousingEstimatorModel:
         which gurantees that the inputs are in the same format as the training data
         At last it perform prediction on transformed features
         """
-        transformed_feature = self.preprocessing_object.transform(X)
+        specialized_model_object = getattr(self, "specialized_model_object", None)
+        if specialized_model_object is not None:
+            return specialized_model_object.predict(X)
+        transformed_feature = self.transform(X)
         return self.trained_model_object.predict(transformed_feature)
 
+    def get_serving_model(self):
+        """
+        Returns the model to export for serving. When a specialized model is available the original
+        trained_model_object is left out, which keeps the exported file small and quick to load.
+        """
+        if getattr(self, "specialized_model_object", None) is None:
+            return self
+        serving_model = HousingEstimatorModel(preprocessing_object=self.preprocessing_object,
+                                              trained_model_object=None,
+                                              compiled_preprocessing_object=self.compiled_preprocessing_object,
+                                              specialized_model_object=self.specialized_model_object)
+        serving_model.model_name = self.model_name
+        return serving_model
+
     def __repr__(self):
-        return f"{type(self.trained_model_object).__name__}()"
+        return f"{getattr(self, 'model_name', type(self.trained_model_object).__name__)}()"
 
     def __str__(self):
-        return f"{type(self.trained_model_object).__name__}()"
+        return self.__repr__()
 
 
 class ModelTrainer:
@@ -45,6 +82,62 @@ class ModelTrainer:
         except Exception as e:
             raise CustomException(e, sys) from e
 
+    @staticmethod
+    def get_compiled_preprocessing_object(preprocessing_obj):
+        """
+        Returns CompiledPreprocessor for preprocessing_obj or None when it can not be compiled,
+        in which case prediction falls back to preprocessing_obj.
+        """
+        try:
+            return compile_preprocessing_object(preprocessing_obj)
+        except Exception as e:
+            logging.info(f"Preprocessing object not compiled, using it as is: {e}")
+            return None
+
+    def get_specialization_sample(self, compiled_preprocessing_obj) -> pd.DataFrame:
+        """
+        Raw input the specialized model is verified on: up to SPECIALIZATION_SAMPLE_SIZE rows of the ingested
+        train and test data, for real value ranges and forest split thresholds, plus the probe rows
+        covering every category and missing values.
+        """
+        probe_df = pd.DataFrame(get_probe_frame(compiled_preprocessing_obj))
+        schema_file_path = self.data_transformation_artifact.schema_file_path
+        if schema_file_path is None:
+            return probe_df
+        target_column_name = get_schema(schema_file_path)["target_column"]
+        sample_df = pd.concat([load_data(file_path=file_path, schema_file_path=schema_file_path)
+                               for file_path in [self.data_transformation_artifact.ingested_train_file_path,
+                                                 self.data_transformation_artifact.ingested_test_file_path]],
+                              ignore_index=True).drop(columns=[target_column_name])
+        if len(sample_df) > SPECIALIZATION_SAMPLE_SIZE:
+            sample_df = sample_df.sample(n=SPECIALIZATION_SAMPLE_SIZE, random_state=42)
+        # category column becomes object, as in prediction requests
+        return pd.concat([sample_df, probe_df], ignore_index=True)
+
+    @staticmethod
+    def get_specialized_model_object(preprocessing_obj, compiled_preprocessing_obj, model_object, X=None):
+        """
+        Returns a specialized version of model_object for serving, or None when there is none for
+        this kind of model or it does not match the original pipeline on X (raw input rows,
+        see get_specialization_sample).
+        """
+        try:
+            if compiled_preprocessing_obj is None:
+                return None
+            if is_linear_model(model_object):
+                specialized_model_obj = specialize_linear_model(compiled_preprocessing_obj, model_object)
+            elif is_forest_model(model_object):
+                specialized_model_obj = specialize_forest_model(compiled_preprocessing_obj, model_object)
+            else:
+                return None
+            if not verify_specialized_model(specialized_model_obj, preprocessing_obj, model_object, X=X):
+                logging.info(f"Specialized model differs from original pipeline, not using it.")
+                return None
+            return specialized_model_obj
+        except Exception as e:
+            logging.info(f"Model not specialized, using it as is: {e}")
+            return None
+
     def initiate_model_trainer(self) -> ModelTrainerArtifact:
         try:
             logging.info(f"Loading transformed training dataset")
@@ -63,13 +156,19 @@ class ModelTrainer:
             model_config_file_path = self.model_trainer_config.model_config_file_path
 
             logging.info(f"Initializing model factory class using above model config file: {model_config_file_path}")
-            model_factory = ModelFactory(model_config_path=model_config_file_path)
+            fit_cache = None
+            if self.model_trainer_config.fit_cache_dir is not None:
+                fit_cache = FitCache(cache_dir=self.model_trainer_config.fit_cache_dir,
+                                     max_size_mb=self.model_trainer_config.fit_cache_max_size_mb)
+            model_factory = ModelFactory(model_config_path=model_config_file_path, fit_cache=fit_cache)
 
             base_accuracy = self.model_trainer_config.base_accuracy
             logging.info(f"Expected accuracy: {base_accuracy}")
 
             logging.info(f"Initiating operation model selecttion")
             best_model = model_factory.get_best_model(X=x_train, y=y_train, base_accuracy=base_accuracy)
+            fit_cache_summary = model_factory.get_fit_cache_summary()
+            logging.info(f"Fit cache summary: {fit_cache_summary}")
 
             logging.info(f"Best model found on training dataset: {best_model}")
 
@@ -87,9 +186,20 @@ class ModelTrainer:
             preprocessing_obj = load_object(file_path=self.data_transformation_artifact.preprocessed_object_file_path)
             model_object = metric_info.model_object
 
+            logging.info(f"Compiling preprocessing object for inference.")
+            compiled_preprocessing_obj = self.get_compiled_preprocessing_object(preprocessing_obj)
+            specialized_model_obj = None
+            if compiled_preprocessing_obj is not None:
+                specialization_sample_df = self.get_specialization_sample(compiled_preprocessing_obj)
+                specialized_model_obj = self.get_specialized_model_object(preprocessing_obj,
+                                                                          compiled_preprocessing_obj, model_object,
+                                                                          X=specialization_sample_df)
+
             trained_model_file_path = self.model_trainer_config.trained_model_file_path
             housing_model = HousingEstimatorModel(preprocessing_object=preprocessing_obj,
-                                                  trained_model_object=model_object)
+                                                  trained_model_object=model_object,
+                                                  compiled_preprocessing_object=compiled_preprocessing_obj,
+                                                  specialized_model_object=specialized_model_obj)
             logging.info(f"Saving model at path: {trained_model_file_path}")
             save_object(file_path=trained_model_file_path, obj=housing_model)
 
@@ -99,7 +209,8 @@ class ModelTrainer:
                                                           test_rmse=metric_info.test_rmse,
                                                           train_accuracy=metric_info.train_accuracy,
                                                           test_accuracy=metric_info.test_accuracy,
-                                                          model_accuracy=metric_info.model_accuracy
+                                                          model_accuracy=metric_info.model_accuracy,
+                                                          fit_cache_summary=fit_cache_summary
 
                                                           )
 
@@ -0,0 +1,175 @@
+import sys
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import StandardScaler
+
+from housing.components.data_transformation import FeatureGenerator, divide_ratio
+from housing.exception import CustomException
+from housing.logger import logging
+
+
+class CompiledPreprocessor:
+    """
+    Flat, array backed replacement of the fitted preprocessing ColumnTransformer.
+    numerical_fill_values: median used by the numerical SimpleImputer per column
+    ratio_numerator_ix / ratio_denominator_ix: column pairs of the FeatureGenerator ratios
+    mean / scale: StandardScaler statistics of the numerical + generated columns
+    categories / category_table: fully transformed (imputed, one hot encoded, scaled) row per category
+    category_fill_code: row of category_table used for missing categories
+    """
+
+    def __init__(self, numerical_columns, categorical_column, numerical_fill_values, ratio_numerator_ix,
+                 ratio_denominator_ix, mean, scale, categories, category_table, category_fill_code):
+        self.numerical_columns = list(numerical_columns)
+        self.categorical_column = categorical_column
+        self.numerical_fill_values = np.asarray(numerical_fill_values, dtype=np.float64)
+        self.ratio_numerator_ix = np.asarray(ratio_numerator_ix, dtype=np.intp)
+        self.ratio_denominator_ix = np.asarray(ratio_denominator_ix, dtype=np.intp)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.categories = np.asarray(categories, dtype=object)
+        self.category_table = np.ascontiguousarray(category_table, dtype=np.float64)
+        self.category_fill_code = int(category_fill_code)
+
+        self.n_numerical = len(self.numerical_columns)
+        self.n_numerical_output = self.n_numerical + len(self.ratio_numerator_ix)
+        self.n_output = self.n_numerical_output + self.category_table.shape[1]
+
+    def encode_categories(self, values) -> np.ndarray:
+        """
+        Maps raw category values to row numbers of category_table.
+        Missing values (None/NaN) get category_fill_code, unknown values raise ValueError
+        the same way the fitted OneHotEncoder does.
+        """
+        values = np.asarray(values, dtype=object).ravel()
+        is_missing = np.array([value is None or value != value for value in values], dtype=bool)
+        codes = np.searchsorted(self.categories, np.where(is_missing, self.categories[0], values))
+        codes = np.minimum(codes, len(self.categories) - 1)
+        is_unknown = ~is_missing & (self.categories[codes] != values)
+        if is_unknown.any():
+            raise ValueError(f"Found unknown categories {sorted(set(values[is_unknown]))} "
+                             f"in column: [{self.categorical_column}]")
+        codes[is_missing] = self.category_fill_code
+        return codes
+
+    def generate_features(self, numerical: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """
+        Imputed numerical columns followed by the FeatureGenerator ratio columns, before scaling.
+        out: optional array of shape (n_rows, n_numerical_output) to write into
+        """
+        if out is None:
+            out = np.empty((numerical.shape[0], self.n_numerical_output), dtype=np.float64)
+
+        numerical_out = out[:, :self.n_numerical]
+        numerical_out[...] = numerical
+        np.copyto(numerical_out, self.numerical_fill_values, where=np.isnan(numerical_out))
+
+        for ratio_number, (numerator_ix, denominator_ix) in enumerate(zip(self.ratio_numerator_ix,
+                                                                          self.ratio_denominator_ix)):
+            divide_ratio(numerical_out[:, numerator_ix], numerical_out[:, denominator_ix],
+                         out=out[:, self.n_numerical + ratio_number])
+        return out
+
+    def get_numerical_array(self, X) -> np.ndarray:
+        return np.column_stack([np.asarray(X[column], dtype=np.float64) for column in self.numerical_columns])
+
+    def transform_arrays(self, numerical: np.ndarray, category_codes: np.ndarray) -> np.ndarray:
+        """
+        numerical: float array of shape (n_rows, len(numerical_columns)), NaN for missing values
+        category_codes: int array of row numbers into category_table (see encode_categories)
+        return: array identical to ColumnTransformer.transform of the same rows
+        """
+        n_rows = numerical.shape[0]
+        out = np.empty((n_rows, self.n_output), dtype=np.float64)
+
+        scaled_out = self.generate_features(numerical, out=out[:, :self.n_numerical_output])
+        scaled_out -= self.mean
+        scaled_out /= self.scale
+
+        out[:, self.n_numerical_output:] = self.category_table[category_codes]
+        return out
+
+    def transform(self, X) -> np.ndarray:
+        """
+        X: dataframe or dict of columns with the raw input features
+        """
+        numerical = self.get_numerical_array(X)
+        category_codes = self.encode_categories(X[self.categorical_column])
+        return self.transform_arrays(numerical, category_codes)
+
+
+def get_pipeline_steps(pipeline, expected_types):
+    steps = [step for _, step in pipeline.steps]
+    if len(steps) != len(expected_types) or \
+            not all(isinstance(step, expected_type) for step, expected_type in zip(steps, expected_types)):
+        raise ValueError(f"Unsupported pipeline for compilation: {pipeline}")
+    return steps
+
+
+def get_probe_frame(compiled_preprocessor: CompiledPreprocessor) -> dict:
+    """
+    Small input covering every category, a missing category and missing numerical values.
+    """
+    categories = list(compiled_preprocessor.categories) + [np.nan]
+    n_rows = len(categories)
+    factors = np.linspace(0.5, 2.0, n_rows)
+    probe = {column: compiled_preprocessor.numerical_fill_values[column_number] * factors
+             for column_number, column in enumerate(compiled_preprocessor.numerical_columns)}
+    for column_number, column in enumerate(compiled_preprocessor.numerical_columns):
+        probe[column][column_number % n_rows] = np.nan
+    probe[compiled_preprocessor.categorical_column] = np.array(categories, dtype=object)
+    return probe
+
+
+def compile_preprocessing_object(preprocessing_obj: ColumnTransformer) -> CompiledPreprocessor:
+    """
+    Compiles the ColumnTransformer built in DataTransformation.get_data_transformer_object into
+    a CompiledPreprocessor and checks that both give identical output on a probe input.
+    """
+    try:
+        transformers = {name: (transformer, columns) for name, transformer, columns in preprocessing_obj.transformers_
+                        if name != "remainder"}
+        num_pipeline, numerical_columns = transformers["num_pipeline"]
+        cat_pipeline, categorical_columns = transformers["cat_pipeline"]
+        if len(categorical_columns) != 1:
+            raise ValueError(f"Only one categorical column is supported, found: {categorical_columns}")
+
+        imputer, feature_generator, scaler = get_pipeline_steps(num_pipeline,
+                                                                [SimpleImputer, FeatureGenerator, StandardScaler])
+        ratio_numerator_ix, ratio_denominator_ix = map(list, zip(*feature_generator.get_ratio_column_pairs()))
+        n_numerical_output = len(numerical_columns) + len(ratio_numerator_ix)
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(n_numerical_output)
+        scale = scaler.scale_ if scaler.with_std else np.ones(n_numerical_output)
+
+        cat_imputer = cat_pipeline.steps[0][1]
+        one_hot_encoder = cat_pipeline.named_steps["one_hot_encoder"]
+        categories = one_hot_encoder.categories_[0]
+        category_table = cat_pipeline.transform(np.array(categories, dtype=object).reshape(-1, 1))
+        if hasattr(category_table, "toarray"):
+            category_table = category_table.toarray()
+        category_fill_code = int(np.searchsorted(categories, cat_imputer.statistics_[0]))
+
+        compiled_preprocessor = CompiledPreprocessor(numerical_columns=numerical_columns,
+                                                     categorical_column=categorical_columns[0],
+                                                     numerical_fill_values=imputer.statistics_,
+                                                     ratio_numerator_ix=ratio_numerator_ix,
+                                                     ratio_denominator_ix=ratio_denominator_ix,
+                                                     mean=mean,
+                                                     scale=scale,
+                                                     categories=categories,
+                                                     category_table=category_table,
+                                                     category_fill_code=category_fill_code)
+
+        probe = get_probe_frame(compiled_preprocessor)
+        expected = preprocessing_obj.transform(pd.DataFrame(probe))
+        if hasattr(expected, "toarray"):
+            expected = expected.toarray()
+        if not np.array_equal(compiled_preprocessor.transform(probe), expected, equal_nan=True):
+            raise ValueError("Compiled preprocessor output differs from preprocessing object output.")
+        logging.info(f"Compiled preprocessing object into {compiled_preprocessor.n_output} output columns.")
+        return compiled_preprocessor
+    except Exception as e:
+        raise CustomException(e, sys) from e
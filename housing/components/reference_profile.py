@@ -0,0 +1,163 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy.special import kolmogorov
+
+from housing.components.drift_engine import DriftEngine, get_sorted_values, get_quantile_bin_edges, \
+    get_bin_proportions, get_psi, get_chi_square
+from housing.exception import CustomException
+from housing.logger import logging
+from housing.utilities.util import make_directories, get_dir, get_file_join, check_dir_exists, \
+    get_filename_from_directory_list
+
+PROFILE_QUANTILE_COUNT = 101
+
+
+class ReferenceProfile:
+    """
+    Compact summary of an accepted (reference) dataset, enough to test new batches for drift
+    without the reference rows:
+    numerical: row count, PROFILE_QUANTILE_COUNT quantiles with the exact reference CDF at each of
+    them, PSI bin edges and reference bin proportions
+    categorical: row count per category
+    Its size does not depend on the reference row count, and compare reads the batch in one pass
+    (one searchsorted + bincount per numerical column, one value_counts per categorical column).
+    """
+
+    def __init__(self, numerical: dict, categorical: dict):
+        self.numerical = numerical
+        self.categorical = categorical
+
+    @classmethod
+    def build(cls, reference_df: pd.DataFrame, numerical_columns: list, categorical_columns: list,
+              n_quantiles: int = PROFILE_QUANTILE_COUNT) -> "ReferenceProfile":
+        try:
+            numerical = {}
+            for column in numerical_columns:
+                reference_sorted = get_sorted_values(reference_df[column].to_numpy())
+                if len(reference_sorted) == 0:
+                    raise ValueError(f"Column [{column}] has no values to profile.")
+                quantiles = np.unique(np.quantile(reference_sorted, np.linspace(0, 1, n_quantiles)))
+                psi_edges = get_quantile_bin_edges(reference_sorted)
+                numerical[column] = {
+                    "n": len(reference_sorted),
+                    "quantiles": quantiles.tolist(),
+                    "cdf": (np.searchsorted(reference_sorted, quantiles, side="right") /
+                            len(reference_sorted)).tolist(),
+                    "psi_edges": psi_edges.tolist(),
+                    "psi_proportions": get_bin_proportions(reference_sorted, psi_edges).tolist(),
+                }
+            categorical = {}
+            for column in categorical_columns:
+                counts = reference_df[column].value_counts()
+                categorical[column] = {str(category): int(count) for category, count in counts.items()}
+            return cls(numerical=numerical, categorical=categorical)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def save(self, file_path: str):
+        try:
+            make_directories(get_dir(file_path))
+            with open(f"{file_path}.tmp", "w") as profile_file:
+                json.dump({"numerical": self.numerical, "categorical": self.categorical}, profile_file)
+            os.replace(f"{file_path}.tmp", file_path)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @classmethod
+    def load(cls, file_path: str) -> "ReferenceProfile":
+        try:
+            with open(file_path) as profile_file:
+                profile = json.load(profile_file)
+            return cls(numerical=profile["numerical"], categorical=profile["categorical"])
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get_numerical_metrics(self, drift_engine: DriftEngine, column: str, current_values) -> dict:
+        column_profile = self.numerical[column]
+        current_values = np.asarray(current_values, dtype=np.float64)
+        current_values = current_values[~np.isnan(current_values)]
+        if len(current_values) == 0:
+            raise ValueError(f"Column [{column}] has no values.")
+        n_current = len(current_values)
+
+        # KS statistic at the profile quantiles: a lower bound of the exact statistic, exact at the sketch points
+        quantiles = np.asarray(column_profile["quantiles"])
+        current_cdf = np.cumsum(np.bincount(np.searchsorted(quantiles, current_values, side="left"),
+                                            minlength=len(quantiles) + 1))[:len(quantiles)] / n_current
+        ks_statistic = float(np.max(np.abs(np.asarray(column_profile["cdf"]) - current_cdf)))
+        effective_n = np.sqrt(column_profile["n"] * n_current / (column_profile["n"] + n_current))
+        ks_p_value = float(kolmogorov(ks_statistic * effective_n))
+
+        psi_edges = np.asarray(column_profile["psi_edges"])
+        current_proportions = np.bincount(np.searchsorted(psi_edges, current_values, side="left"),
+                                          minlength=len(psi_edges) + 1) / n_current
+        psi = get_psi(np.asarray(column_profile["psi_proportions"]), current_proportions)
+
+        stattest_name, drift_score, drift_detected = drift_engine.get_numerical_decision(ks_p_value, psi)
+        return {
+            "feature_type": "num",
+            "stattest_name": stattest_name,
+            "drift_score": drift_score,
+            "drift_detected": drift_detected,
+            "ks_statistic": ks_statistic,
+            "ks_p_value": ks_p_value,
+            "psi": psi,
+        }
+
+    def get_categorical_metrics(self, drift_engine: DriftEngine, column: str, current_values) -> dict:
+        reference_counts = pd.Series(self.categorical[column], dtype=np.float64)
+        current_counts = pd.Series(current_values).dropna().astype(str).value_counts()
+        categories = sorted(set(reference_counts.index) | set(current_counts.index))
+        reference_counts = reference_counts.reindex(categories, fill_value=0).to_numpy(dtype=np.float64)
+        current_counts = current_counts.reindex(categories, fill_value=0).to_numpy(dtype=np.float64)
+        chi_square_statistic, chi_square_p_value = get_chi_square(reference_counts, current_counts)
+        stattest_name, drift_score, drift_detected = drift_engine.get_categorical_decision(chi_square_p_value)
+        return {
+            "feature_type": "cat",
+            "stattest_name": stattest_name,
+            "drift_score": drift_score,
+            "drift_detected": drift_detected,
+            "chi_square_statistic": chi_square_statistic,
+            "psi": get_psi(reference_counts / max(reference_counts.sum(), 1),
+                           current_counts / max(current_counts.sum(), 1)),
+            "categories": categories,
+            "ref_counts": reference_counts.tolist(),
+            "current_counts": current_counts.tolist(),
+        }
+
+    def compare(self, current_df: pd.DataFrame, drift_engine: DriftEngine) -> dict:
+        """
+        Drift report (same structure as DriftEngine.get_report) of current_df against the profile.
+        Only profiled columns present in current_df are compared, so request data without the
+        target column can be checked too.
+        """
+        try:
+            metrics = {}
+            for column in self.numerical:
+                if column in current_df.columns:
+                    metrics[column] = self.get_numerical_metrics(drift_engine, column, current_df[column].to_numpy())
+            for column in self.categorical:
+                if column in current_df.columns:
+                    metrics[column] = self.get_categorical_metrics(drift_engine, column,
+                                                                   current_df[column].to_numpy())
+            return drift_engine.get_report_from_metrics(metrics)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+
+def get_latest_reference_profile_path(data_validation_dir: str, profile_file_name: str):
+    """
+    Profile of the most recent validation run (time stamped dirs sort by time), None when there is none.
+    """
+    if not check_dir_exists(data_validation_dir):
+        return None
+    for run_dir_name in sorted(get_filename_from_directory_list(data_validation_dir), reverse=True):
+        profile_file_path = get_file_join(data_validation_dir, run_dir_name, profile_file_name)
+        if check_dir_exists(profile_file_path):
+            return profile_file_path
+    logging.info(f"No reference profile found under [{data_validation_dir}]")
+    return None
@@ -0,0 +1,218 @@
+"""
+Deferred rendering of the data drift report page (evidently Dashboard).
+Validation only writes a job file next to the page and a placeholder page; the page is rendered
+afterwards in a separate process (start_report_page_job) or when it is first opened (render_report_page).
+
+python -m housing.components.report_page <report_page_file_path>
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+from constant import ROOT_DIR
+from housing.exception import CustomException
+from housing.logger import logging
+from housing.utilities.util import make_directories, get_dir, check_dir_exists, read_data_frame
+
+REPORT_PAGE_JOB_FILE_SUFFIX = ".job.json"
+REPORT_PAGE_LOCK_FILE_SUFFIX = ".lock"
+# a running job older than this is taken over even when its process still exists (pid reuse, hung render)
+REPORT_PAGE_STALE_SECONDS = 3600
+REPORT_PAGE_PENDING = "pending"
+REPORT_PAGE_RUNNING = "running"
+REPORT_PAGE_DONE = "done"
+REPORT_PAGE_FAILED = "failed"
+REPORT_PAGE_PLACEHOLDER = """<html>
+<head><meta http-equiv="refresh" content="10"></head>
+<body><p>Data drift report page is not rendered yet (status: {status}).</p></body>
+</html>
+"""
+
+
+def get_report_page_job_file_path(report_page_file_path: str) -> str:
+    return f"{report_page_file_path}{REPORT_PAGE_JOB_FILE_SUFFIX}"
+
+
+def read_report_page_job(report_page_file_path: str):
+    job_file_path = get_report_page_job_file_path(report_page_file_path)
+    if not check_dir_exists(job_file_path):
+        return None
+    with open(job_file_path) as job_file:
+        return json.load(job_file)
+
+
+def write_report_page_job(report_page_file_path: str, job: dict):
+    job_file_path = get_report_page_job_file_path(report_page_file_path)
+    with open(f"{job_file_path}.tmp", "w") as job_file:
+        json.dump(job, job_file, indent=4)
+    os.replace(f"{job_file_path}.tmp", job_file_path)
+
+
+def write_report_page_placeholder(report_page_file_path: str, status: str):
+    with open(f"{report_page_file_path}.tmp", "w") as page_file:
+        page_file.write(REPORT_PAGE_PLACEHOLDER.format(status=status))
+    os.replace(f"{report_page_file_path}.tmp", report_page_file_path)
+
+
+def create_report_page_job(report_page_file_path: str, train_file_path: str, test_file_path: str):
+    """
+    Records what the page is rendered from and writes a placeholder page, so the artifact path exists.
+    """
+    try:
+        make_directories(get_dir(report_page_file_path))
+        write_report_page_job(report_page_file_path, {
+            "status": REPORT_PAGE_PENDING,
+            "train_file_path": train_file_path,
+            "test_file_path": test_file_path,
+            "created_time": time.time(),
+            "seconds": None,
+            "error": None,
+        })
+        write_report_page_placeholder(report_page_file_path, REPORT_PAGE_PENDING)
+        logging.info(f"Report page job created: [{get_report_page_job_file_path(report_page_file_path)}]")
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+def get_report_page_status(report_page_file_path: str):
+    """
+    Status of the page job; pages rendered inline have no job and are done when they exist.
+    """
+    job = read_report_page_job(report_page_file_path)
+    if job is not None:
+        return job["status"]
+    return REPORT_PAGE_DONE if check_dir_exists(report_page_file_path) else None
+
+
+def get_report_page_lock_file_path(report_page_file_path: str) -> str:
+    return f"{report_page_file_path}{REPORT_PAGE_LOCK_FILE_SUFFIX}"
+
+
+def is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def is_report_page_lock_stale(lock: dict) -> bool:
+    return not is_process_alive(lock["pid"]) or time.time() - lock["start_time"] > REPORT_PAGE_STALE_SECONDS
+
+
+def claim_report_page(report_page_file_path: str):
+    """
+    Creates the lock file of the page with O_EXCL, so exactly one process renders it, and returns the lock
+    (pid and start time of the claiming process). Returns None when a live process holds the lock.
+    A lock left by a dead process, or older than REPORT_PAGE_STALE_SECONDS, is renamed away and claimed again.
+    """
+    lock_file_path = get_report_page_lock_file_path(report_page_file_path)
+    lock = {"pid": os.getpid(), "start_time": time.time()}
+    for _ in range(2):
+        try:
+            lock_fd = os.open(lock_file_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            # the rename is atomic, so only one process takes a given stale lock over
+            taken_file_path = f"{lock_file_path}.{os.getpid()}"
+            try:
+                os.rename(lock_file_path, taken_file_path)
+                with open(taken_file_path) as lock_file:
+                    taken_lock = json.load(lock_file)
+            except (FileNotFoundError, ValueError):
+                continue
+            if not is_report_page_lock_stale(taken_lock):
+                os.replace(taken_file_path, lock_file_path)
+                return None
+            logging.info(f"Report page [{report_page_file_path}] lock of process [{taken_lock['pid']}] is stale, "
+                         f"claiming it again.")
+            os.remove(taken_file_path)
+            continue
+        with os.fdopen(lock_fd, "w") as lock_file:
+            json.dump(lock, lock_file)
+        return lock
+    return None
+
+
+def release_report_page(report_page_file_path: str):
+    lock_file_path = get_report_page_lock_file_path(report_page_file_path)
+    if check_dir_exists(lock_file_path):
+        os.remove(lock_file_path)
+
+
+def save_data_drift_report_page(report_page_file_path: str, train_df, test_df):
+    from evidently.dashboard import Dashboard
+    from evidently.dashboard.tabs import DataDriftTab
+
+    dashboard = Dashboard(tabs=[DataDriftTab()])
+    dashboard.calculate(train_df, test_df)
+    make_directories(get_dir(report_page_file_path))
+    # rendered next to the page and moved over it, so a reader never sees a half written page
+    tmp_file_path = f"{report_page_file_path}.rendering.{os.getpid()}.html"
+    dashboard.save(tmp_file_path)
+    os.replace(tmp_file_path, report_page_file_path)
+
+
+def render_report_page(report_page_file_path: str) -> str:
+    """
+    Renders a pending page job, or a running one whose process is gone, and returns the job status.
+    A job another live process has claimed is left alone.
+    """
+    try:
+        job = read_report_page_job(report_page_file_path)
+        if job is None or job["status"] not in [REPORT_PAGE_PENDING, REPORT_PAGE_RUNNING]:
+            return get_report_page_status(report_page_file_path)
+        lock = claim_report_page(report_page_file_path)
+        if lock is None:
+            return REPORT_PAGE_RUNNING
+        try:
+            # re-read under the lock, the page may have been rendered since the first read
+            job = read_report_page_job(report_page_file_path)
+            if job["status"] not in [REPORT_PAGE_PENDING, REPORT_PAGE_RUNNING]:
+                return job["status"]
+            job.update(status=REPORT_PAGE_RUNNING, pid=lock["pid"], start_time=lock["start_time"])
+            write_report_page_job(report_page_file_path, job)
+            return run_report_page_job(report_page_file_path, job)
+        finally:
+            release_report_page(report_page_file_path)
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+def run_report_page_job(report_page_file_path: str, job: dict) -> str:
+    start_time = time.perf_counter()
+    try:
+        save_data_drift_report_page(report_page_file_path, read_data_frame(job["train_file_path"]),
+                                    read_data_frame(job["test_file_path"]))
+        job["status"] = REPORT_PAGE_DONE
+    except Exception as e:
+        logging.info(f"Report page [{report_page_file_path}] could not be rendered: {e}")
+        job["status"], job["error"] = REPORT_PAGE_FAILED, str(e)
+        write_report_page_placeholder(report_page_file_path, REPORT_PAGE_FAILED)
+    job["seconds"] = round(time.perf_counter() - start_time, 2)
+    write_report_page_job(report_page_file_path, job)
+    logging.info(f"Report page [{report_page_file_path}] {job['status']} in [{job['seconds']}] seconds.")
+    return job["status"]
+
+
+def start_report_page_job(report_page_file_path: str):
+    """
+    Renders a pending page in a separate, detached process; the caller does not wait for it.
+    """
+    try:
+        if get_report_page_status(report_page_file_path) != REPORT_PAGE_PENDING:
+            return None
+        process = subprocess.Popen([sys.executable, "-m", "housing.components.report_page", report_page_file_path],
+                                   cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                   start_new_session=True)
+        logging.info(f"Report page of [{report_page_file_path}] rendering in process [{process.pid}]")
+        return process
+    except Exception as e:
+        raise CustomException(e, sys) from e
+
+
+if __name__ == "__main__":
+    render_report_page(sys.argv[1])
@@ -0,0 +1,157 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+from housing.exception import CustomException
+from housing.logger import logging
+from housing.utilities.util import iter_data_frame_chunks
+
+MAX_FAILED_ROWS = 20
+SCHEMA_CHUNK_SIZE = 100000
+
+COLUMN_PRESENCE_RULE = "column_presence"
+DTYPE_RULE = "dtype"
+NULL_RATIO_RULE = "null_ratio"
+RANGE_RULE = "range"
+DOMAIN_RULE = "domain"
+
+
+class SchemaValidator:
+    """
+    Checks a data file against schema.json one chunk at a time, so memory does not grow with the file:
+    column_presence: every schema column is in the file and no other column is
+    dtype: values of numerical columns can be read as numbers (whole numbers for int types)
+    null_ratio: share of missing values is at most schema["max_null_ratio"][column]
+    range: numbers are within schema["value_range"][column] ([min, max], null for no bound)
+    domain: values of columns with schema["domain_value"] are one of them
+    Each rule keeps the exact number of failing rows and at most max_failed_rows examples
+    (row number in the file and raw value).
+    """
+
+    def __init__(self, schema: dict, max_failed_rows: int = MAX_FAILED_ROWS):
+        self.column_types = schema["columns"]
+        self.domain_values = schema.get("domain_value", {})
+        self.value_ranges = schema.get("value_range", {})
+        self.max_null_ratios = schema.get("max_null_ratio", {})
+        self.max_failed_rows = max_failed_rows
+        self.reset()
+
+    def reset(self):
+        self.n_rows = 0
+        self.n_chunks = 0
+        self.columns = None
+        self.rules = {}
+        self.column_stats = {column: {"type": column_type, "n_null": 0, "min": None, "max": None}
+                             for column, column_type in self.column_types.items()}
+
+    def get_rule(self, rule_name: str, column: str) -> dict:
+        key = (rule_name, column)
+        if key not in self.rules:
+            self.rules[key] = {"rule": rule_name, "column": column, "n_failed": 0, "failed_rows": [],
+                               "failed_values": []}
+        return self.rules[key]
+
+    def add_failures(self, rule_name: str, column: str, failed_mask: np.ndarray, raw_values: pd.Series = None):
+        rule = self.get_rule(rule_name, column)
+        failed_positions = np.flatnonzero(failed_mask)
+        rule["n_failed"] += len(failed_positions)
+        n_examples = self.max_failed_rows - len(rule["failed_rows"])
+        if n_examples > 0 and len(failed_positions) > 0:
+            example_positions = failed_positions[:n_examples]
+            rule["failed_rows"].extend((example_positions + self.n_rows).tolist())
+            if raw_values is not None:
+                rule["failed_values"].extend(np.asarray(raw_values, dtype=object)[example_positions].tolist())
+
+    def check_columns(self, columns: list):
+        self.columns = [column for column in self.column_types if column in columns]
+        rule = self.get_rule(COLUMN_PRESENCE_RULE, None)
+        rule["missing_columns"] = [column for column in self.column_types if column not in columns]
+        rule["unknown_columns"] = [column for column in columns if column not in self.column_types]
+        rule["n_failed"] = len(rule["missing_columns"]) + len(rule["unknown_columns"])
+
+    def validate_numerical_column(self, column: str, raw_values: pd.Series, is_null: np.ndarray):
+        values = pd.to_numeric(raw_values, errors="coerce").to_numpy(dtype=np.float64)
+        is_number = ~np.isnan(values)
+        is_bad_number = ~is_number & ~is_null
+        if self.column_types[column].startswith("int"):
+            is_bad_number |= is_number & (values != np.floor(values))
+        self.add_failures(DTYPE_RULE, column, is_bad_number, raw_values)
+
+        if is_number.any():
+            column_stats = self.column_stats[column]
+            chunk_min, chunk_max = float(np.nanmin(values)), float(np.nanmax(values))
+            column_stats["min"] = chunk_min if column_stats["min"] is None else min(column_stats["min"], chunk_min)
+            column_stats["max"] = chunk_max if column_stats["max"] is None else max(column_stats["max"], chunk_max)
+
+        if column in self.value_ranges:
+            min_value, max_value = self.value_ranges[column]
+            out_of_range = np.zeros(len(values), dtype=bool)
+            if min_value is not None:
+                out_of_range |= is_number & (values < min_value)
+            if max_value is not None:
+                out_of_range |= is_number & (values > max_value)
+            self.add_failures(RANGE_RULE, column, out_of_range, raw_values)
+
+    def validate_chunk(self, chunk: pd.DataFrame):
+        if self.columns is None:
+            self.check_columns(list(chunk.columns))
+        for column in self.columns:
+            raw_values = chunk[column]
+            is_null = raw_values.isna().to_numpy()
+            self.column_stats[column]["n_null"] += int(is_null.sum())
+            if column in self.max_null_ratios:
+                self.add_failures(NULL_RATIO_RULE, column, is_null)
+            if self.column_types[column] != "category":
+                self.validate_numerical_column(column, raw_values, is_null)
+            if column in self.domain_values:
+                outside_domain = ~is_null & ~raw_values.astype(object).isin(self.domain_values[column]).to_numpy()
+                self.add_failures(DOMAIN_RULE, column, outside_domain, raw_values)
+        self.n_rows += len(chunk)
+        self.n_chunks += 1
+
+    def is_rule_passed(self, rule: dict) -> bool:
+        if rule["rule"] == NULL_RATIO_RULE:
+            # null rows are only a failure above the allowed ratio
+            return rule["n_failed"] <= self.max_null_ratios[rule["column"]] * max(self.n_rows, 1)
+        return rule["n_failed"] == 0
+
+    def get_report(self) -> dict:
+        """
+        Machine readable report: is_valid, row/chunk counts, per column null ratio and min/max,
+        and one entry per rule and column with its failing row count and examples.
+        """
+        rules = []
+        for rule in self.rules.values():
+            rule = dict(rule, passed=self.is_rule_passed(rule))
+            if rule["rule"] == NULL_RATIO_RULE:
+                rule["null_ratio"] = rule["n_failed"] / max(self.n_rows, 1)
+                rule["max_null_ratio"] = self.max_null_ratios[rule["column"]]
+            rules.append(rule)
+        columns = {column: dict(column_stats, null_ratio=column_stats["n_null"] / max(self.n_rows, 1))
+                   for column, column_stats in self.column_stats.items()}
+        return {
+            "is_valid": self.columns is not None and all(rule["passed"] for rule in rules),
+            "n_rows": self.n_rows,
+            "n_chunks": self.n_chunks,
+            "columns": columns,
+            "rules": rules,
+        }
+
+    def validate_file(self, file_path: str, chunk_size: int = SCHEMA_CHUNK_SIZE) -> dict:
+        """
+        Validates the file in chunks of chunk_size rows and returns the report.
+        csv values are read as strings, so the dtype rule sees what is in the file.
+        """
+        try:
+            self.reset()
+            for chunk in iter_data_frame_chunks(file_path, chunk_size, csv_dtype=str):
+                self.validate_chunk(chunk)
+            report = dict(self.get_report(), file_path=file_path)
+            for rule in report["rules"]:
+                if not rule["passed"]:
+                    logging.info(f"Schema rule [{rule['rule']}] failed for column [{rule['column']}] of "
+                                 f"[{file_path}]: [{rule['n_failed']}] rows, e.g. rows {rule['failed_rows'][:5]}")
+            return report
+        except Exception as e:
+            raise CustomException(e, sys) from e
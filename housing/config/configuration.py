@@ -5,6 +5,7 @@ from entity.data_validation_entity import DataValidationEntity
 from entity.model_evaluation_entity import ModelEvaluationEntity
 from entity.model_pusher_entity import ModelPusherEntity
 from entity.model_trainer_entity import ModelTrainerEntity
+from entity.prediction_entity import PredictionEntity
 from entity.training_pipeline_entity import TrainingPipelineEntity
 from housing.utilities.util import get_dictionary_from_json, get_file_join
 from housing.exception import CustomException
@@ -31,7 +32,11 @@ class Configuration:
             artifact_dir = get_file_join(ROOT_DIR,
                                          training_pipeline_config[PIPELINE_NAME],
                                          training_pipeline_config[ARTIFACT_DIR])
-            training_pipeline_config = TrainingPipelineEntity(artifact_dir=artifact_dir)
+            stage_cache_dir = None
+            if training_pipeline_config.get(STAGE_CACHE_DIR_KEY):
+                stage_cache_dir = get_file_join(artifact_dir, training_pipeline_config[STAGE_CACHE_DIR_KEY])
+            training_pipeline_config = TrainingPipelineEntity(artifact_dir=artifact_dir,
+                                                              stage_cache_dir=stage_cache_dir)
             logging.info(f"Training pipeline config: {training_pipeline_config}")
             return training_pipeline_config
         except Exception as e:
@@ -68,12 +73,32 @@ class Configuration:
                 ingested_data_dir,
                 data_ingestion_info[DATA_INGESTION_TEST_DIR_KEY]
             )
+            # dataset cache is shared by every run, so it is not inside the time stamped dir
+            dataset_cache_dir = None
+            if data_ingestion_info.get(DATA_INGESTION_DATASET_CACHE_DIR_KEY):
+                dataset_cache_dir = get_file_join(artifact_dir, DATA_INGESTION_ARTIFACT_DIR,
+                                                  data_ingestion_info[DATA_INGESTION_DATASET_CACHE_DIR_KEY])
+            # incremental store keeps growing across runs, so it is not inside the time stamped dir either
+            incremental_dir = None
+            if data_ingestion_info.get(DATA_INGESTION_INCREMENTAL_DIR_KEY):
+                incremental_dir = get_file_join(artifact_dir, DATA_INGESTION_ARTIFACT_DIR,
+                                                data_ingestion_info[DATA_INGESTION_INCREMENTAL_DIR_KEY])
             data_ingestion_config = DataIngestionEntity(
                 dataset_download_url=dataset_download_url,
                 tgz_download_dir=tgz_download_dir,
                 raw_data_dir=raw_data_dir,
                 ingested_train_dir=ingested_train_dir,
-                ingested_test_dir=ingested_test_dir
+                ingested_test_dir=ingested_test_dir,
+                dataset_cache_dir=dataset_cache_dir,
+                dataset_sha256=data_ingestion_info.get(DATA_INGESTION_DATASET_SHA256_KEY),
+                stream_from_archive=data_ingestion_info.get(DATA_INGESTION_STREAM_FROM_ARCHIVE_KEY, False),
+                read_chunk_size=data_ingestion_info.get(DATA_INGESTION_READ_CHUNK_SIZE_KEY, 100000),
+                streaming_split=data_ingestion_info.get(DATA_INGESTION_STREAMING_SPLIT_KEY, False),
+                artifact_format=data_ingestion_info.get(DATA_INGESTION_ARTIFACT_FORMAT_KEY, "csv"),
+                schema_file_path=self.get_schema_file_path(),
+                shard_pattern=data_ingestion_info.get(DATA_INGESTION_SHARD_PATTERN_KEY),
+                shard_n_jobs=data_ingestion_info.get(DATA_INGESTION_SHARD_N_JOBS_KEY, -1),
+                incremental_dir=incremental_dir
             )
             logging.info(f"Data Ingestion config: {data_ingestion_config}")
             return data_ingestion_config
@@ -81,6 +106,13 @@ class Configuration:
         except Exception as e:
             raise CustomException(e, sys) from e
 
+    def get_schema_file_path(self) -> str:
+        data_validation_config = self.config_info_dict[DATA_VALIDATION_CONFIG_KEY]
+        return get_file_join(ROOT_DIR,
+                             data_validation_config[DATA_VALIDATION_SCHEMA_DIR_KEY],
+                             data_validation_config[DATA_VALIDATION_SCHEMA_FILE_NAME_KEY]
+                             )
+
     def get_data_validation_config(self) -> DataValidationEntity:
         try:
             artifact_dir = self.training_pipeline_config.artifact_dir
@@ -102,10 +134,28 @@ class Configuration:
 
                                                   )
 
+            reference_profile_file_path = None
+            if data_validation_config.get(DATA_VALIDATION_REFERENCE_PROFILE_FILE_NAME_KEY):
+                reference_profile_file_path = get_file_join(
+                    data_validation_artifact_dir, data_validation_config[DATA_VALIDATION_REFERENCE_PROFILE_FILE_NAME_KEY])
+
+            schema_report_file_path = get_file_join(
+                data_validation_artifact_dir,
+                data_validation_config.get(DATA_VALIDATION_SCHEMA_REPORT_FILE_NAME_KEY, "schema_report.json"))
+
             data_validation_config = DataValidationEntity(
                 schema_file_path=schema_file_path,
                 report_file_path=report_file_path,
                 report_page_file_path=report_page_file_path,
+                drift_engine=data_validation_config.get(DATA_VALIDATION_DRIFT_ENGINE_KEY, "evidently"),
+                numerical_stattest=data_validation_config.get(DATA_VALIDATION_NUMERICAL_STATTEST_KEY, "psi"),
+                reference_profile_file_path=reference_profile_file_path,
+                drift_sample_size=data_validation_config.get(DATA_VALIDATION_DRIFT_SAMPLE_SIZE_KEY),
+                drift_n_jobs=data_validation_config.get(DATA_VALIDATION_DRIFT_N_JOBS_KEY, 1),
+                report_page_mode=data_validation_config.get(DATA_VALIDATION_REPORT_PAGE_MODE_KEY, "inline"),
+                schema_report_file_path=schema_report_file_path,
+                schema_chunk_size=data_validation_config.get(DATA_VALIDATION_SCHEMA_CHUNK_SIZE_KEY, 100000),
+                max_failed_rows=data_validation_config.get(DATA_VALIDATION_MAX_FAILED_ROWS_KEY, 20)
             )
             logging.info(f"Data Validation config: {data_validation_config}")
 
@@ -180,10 +230,18 @@ class Configuration:
 
             base_accuracy = model_trainer_config_info[MODEL_TRAINER_BASE_ACCURACY_KEY]
 
+            # fit cache is shared by every run, so it is not inside the time stamped dir
+            fit_cache_dir = None
+            if model_trainer_config_info.get(MODEL_TRAINER_FIT_CACHE_DIR_KEY):
+                fit_cache_dir = get_file_join(artifact_dir, MODEL_TRAINER_ARTIFACT_DIR,
+                                              model_trainer_config_info[MODEL_TRAINER_FIT_CACHE_DIR_KEY])
+
             model_trainer_config = ModelTrainerEntity(
                 trained_model_file_path=trained_model_file_path,
                 base_accuracy=base_accuracy,
-                model_config_file_path=model_config_file_path
+                model_config_file_path=model_config_file_path,
+                fit_cache_dir=fit_cache_dir,
+                fit_cache_max_size_mb=model_trainer_config_info.get(MODEL_TRAINER_FIT_CACHE_MAX_SIZE_MB_KEY, 512)
             )
             logging.info(f"Model trainer config: {model_trainer_config}")
             return model_trainer_config
@@ -220,3 +278,17 @@ class Configuration:
 
         except Exception as e:
             raise CustomException(e, sys) from e
+
+    def get_prediction_config(self) -> PredictionEntity:
+        try:
+            prediction_config_info = self.config_info_dict.get(PREDICTION_CONFIG_KEY, {})
+            prediction_config = PredictionEntity(
+                micro_batching=prediction_config_info.get(PREDICTION_MICRO_BATCHING_KEY, False),
+                max_batch_size=prediction_config_info.get(PREDICTION_MAX_BATCH_SIZE_KEY, 256),
+                max_wait_ms=prediction_config_info.get(PREDICTION_MAX_WAIT_MS_KEY, 5),
+                request_timeout_ms=prediction_config_info.get(PREDICTION_REQUEST_TIMEOUT_MS_KEY, 2000)
+            )
+            logging.info(f"Prediction config: {prediction_config}")
+            return prediction_config
+        except Exception as e:
+            raise CustomException(e, sys) from e
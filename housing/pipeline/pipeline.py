@@ -1,4 +1,5 @@
 import sys
+import time
 import uuid
 from collections import namedtuple
 from datetime import datetime
@@ -6,7 +7,8 @@ from threading import Thread
 
 import pandas as pd
 
-from constant import EXPERIMENT_DIR_NAME, EXPERIMENT_FILE_NAME
+from constant import EXPERIMENT_DIR_NAME, EXPERIMENT_FILE_NAME, DATA_INGESTION_CONFIG, DATA_VALIDATION_CONFIG_KEY, \
+    DATA_TRANSFORMATION_CONFIG_KEY, MODEL_TRAINER_CONFIG_KEY
 from entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact, DataTransformationArtifact, \
     ModelTrainerArtifact, ModelEvaluationArtifact, ModelPusherArtifact
 from housing.components.data_ingestion import DataIngestion
@@ -15,18 +17,21 @@ from housing.components.data_validation import DataValidation
 from housing.components.model_evaluation import ModelEvaluation
 from housing.components.model_pusher import ModelPusher
 from housing.components.model_trainer import ModelTrainer
+from housing.components.report_page import start_report_page_job, get_report_page_status
 from housing.config.configuration import Configuration
 from housing.exception import CustomException
 from housing.logger import logging
+from housing.pipeline.stage_cache import StageCache, STAGE_CACHED, STAGE_RECOMPUTED
 from housing.utilities.util import make_directories, get_file_join, check_dir_exists, get_base_file_name, get_dir
 
 Experiment = namedtuple("Experiment", ["experiment_id", "initialization_timestamp", "artifact_time_stamp",
                                        "running_status", "start_time", "stop_time", "execution_time", "message",
-                                       "experiment_file_path", "accuracy", "is_model_accepted"])
+                                       "experiment_file_path", "accuracy", "is_model_accepted",
+                                       "fit_cache_summary", "stage_status", "time_saved", "report_page_file_path"])
 
 
 class Pipeline(Thread):
-    experiment: Experiment = Experiment(*([None] * 11))
+    experiment: Experiment = Experiment(*([None] * len(Experiment._fields)))
     experiment_file_path = None
 
     def __init__(self, config: Configuration) -> None:
@@ -36,21 +41,70 @@ class Pipeline(Thread):
                                                           EXPERIMENT_DIR_NAME, EXPERIMENT_FILE_NAME)
             super().__init__(daemon=False, name="pipeline")
             self.config = config
+            stage_cache_dir = config.training_pipeline_config.stage_cache_dir
+            self.stage_cache = StageCache(stage_cache_dir) if stage_cache_dir is not None else None
+            self.stage_status = {}
+            self.time_saved = 0.0
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def run_stage(self, stage_name: str, artifact_class, initiate_stage, *stage_inputs):
+        """
+        Runs initiate_stage unless the stage cache has an artifact for the same stage_inputs
+        (config slice and upstream artifacts / files, compared by content).
+        Records whether the stage was cached or recomputed and the time saved.
+        """
+        try:
+            key = None
+            if self.stage_cache is not None:
+                key = StageCache.get_key(stage_name, *stage_inputs)
+                cached_stage = self.stage_cache.get(stage_name, key, artifact_class)
+                if cached_stage is not None:
+                    artifact, seconds = cached_stage
+                    logging.info(f"Stage [{stage_name}] reused from cache, saved [{seconds:.2f}] seconds: {artifact}")
+                    self.stage_status[stage_name] = STAGE_CACHED
+                    self.time_saved += seconds
+                    return artifact
+
+            start_time = time.perf_counter()
+            artifact = initiate_stage()
+            seconds = time.perf_counter() - start_time
+            self.stage_status[stage_name] = STAGE_RECOMPUTED
+            if key is not None:
+                self.stage_cache.set(stage_name, key, artifact, seconds)
+            return artifact
         except Exception as e:
             raise CustomException(e, sys) from e
 
     def start_data_ingestion(self) -> DataIngestionArtifact:
         try:
-            data_ingestion = DataIngestion(self.config.get_data_ingestion_config())
-            return data_ingestion.initiate_data_ingestion()
+            data_ingestion_config = self.config.get_data_ingestion_config()
+            if data_ingestion_config.incremental_dir is not None:
+                # incremental ingestion picks up new rows of the same feed, so it is never taken from the stage cache
+                self.stage_status["data_ingestion"] = STAGE_RECOMPUTED
+                return DataIngestion(data_ingestion_config).initiate_data_ingestion()
+            data_ingestion = DataIngestion(data_ingestion_config)
+            return self.run_stage(
+                "data_ingestion", DataIngestionArtifact,
+                data_ingestion.initiate_data_ingestion,
+                self.config.config_info_dict[DATA_INGESTION_CONFIG],
+                # new upstream data changes the key, so it is ingested instead of taken from the cache
+                data_ingestion.get_dataset_version()
+            )
         except Exception as e:
             raise CustomException(e, sys) from e
 
     def start_data_validation(self, data_ingestion_artifact: DataIngestionArtifact) \
             -> DataValidationArtifact:
         try:
-            data_validation = DataValidation(self.config.get_data_validation_config(), data_ingestion_artifact)
-            return data_validation.initiate_data_validation()
+            data_validation_config = self.config.get_data_validation_config()
+            return self.run_stage(
+                "data_validation", DataValidationArtifact,
+                lambda: DataValidation(data_validation_config, data_ingestion_artifact).initiate_data_validation(),
+                self.config.config_info_dict[DATA_VALIDATION_CONFIG_KEY],
+                data_validation_config.schema_file_path,
+                data_ingestion_artifact
+            )
         except Exception as e:
             raise CustomException(e, sys) from e
 
@@ -59,21 +113,32 @@ class Pipeline(Thread):
                                   data_validation_artifact: DataValidationArtifact
                                   ) -> DataTransformationArtifact:
         try:
-            data_transformation = DataTransformation(
-                self.config.get_data_transformation_config(),
+            data_transformation_config = self.config.get_data_transformation_config()
+            return self.run_stage(
+                "data_transformation", DataTransformationArtifact,
+                lambda: DataTransformation(
+                    data_transformation_config,
+                    data_ingestion_artifact,
+                    data_validation_artifact
+                ).initiate_data_transformation(),
+                self.config.config_info_dict[DATA_TRANSFORMATION_CONFIG_KEY],
                 data_ingestion_artifact,
-                data_validation_artifact
+                # the report page is not read by the transformation and may still be rendering
+                data_validation_artifact._replace(report_page_file_path=None)
             )
-            return data_transformation.initiate_data_transformation()
         except Exception as e:
             raise CustomException(e, sys)
 
     def start_model_trainer(self, data_transformation_artifact: DataTransformationArtifact) -> ModelTrainerArtifact:
         try:
-            model_trainer = ModelTrainer(self.config.get_model_trainer_config(),
-                                         data_transformation_artifact
-                                         )
-            return model_trainer.initiate_model_trainer()
+            model_trainer_config = self.config.get_model_trainer_config()
+            return self.run_stage(
+                "model_trainer", ModelTrainerArtifact,
+                lambda: ModelTrainer(model_trainer_config, data_transformation_artifact).initiate_model_trainer(),
+                self.config.config_info_dict[MODEL_TRAINER_CONFIG_KEY],
+                model_trainer_config.model_config_file_path,
+                data_transformation_artifact
+            )
         except Exception as e:
             raise CustomException(e, sys) from e
 
@@ -86,6 +151,8 @@ class Pipeline(Thread):
                 data_ingestion_artifact,
                 data_validation_artifact,
                 model_trainer_artifact)
+            # evaluation depends on the best model so far, so it is never taken from the stage cache
+            self.stage_status["model_evaluation"] = STAGE_RECOMPUTED
             return model_eval.initiate_model_evaluation()
         except Exception as e:
             raise CustomException(e, sys) from e
@@ -96,6 +163,7 @@ class Pipeline(Thread):
                 self.config.get_model_pusher_config(),
                 model_eval_artifact
             )
+            self.stage_status["model_pusher"] = STAGE_RECOMPUTED
             return model_pusher.initiate_model_pusher()
         except Exception as e:
             raise CustomException(e, sys) from e
@@ -109,6 +177,7 @@ class Pipeline(Thread):
             logging.info("Pipeline starting.")
 
             experiment_id = str(uuid.uuid4())
+            self.stage_status, self.time_saved = {}, 0.0
 
             Pipeline.experiment = Experiment(experiment_id=experiment_id,
                                              initialization_timestamp=self.config.current_time_stamp,
@@ -121,6 +190,10 @@ class Pipeline(Thread):
                                              is_model_accepted=None,
                                              message="Pipeline has been started.",
                                              accuracy=None,
+                                             fit_cache_summary=None,
+                                             stage_status=None,
+                                             time_saved=None,
+                                             report_page_file_path=None
                                              )
             logging.info(f"Pipeline experiment: {Pipeline.experiment}")
 
@@ -128,6 +201,9 @@ class Pipeline(Thread):
 
             data_ingestion_artifact = self.start_data_ingestion()
             data_validation_artifact = self.start_data_validation(data_ingestion_artifact)
+            if self.config.get_data_validation_config().report_page_mode == "deferred":
+                # rendered in a separate process, so it is not part of the pipeline wall time
+                start_report_page_job(data_validation_artifact.report_page_file_path)
             data_transformation_artifact = self.start_data_transformation(
                 data_ingestion_artifact=data_ingestion_artifact,
                 data_validation_artifact=data_validation_artifact
@@ -156,7 +232,11 @@ class Pipeline(Thread):
                                              message="Pipeline has been completed.",
                                              experiment_file_path=Pipeline.experiment_file_path,
                                              is_model_accepted=model_evaluation_artifact.is_model_accepted,
-                                             accuracy=model_trainer_artifact.model_accuracy
+                                             accuracy=model_trainer_artifact.model_accuracy,
+                                             fit_cache_summary=model_trainer_artifact.fit_cache_summary,
+                                             stage_status=self.stage_status,
+                                             time_saved=round(self.time_saved, 2),
+                                             report_page_file_path=data_validation_artifact.report_page_file_path
                                              )
             logging.info(f"Pipeline experiment: {Pipeline.experiment}")
             self.save_experiment()
@@ -184,7 +264,15 @@ class Pipeline(Thread):
 
                 make_directories(get_dir(Pipeline.experiment_file_path))
                 if check_dir_exists(Pipeline.experiment_file_path):
-                    experiment_report.to_csv(Pipeline.experiment_file_path, index=False, header=False, mode="a")
+                    existing_columns = list(pd.read_csv(Pipeline.experiment_file_path, nrows=0).columns)
+                    if existing_columns == list(experiment_report.columns):
+                        experiment_report.to_csv(Pipeline.experiment_file_path, index=False, header=False, mode="a")
+                    else:
+                        # experiment columns changed since the file was created, rewrite it with the new header
+                        experiment_history = pd.read_csv(Pipeline.experiment_file_path)
+                        pd.concat([experiment_history, experiment_report], ignore_index=True) \
+                            .reindex(columns=experiment_report.columns) \
+                            .to_csv(Pipeline.experiment_file_path, mode="w", index=False, header=True)
                 else:
                     experiment_report.to_csv(Pipeline.experiment_file_path, mode="w", index=False, header=True)
             else:
@@ -198,7 +286,12 @@ class Pipeline(Thread):
             if check_dir_exists(Pipeline.experiment_file_path):
                 df = pd.read_csv(Pipeline.experiment_file_path)
                 limit = -1 * int(limit)
-                return df[limit:].drop(columns=["experiment_file_path", "initialization_timestamp"], axis=1)
+                df = df[limit:].copy()
+                if "report_page_file_path" in df.columns:
+                    # the page may be rendered after the experiment was saved, so its status is read live
+                    df["report_page_status"] = [get_report_page_status(file_path) if isinstance(file_path, str)
+                                                else None for file_path in df.pop("report_page_file_path")]
+                return df.drop(columns=["experiment_file_path", "initialization_timestamp"], axis=1)
             else:
                 return pd.DataFrame()
         except Exception as e:
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import sys
+
+from housing.exception import CustomException
+from housing.logger import logging
+from housing.utilities.util import make_directories, get_file_join, check_dir_exists, get_base_file_name
+
+STAGE_CACHED = "cached"
+STAGE_RECOMPUTED = "recomputed"
+
+FILE_FINGERPRINTS = {}
+
+
+def get_file_fingerprint(file_path: str) -> str:
+    """
+    sha256 of the file content, remembered per (path, size, modified time) within the process.
+    """
+    stat = os.stat(file_path)
+    memo_key = (file_path, stat.st_size, stat.st_mtime_ns)
+    if memo_key not in FILE_FINGERPRINTS:
+        file_hash = hashlib.sha256()
+        with open(file_path, "rb") as file_obj:
+            for block in iter(lambda: file_obj.read(2 ** 20), b""):
+                file_hash.update(block)
+        FILE_FINGERPRINTS[memo_key] = file_hash.hexdigest()
+    return FILE_FINGERPRINTS[memo_key]
+
+
+def is_local_path(value) -> bool:
+    """
+    Absolute paths and existing relative paths; urls (e.g. dataset_download_url) are not paths.
+    """
+    if not isinstance(value, str) or "://" in value:
+        return False
+    return os.path.isabs(value) or os.path.exists(value)
+
+
+def get_value_fingerprint(value):
+    """
+    Local paths are replaced by the content of what they point to, so an artifact recomputed into a
+    new time stamped dir with the same content has the same fingerprint. Other values, urls
+    included, are kept as they are.
+    """
+    if isinstance(value, (tuple, list)):
+        return [get_value_fingerprint(item) for item in value]
+    if isinstance(value, dict):
+        return {key: get_value_fingerprint(item) for key, item in value.items()}
+    if is_local_path(value):
+        if os.path.isfile(value):
+            return ["file", get_file_fingerprint(value)]
+        if os.path.isdir(value):
+            return ["dir", {file_name: get_value_fingerprint(get_file_join(value, file_name))
+                            for file_name in sorted(os.listdir(value))}]
+        return ["missing", get_base_file_name(value)]
+    return value
+
+
+def is_artifact_available(value) -> bool:
+    """
+    Every absolute path in a cached artifact has to exist for the artifact to be reused.
+    """
+    if isinstance(value, (tuple, list)):
+        return all(is_artifact_available(item) for item in value)
+    if isinstance(value, dict):
+        return all(is_artifact_available(item) for item in value.values())
+    if isinstance(value, str) and os.path.isabs(value):
+        return check_dir_exists(value)
+    return True
+
+
+class StageCache:
+    """
+    Remembers the artifact of each pipeline stage under a key made of the stage name, its config
+    slice and the content of its inputs (upstream artifacts, schema/model config files).
+    A stage whose key was seen before and whose artifact files still exist is not run again,
+    which also lets a crashed run resume after the last completed stage.
+    """
+
+    def __init__(self, cache_dir: str):
+        try:
+            self.cache_dir = cache_dir
+            make_directories(self.cache_dir)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    @staticmethod
+    def get_key(stage_name: str, *inputs) -> str:
+        key_content = json.dumps([stage_name, get_value_fingerprint(list(inputs))], sort_keys=True, default=str)
+        return hashlib.sha256(key_content.encode()).hexdigest()
+
+    def get_file_path(self, stage_name: str, key: str) -> str:
+        return get_file_join(self.cache_dir, f"{stage_name}_{key}.json")
+
+    def get(self, stage_name: str, key: str, artifact_class):
+        """
+        Returns (artifact, seconds the stage took when it was computed) or None.
+        """
+        try:
+            file_path = self.get_file_path(stage_name, key)
+            if not check_dir_exists(file_path):
+                return None
+            with open(file_path) as cache_file:
+                cache_entry = json.load(cache_file)
+            artifact = artifact_class(**cache_entry["artifact"])
+            if not is_artifact_available(artifact):
+                logging.info(f"Cached artifact of stage [{stage_name}] has missing files, recomputing.")
+                return None
+            return artifact, cache_entry["seconds"]
+        except Exception as e:
+            logging.info(f"Stage cache entry of [{stage_name}] not usable: {e}")
+            return None
+
+    def set(self, stage_name: str, key: str, artifact, seconds: float):
+        try:
+            file_path = self.get_file_path(stage_name, key)
+            with open(f"{file_path}.tmp", "w") as cache_file:
+                json.dump({"stage": stage_name, "artifact": artifact._asdict(), "seconds": seconds}, cache_file,
+                          indent=4, default=str)
+            os.replace(f"{file_path}.tmp", file_path)
+        except Exception as e:
+            raise CustomException(e, sys) from e
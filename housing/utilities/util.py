@@ -63,27 +63,232 @@ def get_filename_from_directory_list(dir_path):
     return os.listdir(dir_path)
 
 
+def get_modified_time_ns(path):
+    return os.stat(path).st_mtime_ns
+
+
 def get_dir(dir_path):
     return os.path.dirname(dir_path)
 
 
+SCHEMAS = {}
+
+
+def get_schema(schema_file_path: str) -> dict:
+    """
+    schema.json content, parsed once per process and again only when the file changes.
+    The returned dict is shared, callers must not modify it.
+    """
+    memo_key = (schema_file_path, get_modified_time_ns(schema_file_path))
+    if memo_key not in SCHEMAS:
+        SCHEMAS[memo_key] = get_dictionary_from_json(schema_file_path)
+    return SCHEMAS[memo_key]
+
+
+def get_schema_dtypes(schema: dict) -> dict:
+    """
+    pandas dtype per schema column: numerical types as given (e.g. float, float32),
+    category as a categorical with the domain_value categories when the schema has them.
+    """
+    dtypes = {}
+    for column, column_type in schema["columns"].items():
+        if column_type == "category":
+            categories = schema.get("domain_value", {}).get(column)
+            dtypes[column] = pd.CategoricalDtype(categories) if categories is not None else "category"
+        else:
+            dtypes[column] = column_type
+    return dtypes
+
+
+DATA_FRAME_FILE_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+
+
+def get_data_frame_file_format(file_path: str) -> str:
+    extension = os.path.splitext(file_path)[1]
+    for file_format, format_extension in DATA_FRAME_FILE_EXTENSIONS.items():
+        if extension == format_extension:
+            return file_format
+    raise Exception(f"Unsupported data file: [{file_path}], expected one of {list(DATA_FRAME_FILE_EXTENSIONS.values())}")
+
+
+def get_file_path_with_format(file_path: str, file_format: str) -> str:
+    if file_format not in DATA_FRAME_FILE_EXTENSIONS:
+        raise Exception(f"Unsupported data file format: [{file_format}]")
+    return f"{os.path.splitext(file_path)[0]}{DATA_FRAME_FILE_EXTENSIONS[file_format]}"
+
+
+def cast_data_frame_to_schema(dataframe: pd.DataFrame, schema_file_path: str) -> pd.DataFrame:
+    """
+    Casts the numerical columns to the type given in schema.json, category columns stay strings.
+    """
+    schema = get_schema(schema_file_path)["columns"]
+    column_types = {column: column_type for column, column_type in schema.items()
+                    if column in dataframe.columns and column_type != "category"}
+    return dataframe.astype(column_types)
+
+
+def read_data_frame(file_path: str) -> pd.DataFrame:
+    """
+    Reads a csv, parquet or feather file, picked by the file extension.
+    """
+    file_format = get_data_frame_file_format(file_path)
+    if file_format == "parquet":
+        return pd.read_parquet(file_path)
+    if file_format == "feather":
+        return pd.read_feather(file_path)
+    return pd.read_csv(file_path)
+
+
+def read_typed_data_frame(file_path: str, dtypes: dict) -> pd.DataFrame:
+    """
+    Reads a csv, parquet or feather file with dtypes (column -> numpy dtype name or "category")
+    applied while parsing, so no untyped copy of the frame is made. Columns not in dtypes are read as is.
+    """
+    file_format = get_data_frame_file_format(file_path)
+    if file_format == "csv":
+        return pd.read_csv(file_path, dtype=dtypes)
+
+    import pyarrow as pa
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(file_path)
+    else:
+        import pyarrow.feather as feather
+        table = feather.read_table(file_path, memory_map=True)
+    columns = []
+    for column_name in table.column_names:
+        column, dtype = table.column(column_name), dtypes.get(column_name)
+        if dtype == "category":
+            if not pa.types.is_dictionary(column.type):
+                column = column.dictionary_encode()
+        elif dtype is not None:
+            column = column.cast(pa.from_numpy_dtype(np.dtype(dtype)))
+        columns.append(column)
+    table = pa.Table.from_arrays(columns, names=table.column_names)
+    return table.to_pandas(self_destruct=True, split_blocks=True)
+
+
+def iter_data_frame_chunks(file_path: str, chunk_size: int, csv_dtype=None):
+    """
+    Yields a csv, parquet or feather file as dataframes of at most chunk_size rows, so files larger
+    than memory can be scanned. csv_dtype is passed to read_csv (e.g. str to keep the raw values).
+    """
+    file_format = get_data_frame_file_format(file_path)
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif file_format == "feather":
+        import pyarrow as pa
+        with pa.memory_map(file_path) as source:
+            reader = pa.ipc.open_file(source)
+            for batch_number in range(reader.num_record_batches):
+                batch = reader.get_batch(batch_number)
+                for offset in range(0, batch.num_rows, chunk_size):
+                    yield batch.slice(offset, chunk_size).to_pandas()
+    else:
+        yield from pd.read_csv(file_path, chunksize=chunk_size, dtype=csv_dtype)
+
+
+def write_data_frame(dataframe: pd.DataFrame, file_path: str):
+    """
+    Writes a csv, parquet or feather file, picked by the file extension.
+    """
+    file_format = get_data_frame_file_format(file_path)
+    make_directories(get_dir(file_path))
+    if file_format == "parquet":
+        dataframe.to_parquet(file_path, index=False)
+    elif file_format == "feather":
+        dataframe.reset_index(drop=True).to_feather(file_path)
+    else:
+        dataframe.to_csv(file_path, index=False)
+
+
+class DataFrameFileWriter:
+    """
+    Appends dataframe chunks to one csv, parquet or feather file.
+    Columnar files are written one row group / record batch per chunk with the column types of the
+    first chunk, object columns as strings.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.file_format = get_data_frame_file_format(file_path)
+        self.file_obj = None
+        self.writer = None
+        self.arrow_schema = None
+
+    def write(self, dataframe: pd.DataFrame):
+        if self.file_format == "csv":
+            write_header = self.file_obj is None
+            if self.file_obj is None:
+                make_directories(get_dir(self.file_path))
+                self.file_obj = open(self.file_path, "w", newline="")
+            dataframe.to_csv(self.file_obj, header=write_header, index=False)
+            return
+
+        import pyarrow as pa
+        if self.writer is None:
+            self.arrow_schema = pa.schema([pa.field(column, pa.string() if dtype == object else pa.from_numpy_dtype(dtype))
+                                           for column, dtype in dataframe.dtypes.items()])
+            make_directories(get_dir(self.file_path))
+            if self.file_format == "parquet":
+                import pyarrow.parquet as pq
+                self.writer = pq.ParquetWriter(self.file_path, self.arrow_schema)
+            else:
+                self.writer = pa.ipc.new_file(self.file_path, self.arrow_schema)
+        table = pa.Table.from_pandas(dataframe, schema=self.arrow_schema, preserve_index=False)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.file_obj is not None:
+            self.file_obj.close()
+        if self.writer is not None:
+            self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
 def load_data(file_path: str, schema_file_path: str) -> pd.DataFrame:
+    """
+    Reads the data file with the column types of schema.json applied while parsing: numerical columns
+    as configured (float, float32, ...), category columns as pandas categoricals of their domain_value.
+    Values outside domain_value raise instead of silently becoming missing.
+    """
     try:
-        datatset_schema = get_dictionary_from_json(schema_file_path)
+        datatset_schema = get_schema(schema_file_path)
 
         schema = datatset_schema["columns"]
 
-        dataframe = pd.read_csv(file_path)
+        dtypes = get_schema_dtypes(datatset_schema)
+        # categories are parsed as found, so values outside the domain can be reported below
+        read_dtypes = {column: "category" if isinstance(dtype, pd.CategoricalDtype) else dtype
+                       for column, dtype in dtypes.items()}
+        dataframe = read_typed_data_frame(file_path, read_dtypes)
 
         error_messgae = ""
 
         for column in dataframe.columns:
-            if column in list(schema.keys()):
-                dataframe[column].astype(schema[column])
-            else:
+            if column not in schema:
                 error_messgae = f"{error_messgae} \nColumn: [{column}] is not in the schema."
         if len(error_messgae) > 0:
             raise Exception(error_messgae)
+
+        for column in dataframe.columns:
+            dtype = dtypes[column]
+            if isinstance(dtype, pd.CategoricalDtype) and dtype.categories is not None:
+                unknown_values = sorted(set(dataframe[column].cat.categories) - set(dtype.categories))
+                if len(unknown_values) > 0:
+                    error_messgae = f"{error_messgae} \nColumn: [{column}] has values {unknown_values} " \
+                                    f"not in the schema domain."
+                else:
+                    dataframe[column] = dataframe[column].cat.set_categories(dtype.categories)
+        if len(error_messgae) > 0:
+            raise Exception(error_messgae)
         return dataframe
 
     except Exception as e:
@@ -91,7 +296,7 @@ def load_data(file_path: str, schema_file_path: str) -> pd.DataFrame:
 
 
 def get_base_file_replace_filename_with_npz(file_path):
-    return get_base_file_name(file_path).replace(".csv", ".npz")
+    return f"{os.path.splitext(get_base_file_name(file_path))[0]}.npz"
 
 
 def save_numpy_array_data(file_path: str, array: np.array):
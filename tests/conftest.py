@@ -0,0 +1,33 @@
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from benchmark.ingestion_cache import ConditionalRequestHandler
+
+
+class RecordingRequestHandler(ConditionalRequestHandler):
+
+    def send_head(self):
+        self.server.requests.append((self.path, self.headers.get("If-None-Match")))
+        return super().send_head()
+
+
+@pytest.fixture
+def dataset_server(tmp_path):
+    """
+    Local http stand-in for the dataset host: serves the files of tmp_path / "serve" with ETag headers,
+    answers conditional requests with 304 and records (path, If-None-Match) of every request.
+    Yields (serve dir, base url, server).
+    """
+    serve_dir = tmp_path / "serve"
+    serve_dir.mkdir()
+    server = ThreadingHTTPServer(("127.0.0.1", 0),
+                                 lambda *args: RecordingRequestHandler(*args, directory=str(serve_dir)))
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield serve_dir, f"http://127.0.0.1:{server.server_address[1]}", server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,64 @@
+import hashlib
+import os
+
+import pytest
+
+from housing.components.dataset_cache import DatasetCache
+from housing.exception import CustomException
+
+DATASET_CONTENT = b"longitude,latitude\n-122.23,37.88\n"
+DATASET_SHA256 = hashlib.sha256(DATASET_CONTENT).hexdigest()
+WRONG_SHA256 = "0" * 64
+
+
+@pytest.fixture
+def dataset_cache(tmp_path):
+    return DatasetCache(str(tmp_path / "dataset_cache"))
+
+
+def test_remote_fetch_is_revalidated_with_etag(dataset_server, dataset_cache):
+    serve_dir, base_url, server = dataset_server
+    (serve_dir / "housing.tgz").write_bytes(DATASET_CONTENT)
+    source = f"{base_url}/housing.tgz"
+
+    assert dataset_cache.fetch(source, expected_sha256=DATASET_SHA256) == DATASET_SHA256
+    assert dataset_cache.fetch(source, expected_sha256=DATASET_SHA256) == DATASET_SHA256
+
+    (_, first_etag), (_, second_etag) = server.requests
+    assert first_etag is None
+    assert second_etag == dataset_cache.read_index()[source]["etag"]
+    assert os.listdir(dataset_cache.blob_dir) == [DATASET_SHA256]
+
+
+def test_remote_checksum_mismatch_leaves_cache_untouched(dataset_server, dataset_cache):
+    serve_dir, base_url, _ = dataset_server
+    (serve_dir / "housing.tgz").write_bytes(DATASET_CONTENT)
+
+    with pytest.raises(CustomException):
+        dataset_cache.fetch(f"{base_url}/housing.tgz", expected_sha256=WRONG_SHA256)
+
+    assert os.listdir(dataset_cache.blob_dir) == []
+    assert dataset_cache.read_index() == {}
+
+
+def test_local_checksum_mismatch_leaves_cache_untouched(tmp_path, dataset_cache):
+    file_path = tmp_path / "housing.tgz"
+    file_path.write_bytes(DATASET_CONTENT)
+
+    with pytest.raises(CustomException):
+        dataset_cache.fetch(file_path.as_uri(), expected_sha256=WRONG_SHA256)
+
+    assert os.listdir(dataset_cache.blob_dir) == []
+    assert dataset_cache.read_index() == {}
+    assert dataset_cache.fetch(file_path.as_uri(), expected_sha256=DATASET_SHA256) == DATASET_SHA256
+
+
+def test_cached_blob_is_used_when_source_is_unreachable(dataset_server, dataset_cache):
+    serve_dir, base_url, server = dataset_server
+    (serve_dir / "housing.tgz").write_bytes(DATASET_CONTENT)
+    source = f"{base_url}/housing.tgz"
+    dataset_cache.fetch(source)
+    server.shutdown()
+    server.server_close()
+
+    assert dataset_cache.fetch(source, expected_sha256=DATASET_SHA256) == DATASET_SHA256
@@ -0,0 +1,92 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark.common import make_housing_frame, SCHEMA_FILE_PATH
+from entity.data_ingestion_entity import DataIngestionEntity
+from housing.components.data_ingestion import DataIngestion, INCREMENTAL_STATE_FILE_NAME, get_row_keys
+from housing.utilities.util import cast_data_frame_to_schema
+
+N_ROWS = 2000
+N_NEW_ROWS = 500
+
+
+def get_keys(data_frame: pd.DataFrame) -> np.ndarray:
+    return np.sort(get_row_keys(cast_data_frame_to_schema(data_frame, SCHEMA_FILE_PATH)))
+
+
+@pytest.fixture
+def incremental_run(tmp_path):
+    """
+    Writes the raw feed into raw_data and returns (raw file path, function running incremental ingestion).
+    """
+    raw_data_dir = tmp_path / "raw_data"
+    raw_data_dir.mkdir()
+    data_ingestion_config = DataIngestionEntity(
+        dataset_download_url="housing.tgz", tgz_download_dir=None,
+        raw_data_dir=str(raw_data_dir),
+        ingested_train_dir=str(tmp_path / "ingested_data" / "train"),
+        ingested_test_dir=str(tmp_path / "ingested_data" / "test"),
+        dataset_cache_dir=None, dataset_sha256=None, stream_from_archive=False,
+        read_chunk_size=300, streaming_split=True, artifact_format="csv",
+        schema_file_path=SCHEMA_FILE_PATH, shard_pattern=None, shard_n_jobs=-1,
+        incremental_dir=str(tmp_path / "incremental")
+    )
+    raw_file_path = raw_data_dir / "housing.csv"
+    return raw_file_path, lambda: DataIngestion(data_ingestion_config).split_data_as_train_test_incremental()
+
+
+def test_second_run_appends_only_new_rows(incremental_run):
+    raw_file_path, run = incremental_run
+    make_housing_frame(N_ROWS, seed=0).to_csv(raw_file_path, index=False)
+    first_artifact = run()
+    first_files = [open(file_path, "rb").read()
+                   for file_path in [first_artifact.train_file_path, first_artifact.test_file_path]]
+    first_train_df = pd.read_csv(first_artifact.train_file_path)
+    first_test_df = pd.read_csv(first_artifact.test_file_path)
+    assert len(first_train_df) + len(first_test_df) == N_ROWS
+
+    # the feed grows by new rows and repeats one already ingested row
+    raw_df = pd.read_csv(raw_file_path)
+    new_df = make_housing_frame(N_NEW_ROWS, seed=1)
+    pd.concat([new_df, raw_df.iloc[:1]]).to_csv(raw_file_path, mode="a", header=False, index=False)
+    second_artifact = run()
+    assert [second_artifact.train_file_path, second_artifact.test_file_path] == \
+           [first_artifact.train_file_path, first_artifact.test_file_path]
+
+    columns = list(raw_df.columns)
+    appended_dfs = []
+    for file_path, first_file in zip([second_artifact.train_file_path, second_artifact.test_file_path], first_files):
+        second_file = open(file_path, "rb").read()
+        # rows of the first run keep their positions, new rows are appended after them
+        assert second_file[:len(first_file)] == first_file
+        appended_dfs.append(pd.read_csv(io.BytesIO(second_file[len(first_file):]), header=None, names=columns))
+    appended_df = pd.concat(appended_dfs, ignore_index=True)
+    assert np.array_equal(get_keys(appended_df), get_keys(pd.read_csv(raw_file_path).iloc[N_ROWS:N_ROWS + N_NEW_ROWS]))
+    n_test = len(pd.read_csv(second_artifact.test_file_path))
+    assert abs(n_test - 0.2 * (N_ROWS + N_NEW_ROWS)) <= 6
+
+
+def test_state_is_reloaded(incremental_run, tmp_path):
+    raw_file_path, run = incremental_run
+    make_housing_frame(N_ROWS, seed=0).to_csv(raw_file_path, index=False)
+    artifact = run()
+    make_housing_frame(N_NEW_ROWS, seed=1).to_csv(raw_file_path, mode="a", header=False, index=False)
+    run()
+
+    with np.load(tmp_path / "incremental" / INCREMENTAL_STATE_FILE_NAME) as state:
+        row_keys, file_sizes, stratum_seen = state["row_keys"], state["file_sizes"], state["stratum_seen"]
+    assert np.array_equal(row_keys, np.unique(get_keys(pd.read_csv(raw_file_path))))
+    assert list(file_sizes) == [len(open(file_path, "rb").read())
+                                for file_path in [artifact.train_file_path, artifact.test_file_path]]
+    assert stratum_seen.sum() == N_ROWS + N_NEW_ROWS
+
+    # an unchanged feed appends nothing and leaves the state as it was
+    files = [open(file_path, "rb").read() for file_path in [artifact.train_file_path, artifact.test_file_path]]
+    run()
+    assert files == [open(file_path, "rb").read() for file_path in [artifact.train_file_path, artifact.test_file_path]]
+    with np.load(tmp_path / "incremental" / INCREMENTAL_STATE_FILE_NAME) as state:
+        assert np.array_equal(state["row_keys"], row_keys)
+        assert np.array_equal(state["stratum_seen"], stratum_seen)